@@ -4,18 +4,19 @@ PATH: yugnex/backend/agents/analysts.py
 PURPOSE: Implements Saanvi (Analyst) with requirements gathering logic.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from agents.base import BaseAgent
+from agents.context import AgentContext
 
 class Saanvi(BaseAgent):
     """
     ROLE: Product Analyst
     FOCUS: Requirements, User Stories, Edge Cases
     """
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, agent_key="saanvi")
+    def __init__(self):
+        super().__init__(agent_key="saanvi")
 
-    async def analyze_request(self, user_input: str, project_id: int) -> str:
+    async def analyze_request(self, user_input: str, ctx: Optional[AgentContext] = None) -> str:
         """
         PURPOSE: First pass to see if requirements are clear.
         """
@@ -28,9 +29,9 @@ class Saanvi(BaseAgent):
         3. If Yes, generate a summary of the scope.
         """
         
-        return await self.run(user_input=prompt, project_id=project_id)
+        return await self.run(user_input=prompt, ctx=ctx)
 
-    async def generate_user_stories(self, confirmed_scope: str, project_id: int) -> str:
+    async def generate_user_stories(self, confirmed_scope: str, ctx: Optional[AgentContext] = None) -> str:
         """
         PURPOSE: Convert scope into formal tickets/stories.
         """
@@ -43,4 +44,4 @@ class Saanvi(BaseAgent):
         - Acceptance Criteria: ...
         """
         
-        return await self.run(user_input=prompt, project_id=project_id)
\ No newline at end of file
+        return await self.run(user_input=prompt, ctx=ctx)
\ No newline at end of file
@@ -3,111 +3,239 @@ FILE: base.py
 PATH: yugnex/backend/agents/base.py
 PURPOSE: The abstract base class for all AI Agents in YugNex.
 WORKING:
-    1. Initializes with Memory and AI Router.
-    2. Loads specific system prompts (e.g., 'tilotma.txt').
+    1. Initializes with the AI Router only - agents are built once per process (AgentRegistry)
+       and keep no per-request state; the DB session, project and lane of a call arrive in an
+       AgentContext.
+    2. Takes its system prompt (e.g., 'tilotma.txt') from the in-memory prompt registry;
+       edits to the file are picked up by the registry's watcher without a restart.
     3. Provides a standard 'run()' method that:
-       a. Fetches context from memory.
+       a. Fetches context from memory (through the call's AgentContext).
        b. Constructs the full prompt.
        c. Calls the AI Router.
        d. Saves the result back to memory.
+       'invoke()' does the same but returns the ModelResult (model that answered, tokens, latency).
+    4. Provides 'run_stream()' which yields tokens as they arrive (SSE chat).
+    5. Provides 'run_batch()' for bulk, non-interactive work (provider batch APIs).
+    6. Builds the system instruction as a stable prefix (persona + rules, cached by the
+       provider) followed by the volatile project context.
 USAGE:
     class MyAgent(BaseAgent):
-        def __init__(self, db):
-            super().__init__(db, agent_key="my_agent")
+        def __init__(self):
+            super().__init__(agent_key="my_agent")
+
+    response = await agent.run("Hello", AgentContext(db=db, project_id=1))
 """
 
-import os
 import logging
-from typing import Optional, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
 
+from agents.context import AgentContext
+from core.batch import BatchRequest, BatchResult
+from core.model_manager import ModelResult, ModelStream
+from core.prompt_registry import get_prompt_registry
+from services.context_budget import ContextSection, rank_by_relevance, split_files
 from services.ai_router import AIRouter
-from memory.persistent import MemorySystem
 
 logger = logging.getLogger(__name__)
 
 class BaseAgent:
-    def __init__(self, db: AsyncSession, agent_key: str):
+    def __init__(self, agent_key: str):
         """
         PURPOSE: Initialize the agent with standard tools.
         PARAMS:
-            db: Database session for memory access.
             agent_key: Unique ID (e.g., 'tilotma', 'advait') to load prompts.
+        NOTE: One instance serves every request concurrently - never store per-call state on it.
         """
         self.agent_key = agent_key
-        self.db = db
-        self.memory = MemorySystem(db)
-        self.router = AIRouter()
-        
-        # Load System Prompt
-        self.system_prompt = self._load_prompt()
-
-    def _load_prompt(self) -> str:
-        """
-        PURPOSE: Load the agent's specific instructions from config/prompts/.
-        """
-        try:
-            # Construct path relative to this file or absolute project path
-            # Assuming running from backend/ root
-            path = f"config/prompts/{self.agent_key}.txt"
-            
-            if not os.path.exists(path):
-                logger.warning(f"Prompt file not found for {self.agent_key}, using default.")
-                return f"You are {self.agent_key}, a helpful AI assistant."
-                
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"Error loading prompt for {self.agent_key}: {e}")
-            return "You are an AI assistant."
+        self.router = AIRouter()  # Borrows the shared ModelManager / connection pools
+
+        # System prefix, rebuilt only when the registry holds a new prompt version
+        # (a pure function of the prompt, so concurrent rebuilds are harmless)
+        self._prefix_version: Optional[str] = None
+        self._system_prefix = ""
+
+    @property
+    def system_prompt(self) -> str:
+        """
+        PURPOSE: The agent's persona prompt (current registry version; no file access).
+        """
+        prompt = get_prompt_registry().get(self.agent_key)
+        if prompt is None:
+            logger.warning(f"Prompt file not found for {self.agent_key}, using default.")
+            return f"You are {self.agent_key}, a helpful AI assistant."
+        return prompt.text
+
+    @property
+    def system_prefix(self) -> str:
+        """
+        PURPOSE: Cached _build_system_prefix() for the current prompt version.
+        """
+        prompt = get_prompt_registry().get(self.agent_key)
+        version = prompt.sha256 if prompt else None
+        if version != self._prefix_version or not self._system_prefix:
+            self._system_prefix = self._build_system_prefix()
+            self._prefix_version = version
+        return self._system_prefix
+
+    def _build_system_prefix(self) -> str:
+        """
+        PURPOSE: The part of the system instruction that never changes between calls
+                 (persona + behavior rules). Sent first so the provider can cache it.
+        """
+        return f"""
+{self.system_prompt}
+
+=== BEHAVIOR RULES ===
+1. NO HALLUCINATION: If unsure, ask.
+2. HONESTY: If a task takes time, say so.
+3. CONFIDENCE: State your confidence level if ambiguous.
+
+"""
+
+    async def _build_context_sections(
+        self,
+        ctx: AgentContext,
+        context_files: Optional[str],
+        user_input: str
+    ) -> List[ContextSection]:
+        """
+        PURPOSE: Recall memory and split the volatile context into budgetable sections.
+        RETURNS: Sections in prompt order; the router trims the lowest priority first
+                 (recent memories, oldest first -> least relevant files -> critical decisions).
+        """
+        # 1. Gather Context
+        critical, recent = [], []
+        memory = ctx.memory
+        if ctx.project_id and memory is not None:
+            critical, recent = await memory.recall_context_entries(ctx.project_id)
+
+        # 2. Sections (appended after self.system_prefix by the router)
+        return [
+            ContextSection("=== CURRENT PROJECT CONTEXT ===\n[CRITICAL DECISIONS]", critical, priority=2),
+            ContextSection("[RECENT UPDATES]", recent, priority=0),
+            ContextSection(
+                "=== PROVIDED FILES/CODE ===",
+                rank_by_relevance(split_files(context_files), user_input),
+                priority=1,
+            ),
+        ]
 
     async def run(
         self, 
         user_input: str, 
-        project_id: Optional[int] = None, 
-        conversation_id: Optional[int] = None,
+        ctx: Optional[AgentContext] = None,
         context_files: Optional[str] = None
     ) -> str:
         """
         PURPOSE: The main execution loop for the agent.
+        PARAMS:
+            ctx: Per-call state - DB session, project, conversation, scheduler lane and the
+                 request deadline (None = no memory, interactive lane, inherited deadline).
+        RETURNS: The response text (see invoke() for usage / attribution).
+        """
+        result = await self.invoke(user_input=user_input, ctx=ctx, context_files=context_files)
+        return result.text
+
+    async def invoke(
+        self,
+        user_input: str,
+        ctx: Optional[AgentContext] = None,
+        context_files: Optional[str] = None,
+        task_type: str = "general",
+        complexity: str = "medium",
+        requires_speed: bool = False
+    ) -> ModelResult:
+        """
+        PURPOSE: run() returning the full ModelResult (for callers that persist usage).
+        PARAMS:
+            task_type / complexity / requires_speed: Routing hints for model selection
+                (e.g. a small review chunk can go to the fast model).
         WORKING:
             1. Recall Memory (Context).
             2. Build Prompt (System + Context + User Input).
             3. Call AI (via Router).
             4. Remember Result.
         """
-        # 1. Gather Context
-        memory_context = ""
-        if project_id:
-            memory_context = await self.memory.recall_context(project_id)
-
-        # 2. Construct Full System Instruction
-        # We inject the memory context directly into the system prompt area
-        full_system_instruction = f"""
-{self.system_prompt}
-
-=== CURRENT PROJECT CONTEXT ===
-{memory_context}
-
-=== PROVIDED FILES/CODE ===
-{context_files if context_files else "None"}
-
-=== BEHAVIOR RULES ===
-1. NO HALLUCINATION: If unsure, ask.
-2. HONESTY: If a task takes time, say so.
-3. CONFIDENCE: State your confidence level if ambiguous.
-"""
+        # 1-2. Recall context (the router fits it into the model's context window)
+        ctx = ctx or AgentContext()
+        context_sections = await self._build_context_sections(ctx, context_files, user_input)
 
         # 3. Process with AI Router
         # Tilotma usually handles "general" tasks, others are specific
-        response = await self.router.process_request(
+        response = await self.router.invoke(
             prompt=user_input,
-            system_instruction=full_system_instruction,
-            task_type="general", # Can be overridden by subclasses
-            complexity="medium"
+            system_instruction=self.system_prefix,
+            task_type=task_type,
+            complexity=complexity,
+            requires_speed=requires_speed,
+            cacheable_prefix=self.system_prefix,
+            context_sections=context_sections,
+            priority=ctx.priority,
+            deadline=ctx.deadline
         )
 
         # 4. Save to Memory (Optional - usually handled by the conversation manager,
         # but the agent can save specific 'thoughts' or 'decisions' here if needed)
         
-        return response
\ No newline at end of file
+        return response
+
+    async def run_stream(
+        self,
+        user_input: str,
+        ctx: Optional[AgentContext] = None,
+        context_files: Optional[str] = None
+    ) -> ModelStream:
+        """
+        PURPOSE: Streaming variant of run() for the SSE chat endpoint.
+        WORKING:
+            1. Recall Memory and build the system instruction (same as run()).
+            2. Return the router's stream; tokens flow as soon as the model emits them.
+        RETURNS: ModelStream ('.text' holds the full response once iteration ends).
+        """
+        ctx = ctx or AgentContext()
+        context_sections = await self._build_context_sections(ctx, context_files, user_input)
+
+        return self.router.stream_request(
+            prompt=user_input,
+            system_instruction=self.system_prefix,
+            task_type="general",
+            complexity="medium",
+            cacheable_prefix=self.system_prefix,
+            context_sections=context_sections,
+            priority=ctx.priority,
+            deadline=ctx.deadline
+        )
+
+    async def run_batch(
+        self,
+        user_inputs: List[str],
+        ctx: Optional[AgentContext] = None,
+        context_files: Optional[str] = None,
+        model_name: str = "claude",
+        specific_claude_model: Optional[str] = None
+    ) -> List[BatchResult]:
+        """
+        PURPOSE: Run many inputs with the same context as one provider batch job.
+        WORKING:
+            1. Recall Memory and build the system instruction once, fitted for the longest input.
+            2. Submit every input through ModelManager.submit_batch.
+        RETURNS: List[BatchResult] in the order of 'user_inputs'.
+        NOTE: For offline jobs only - a batch may take a long time to complete.
+              Responses are not cached and do not count against interactive rate limits.
+        """
+        context_sections = await self._build_context_sections(ctx or AgentContext(), context_files, "\n".join(user_inputs))
+        full_system_instruction = self.router.fit_context(
+            self.system_prefix, max(user_inputs, key=len, default=""), context_sections,
+            (model_name, specific_claude_model)
+        )
+
+        requests = [
+            BatchRequest(
+                custom_id=f"{self.agent_key}-{index}",
+                messages=self.router._build_messages(user_input, full_system_instruction, self.system_prefix),
+                model_name=model_name,
+                specific_claude_model=specific_claude_model,
+            )
+            for index, user_input in enumerate(user_inputs)
+        ]
+        return await self.router.manager.submit_batch(requests)
@@ -0,0 +1,122 @@
+"""
+FILE: checkpoints.py
+PATH: yugnex/backend/agents/collaboration/checkpoints.py
+PURPOSE: Durable per-step checkpoints so a rerun of a workflow resumes instead of recomputing.
+WORKING:
+    1. After a workflow step succeeds, its output is saved under (run_id, step) together
+       with a SHA-256 of the step's inputs (workflow inputs + dependency outputs).
+    2. On a rerun with the same run_id, a step whose checkpoint hash matches its current
+       inputs is restored instead of executed - no LLM call. If an upstream output changed,
+       the hash differs and the step (and everything after it) runs again.
+    3. DatabaseCheckpointStore keeps checkpoints in 'workflow_checkpoints' (survives restarts);
+       each operation uses its own session because steps finish concurrently.
+       MemoryCheckpointStore is the in-process equivalent (tests, scripts).
+    4. Outputs must be JSON-serializable (agent methods return text).
+USAGE:
+    report = await workflow.run(run_id=f"delivery-{project_id}", checkpoints=DatabaseCheckpointStore())
+"""
+
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    input_hash: str
+    output: Any
+
+
+def input_hash(step: str, inputs: Dict[str, Any]) -> str:
+    """
+    PURPOSE: Stable hash of what a step was computed from.
+    """
+    payload = json.dumps({"step": step, "inputs": inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore(ABC):
+    @abstractmethod
+    async def load(self, run_id: str, step: str) -> Optional[Checkpoint]:
+        """
+        PURPOSE: The step's checkpoint from a previous run, or None.
+        """
+
+    @abstractmethod
+    async def save(self, run_id: str, step: str, input_hash: str, output: Any) -> None:
+        """
+        PURPOSE: Store (or replace) the step's checkpoint.
+        """
+
+    @abstractmethod
+    async def clear(self, run_id: str) -> None:
+        """
+        PURPOSE: Forget a run (e.g. once its results have been delivered).
+        """
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self._checkpoints: Dict[Tuple[str, str], Checkpoint] = {}
+
+    async def load(self, run_id: str, step: str) -> Optional[Checkpoint]:
+        return self._checkpoints.get((run_id, step))
+
+    async def save(self, run_id: str, step: str, input_hash: str, output: Any) -> None:
+        # Round-trip through JSON so this store accepts exactly what the database one does
+        self._checkpoints[(run_id, step)] = Checkpoint(input_hash, json.loads(json.dumps(output)))
+
+    async def clear(self, run_id: str) -> None:
+        for key in [key for key in self._checkpoints if key[0] == run_id]:
+            del self._checkpoints[key]
+
+
+class DatabaseCheckpointStore(CheckpointStore):
+    def __init__(self, session_factory=None):
+        """
+        PARAMS: session_factory: async_sessionmaker (defaults to AsyncSessionLocal).
+        """
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from database.connection import AsyncSessionLocal  # Lazy import (creates the engine)
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory()
+
+    async def load(self, run_id: str, step: str) -> Optional[Checkpoint]:
+        from database.models import WorkflowCheckpoint
+
+        async with self._session() as session:
+            row = await session.scalar(
+                select(WorkflowCheckpoint).where(WorkflowCheckpoint.run_id == run_id, WorkflowCheckpoint.step == step)
+            )
+            return Checkpoint(row.input_hash, (row.output or {}).get("value")) if row else None
+
+    async def save(self, run_id: str, step: str, input_hash: str, output: Any) -> None:
+        from database.models import WorkflowCheckpoint
+
+        async with self._session() as session:
+            row = await session.scalar(
+                select(WorkflowCheckpoint).where(WorkflowCheckpoint.run_id == run_id, WorkflowCheckpoint.step == step)
+            )
+            if row is None:
+                session.add(WorkflowCheckpoint(run_id=run_id, step=step, input_hash=input_hash, output={"value": output}))
+            else:
+                row.input_hash = input_hash
+                row.output = {"value": output}
+            await session.commit()
+
+    async def clear(self, run_id: str) -> None:
+        from database.models import WorkflowCheckpoint
+
+        async with self._session() as session:
+            await session.execute(delete(WorkflowCheckpoint).where(WorkflowCheckpoint.run_id == run_id))
+            await session.commit()
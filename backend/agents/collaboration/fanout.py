@@ -0,0 +1,177 @@
+"""
+FILE: fanout.py
+PATH: yugnex/backend/agents/collaboration/fanout.py
+PURPOSE: Run independent subtasks on several agents at once and collect their results.
+WORKING:
+    1. Each branch (agent + subtask) runs as its own task; at most FANOUT_MAX_CONCURRENCY
+       run at the same time, so a turn takes about as long as its slowest branch.
+    2. Every branch is bounded by FANOUT_BRANCH_TIMEOUT_SECONDS and by the request deadline.
+    3. A failed or timed-out branch is recorded, not raised - the other branches keep their
+       results (partial failure). Cancelling the caller cancels every branch.
+    4. Branches run without the caller's DB session (an AsyncSession must not be shared by
+       concurrent tasks); shared context such as project memory is recalled once by the
+       caller and passed in the branch prompt.
+    5. FanoutResult.merge_prompt() asks the coordinating agent to synthesize the branch
+       outputs into one answer; with_branch_usage() adds the branches' tokens to that answer.
+USAGE:
+    fanout = await FanoutManager.fan_out(
+        [FanoutBranch("advait", "Draft the plan"), FanoutBranch("navya", "Review the risks")],
+        request="Build a CRM", ctx=ctx
+    )
+    merged = fanout.with_branch_usage(await coordinator.invoke(fanout.merge_prompt("Build a CRM"), ctx))
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+from agents.context import AgentContext
+from config.settings import settings
+from core.deadline import current_deadline, wait_with_deadline
+from core.model_manager import ModelResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FanoutBranch:
+    agent_key: str
+    task: str
+    timeout: Optional[float] = None  # None = FANOUT_BRANCH_TIMEOUT_SECONDS
+
+
+@dataclass
+class BranchOutcome:
+    agent_key: str
+    task: str
+    result: Optional[ModelResult] = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+@dataclass
+class FanoutResult:
+    branches: List[BranchOutcome] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> List[BranchOutcome]:
+        return [branch for branch in self.branches if branch.ok]
+
+    @property
+    def failed(self) -> List[BranchOutcome]:
+        return [branch for branch in self.branches if not branch.ok]
+
+    def merge_prompt(self, request: str) -> str:
+        """
+        PURPOSE: Prompt asking the coordinator to combine the branch outputs into one answer.
+        NOTE: Failed branches are listed so the answer can say which perspective is missing.
+        """
+        sections = []
+        for branch in self.branches:
+            body = branch.result.text if branch.ok else f"(No result: {branch.error})"
+            sections.append(f"=== {branch.agent_key.upper()}: {branch.task} ===\n{body}")
+        outputs = "\n\n".join(sections)
+        return f"""
+[TEAM RESULTS FOR THE USER'S REQUEST]
+USER REQUEST: {request}
+
+{outputs}
+
+TASK: Merge the team's work above into one coherent answer for the user.
+Resolve contradictions, remove duplication and keep each specialist's key points.
+If a specialist has no result, say which part is missing.
+"""
+
+    def with_branch_usage(self, merged: ModelResult) -> ModelResult:
+        """
+        PURPOSE: The merged answer, with the tokens of every branch added to its usage.
+        """
+        results = [branch.result for branch in self.succeeded]
+        return replace(
+            merged,
+            input_tokens=merged.input_tokens + sum(r.input_tokens for r in results),
+            output_tokens=merged.output_tokens + sum(r.output_tokens for r in results),
+            cache_read_tokens=merged.cache_read_tokens + sum(r.cache_read_tokens for r in results),
+            cache_write_tokens=merged.cache_write_tokens + sum(r.cache_write_tokens for r in results),
+            latency_seconds=self.duration_seconds + (merged.latency_seconds or 0.0),
+            usage_estimated=merged.usage_estimated or any(r.usage_estimated for r in results),
+        )
+
+
+class FanoutManager:
+    @staticmethod
+    def branch_prompt(branch: FanoutBranch, request: str, from_agent_key: str, context: str = "") -> str:
+        return f"""
+[PARALLEL TASK FROM {from_agent_key.upper()}]
+USER REQUEST: {request}
+YOUR TASK: {branch.task}
+
+CONTEXT:
+{context or "None"}
+
+Work only on your task; other specialists handle the rest in parallel.
+"""
+
+    @staticmethod
+    async def fan_out(
+        branches: List[FanoutBranch],
+        request: str,
+        ctx: Optional[AgentContext] = None,
+        context: str = "",
+        context_files: Optional[str] = None,
+        from_agent_key: str = "tilotma",
+        concurrency: Optional[int] = None
+    ) -> FanoutResult:
+        """
+        PURPOSE: Run every branch concurrently (bounded) and collect the outcomes.
+        PARAMS:
+            request: The user's request (shown to every branch).
+            ctx: Caller's context - lane, deadline and project; its DB session is not shared.
+            context: Shared context text (e.g. recalled project memory) for every branch.
+            concurrency: Max branches running at once (defaults to FANOUT_MAX_CONCURRENCY).
+        RETURNS: FanoutResult with one BranchOutcome per branch, in order.
+        """
+        from agents.registry import AgentRegistry  # Lazy import (registry imports the agents)
+
+        ctx = ctx or AgentContext()
+        branch_ctx = replace(ctx, db=None)
+        deadline = ctx.deadline or current_deadline.get()
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.FANOUT_MAX_CONCURRENCY))
+
+        async def run_branch(branch: FanoutBranch) -> BranchOutcome:
+            outcome = BranchOutcome(agent_key=branch.agent_key, task=branch.task)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    agent = AgentRegistry.get_agent(branch.agent_key)
+                    timeout = settings.FANOUT_BRANCH_TIMEOUT_SECONDS if branch.timeout is None else branch.timeout
+                    outcome.result = await wait_with_deadline(
+                        agent.invoke(
+                            FanoutManager.branch_prompt(branch, request, from_agent_key, context),
+                            branch_ctx,
+                            context_files=context_files
+                        ),
+                        deadline,
+                        cap=timeout
+                    )
+                except Exception as e:
+                    outcome.error = str(e) or type(e).__name__
+                    logger.warning(f"FAN-OUT: branch {branch.agent_key} failed: {outcome.error}")
+                outcome.duration_seconds = time.perf_counter() - started
+            return outcome
+
+        logger.info(f"FAN-OUT: {from_agent_key} -> {', '.join(b.agent_key for b in branches)}")
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*[run_branch(branch) for branch in branches])
+        result = FanoutResult(branches=list(outcomes), duration_seconds=time.perf_counter() - started)
+        logger.info(
+            f"FAN-OUT: {len(result.succeeded)}/{len(outcomes)} branches succeeded in {result.duration_seconds:.2f}s"
+        )
+        return result
@@ -4,8 +4,11 @@ PATH: yugnex/backend/agents/collaboration/handoff.py
 PURPOSE: Manages the transfer of tasks between agents.
 WORKING:
     1. Creates a log entry in 'agent_logs' recording the transfer.
-    2. Instantiates the target agent.
+    2. Looks up the target agent (shared instance) and runs it with the caller's DB session
+       in an AgentContext, on the handoff scheduler lane.
     3. Passes the context (history) to the new agent.
+    4. Saves the target agent's reply in the conversation with its model / token usage,
+       and the handoff's duration on the log entry.
 USAGE:
     next_agent_response = await HandoffManager.transfer(
         db, from_agent="tilotma", to_agent="advait", 
@@ -14,14 +17,17 @@ USAGE:
 """
 
 import logging
-from typing import Optional
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import registry to load target agents dynamically
 # Note: Local import inside method to avoid circular dependency if registry imports this
 # from agents.registry import AgentRegistry (done inside method)
 
+from agents.context import AgentContext
+from core.scheduler import LANE_HANDOFF
 from database.models import AgentLog
+from memory.conversation import ConversationManager
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +59,8 @@ class HandoffManager:
         db.add(log_entry)
         await db.commit()
 
-        # 2. Instantiate Target Agent
-        target_agent = AgentRegistry.get_agent(to_agent_key, db)
+        # 2. Look up Target Agent
+        target_agent = AgentRegistry.get_agent(to_agent_key)
 
         # 3. Construct Handoff Prompt
         # We wrap the task in a specific format so the target agent knows it's a handoff
@@ -68,10 +74,22 @@ CONTEXT:
 Please execute this task based on your role.
 """
 
-        # 4. Run Target Agent
-        response = await target_agent.run(
+        # 4. Run Target Agent (handoff lane: queued behind interactive chat under load)
+        started = time.perf_counter()
+        result = await target_agent.invoke(
             user_input=handoff_prompt,
-            conversation_id=conversation_id
+            ctx=AgentContext(db=db, conversation_id=conversation_id, priority=LANE_HANDOFF)
         )
 
-        return response
\ No newline at end of file
+        # 5. Persist the reply with its usage, and how long the handoff took
+        await ConversationManager(db).add_message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=result.text,
+            agent_key=to_agent_key,
+            result=result
+        )
+        log_entry.duration_ms = int((time.perf_counter() - started) * 1000)
+        await db.commit()
+
+        return result.text
\ No newline at end of file
@@ -1,18 +1,365 @@
 """
-Workflow helpers for chaining agents.
+FILE: workflow.py
+PATH: yugnex/backend/agents/collaboration/workflow.py
+PURPOSE: Async DAG workflow engine for chaining agents (plus the original linear helper).
+WORKING:
+    1. A Workflow is a set of named steps; each declares the steps it depends on.
+       A step is an async callable receiving the results so far (workflow inputs +
+       finished steps, by name) and returning its own result.
+    2. run() starts every step whose dependencies are done, concurrently, with at most
+       'max_concurrency' steps running at once (WORKFLOW_MAX_CONCURRENCY).
+    3. Each attempt is capped by the step's timeout and the request deadline; failed
+       attempts are retried with exponential backoff up to 'retries' times.
+    4. A step that fails for good skips everything downstream of it; independent
+       branches carry on.
+    5. The WorkflowReport has each step's timing and the critical path - the chain of
+       steps that decided the total run time (the place to optimize).
+    6. With a run_id and a CheckpointStore, every finished step is checkpointed with a hash
+       of its inputs; rerunning the same run_id restores unchanged steps instead of
+       executing them (resume after a crash or a late failure - see checkpoints.py).
+    7. agent_step() turns an agent method ('analyze_request', 'create_architecture_plan',
+       'generate_feature', 'review_code', ...) into a step; delivery_pipeline() builds the
+       Saanvi -> (Advait | Saanvi) -> Shubham -> Navya pipeline from them.
+USAGE:
+    report = await delivery_pipeline("Build a CRM", ctx).run(run_id="crm-42", checkpoints=DatabaseCheckpointStore())
+    print(report.summary())
+    review = report.results["review"]
 """
 
 from __future__ import annotations
 
-from typing import Callable, Dict, List
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from agents.collaboration.checkpoints import CheckpointStore, input_hash
+from agents.context import AgentContext
+from config.settings import settings
+from core.deadline import Deadline, DeadlineExceededError, current_deadline, wait_with_deadline
+
+logger = logging.getLogger(__name__)
+
+StepFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+STEP_PENDING = "pending"
+STEP_OK = "ok"
+STEP_FAILED = "failed"
+STEP_SKIPPED = "skipped"
 
 
 def run_workflow(tasks: List[Callable[[Dict], Dict]], payload: Dict) -> Dict:
     """
     Executes a simple pipeline of callables, passing the payload along.
+    NOTE: Synchronous and strictly linear - use Workflow for agent pipelines.
     """
     data = payload
     for step in tasks:
         data = step(data)
     return data
 
+
+@dataclass(frozen=True)
+class WorkflowStep:
+    name: str
+    run: StepFn
+    depends_on: tuple = ()
+    timeout: Optional[float] = None  # Per attempt (None = WORKFLOW_STEP_TIMEOUT_SECONDS)
+    retries: int = 0  # Extra attempts after a failure
+    retry_delay: float = 0.5  # Backoff before retry n is retry_delay * 2**n
+
+
+@dataclass
+class StepReport:
+    name: str
+    status: str = STEP_PENDING
+    result: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    resumed: bool = False  # Restored from a checkpoint, not executed
+    started_at: Optional[float] = None  # Seconds since the workflow started
+    finished_at: Optional[float] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class WorkflowReport:
+    steps: Dict[str, StepReport] = field(default_factory=dict)
+    duration_seconds: float = 0.0
+    critical_path: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(step.status == STEP_OK for step in self.steps.values())
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        return {name: step.result for name, step in self.steps.items() if step.status == STEP_OK}
+
+    @property
+    def resumed(self) -> List[str]:
+        return [name for name, step in self.steps.items() if step.resumed]
+
+    @property
+    def critical_path_seconds(self) -> float:
+        return sum(self.steps[name].duration_seconds for name in self.critical_path)
+
+    def summary(self) -> str:
+        """
+        PURPOSE: Human-readable timing report (one line per step, critical path marked).
+        """
+        lines = [f"Workflow finished in {self.duration_seconds:.2f}s ({'ok' if self.ok else 'failed'})"]
+        ordered = sorted(self.steps.values(), key=lambda s: (s.started_at is None, s.started_at or 0.0))
+        for step in ordered:
+            marker = "*" if step.name in self.critical_path else " "
+            timing = f"{step.started_at:7.2f}s -> {step.finished_at:7.2f}s" if step.started_at is not None else " " * 20
+            error = f"  {step.error}" if step.error else ""
+            status = "resumed" if step.resumed else step.status
+            lines.append(f"{marker} {step.name:<20} {status:<8} {timing}  attempts={step.attempts}{error}")
+        lines.append(f"Critical path: {' -> '.join(self.critical_path)} ({self.critical_path_seconds:.2f}s)")
+        return "\n".join(lines)
+
+
+class Workflow:
+    def __init__(self, inputs: Optional[Dict[str, Any]] = None, max_concurrency: Optional[int] = None):
+        """
+        PURPOSE: An empty DAG; add steps with add_step().
+        PARAMS:
+            inputs: Initial values visible to every step (by key).
+            max_concurrency: Steps running at once (defaults to WORKFLOW_MAX_CONCURRENCY).
+        """
+        self.inputs = dict(inputs or {})
+        self.max_concurrency = max_concurrency or settings.WORKFLOW_MAX_CONCURRENCY
+        self.steps: Dict[str, WorkflowStep] = {}
+
+    def add_step(
+        self,
+        name: str,
+        run: StepFn,
+        depends_on: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        retry_delay: float = 0.5
+    ) -> "Workflow":
+        """
+        PURPOSE: Register a step. RETURNS: self (calls can be chained).
+        RAISES: ValueError on a duplicate name.
+        """
+        if name in self.steps:
+            raise ValueError(f"Duplicate workflow step: '{name}'")
+        self.steps[name] = WorkflowStep(name, run, tuple(depends_on), timeout, retries, retry_delay)
+        return self
+
+    def validate(self) -> List[str]:
+        """
+        PURPOSE: Check dependencies exist and there is no cycle.
+        RETURNS: Step names in a valid execution order.
+        RAISES: ValueError describing the problem.
+        """
+        for step in self.steps.values():
+            missing = [dep for dep in step.depends_on if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown step(s): {missing}")
+
+        # Kahn's algorithm
+        remaining = {name: set(step.depends_on) for name, step in self.steps.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Workflow has a dependency cycle among: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    async def run(
+        self,
+        inputs: Optional[Dict[str, Any]] = None,
+        deadline: Optional[Deadline] = None,
+        run_id: Optional[str] = None,
+        checkpoints: Optional[CheckpointStore] = None
+    ) -> WorkflowReport:
+        """
+        PURPOSE: Execute the DAG.
+        PARAMS:
+            inputs: Extra / overriding initial values for this run.
+            deadline: Overall time budget (None = the inherited request deadline, if any).
+            run_id / checkpoints: Checkpoint every finished step under 'run_id' and restore
+                                  steps whose inputs are unchanged since a previous run.
+        RETURNS: WorkflowReport (check '.ok'; failed steps have '.error').
+        NOTE: Cancelling run() cancels every running step and waits for them to finish.
+        """
+        self.validate()
+        deadline = deadline or current_deadline.get()
+        run_inputs = {**self.inputs, **(inputs or {})}
+        results: Dict[str, Any] = dict(run_inputs)
+        if checkpoints is not None and not run_id:
+            raise ValueError("A run_id is required to use checkpoints")
+        report = WorkflowReport(steps={name: StepReport(name) for name in self.steps})
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        started = time.perf_counter()
+
+        async def execute(step: WorkflowStep) -> None:
+            step_report = report.steps[step.name]
+            async with semaphore:
+                step_report.started_at = time.perf_counter() - started
+                try:
+                    # 1. Resume: an unchanged step is restored from its checkpoint
+                    step_hash = None
+                    if checkpoints is not None:
+                        step_hash = input_hash(step.name, {**run_inputs, **{dep: results[dep] for dep in step.depends_on}})
+                        saved = await self._load_checkpoint(checkpoints, run_id, step.name)
+                        if saved is not None and saved.input_hash == step_hash:
+                            step_report.result, step_report.resumed, step_report.status = saved.output, True, STEP_OK
+                            results[step.name] = saved.output
+                            return
+
+                    # 2. Execute, then checkpoint the output
+                    step_report.result = await self._run_with_retries(step, step_report, results, deadline)
+                    step_report.status = STEP_OK
+                    results[step.name] = step_report.result
+                    if checkpoints is not None:
+                        await self._save_checkpoint(checkpoints, run_id, step.name, step_hash, step_report.result)
+                except Exception as e:
+                    step_report.status = STEP_FAILED
+                    step_report.error = str(e) or type(e).__name__
+                    logger.warning(f"WORKFLOW: step '{step.name}' failed after {step_report.attempts} attempt(s): {step_report.error}")
+                finally:
+                    step_report.finished_at = time.perf_counter() - started
+
+        pending = dict(self.steps)
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while pending or running:
+                # 1. Skip steps whose dependencies failed; start those whose dependencies are done
+                for name, step in list(pending.items()):
+                    statuses = [report.steps[dep].status for dep in step.depends_on]
+                    blocked = [dep for dep, status in zip(step.depends_on, statuses) if status in (STEP_FAILED, STEP_SKIPPED)]
+                    if blocked:
+                        report.steps[name].status = STEP_SKIPPED
+                        report.steps[name].error = f"Skipped: dependency '{blocked[0]}' did not complete"
+                        del pending[name]
+                    elif all(status == STEP_OK for status in statuses):
+                        running[asyncio.create_task(execute(step))] = name
+                        del pending[name]
+                if not running:
+                    continue
+
+                # 2. Wait for the next step to finish
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del running[task]
+        finally:
+            # Cancelled steps must have finished (and recorded their timing) before we return
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        report.duration_seconds = time.perf_counter() - started
+        report.critical_path = self._critical_path(report)
+        logger.info(f"WORKFLOW: {len(report.results)}/{len(self.steps)} steps ok ({len(report.resumed)} resumed) in {report.duration_seconds:.2f}s; critical path {' -> '.join(report.critical_path)}")
+        return report
+
+    @staticmethod
+    async def _run_with_retries(step: WorkflowStep, step_report: StepReport, results: Dict[str, Any], deadline: Optional[Deadline]) -> Any:
+        timeout = settings.WORKFLOW_STEP_TIMEOUT_SECONDS if step.timeout is None else step.timeout
+        for attempt in range(step.retries + 1):
+            step_report.attempts = attempt + 1
+            try:
+                return await wait_with_deadline(step.run(dict(results)), deadline, cap=timeout)
+            except DeadlineExceededError:
+                raise  # No time left for another attempt
+            except Exception as e:
+                if attempt >= step.retries:
+                    raise
+                delay = step.retry_delay * (2 ** attempt)
+                logger.info(f"WORKFLOW: step '{step.name}' attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _load_checkpoint(checkpoints: CheckpointStore, run_id: str, step: str):
+        try:
+            return await checkpoints.load(run_id, step)
+        except Exception as e:
+            logger.error(f"WORKFLOW: could not load checkpoint {run_id}/{step}: {e}")  # Recompute instead
+            return None
+
+    @staticmethod
+    async def _save_checkpoint(checkpoints: CheckpointStore, run_id: str, step: str, step_hash: str, output: Any) -> None:
+        try:
+            await checkpoints.save(run_id, step, step_hash, output)
+        except Exception as e:
+            logger.error(f"WORKFLOW: could not save checkpoint {run_id}/{step}: {e}")  # The step itself succeeded
+
+    def _critical_path(self, report: WorkflowReport) -> List[str]:
+        """
+        PURPOSE: Walk back from the last step to finish, always through the dependency that
+                 finished last (the one it actually waited for).
+        """
+        finished = [s for s in report.steps.values() if s.finished_at is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda s: s.finished_at).name]
+        while True:
+            deps = [report.steps[dep] for dep in self.steps[path[-1]].depends_on if report.steps[dep].finished_at is not None]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda s: s.finished_at).name)
+        return list(reversed(path))
+
+
+def agent_step(
+    agent_key: str,
+    method: str,
+    args: Callable[[Dict[str, Any]], Sequence[Any]],
+    ctx: Optional[AgentContext] = None
+) -> StepFn:
+    """
+    PURPOSE: Use an agent method as a workflow step.
+    PARAMS:
+        agent_key / method: e.g. ("advait", "create_architecture_plan").
+        args: Builds the method's positional arguments from the results so far.
+        ctx: Project / lane / deadline for the call. Its DB session is dropped, because
+             steps may run concurrently and an AsyncSession must not be shared.
+    """
+    step_ctx = replace(ctx or AgentContext(), db=None)
+
+    async def run(results: Dict[str, Any]) -> Any:
+        from agents.registry import AgentRegistry  # Lazy import (registry imports the agents)
+        agent = AgentRegistry.get_agent(agent_key)
+        return await getattr(agent, method)(*args(results), ctx=step_ctx)
+
+    return run
+
+
+def delivery_pipeline(request: str, ctx: Optional[AgentContext] = None, max_concurrency: Optional[int] = None) -> Workflow:
+    """
+    PURPOSE: The team's delivery pipeline as a DAG.
+    WORKING:
+        1. Saanvi analyzes the request.
+        2. Advait plans the architecture while Saanvi writes the user stories (in parallel).
+        3. Shubham implements from the plan and the stories.
+        4. Navya reviews the code against the plan.
+    RETURNS: A Workflow; run() it (steps see the request as 'request').
+    """
+    workflow = Workflow(inputs={"request": request}, max_concurrency=max_concurrency)
+    workflow.add_step("analysis", agent_step("saanvi", "analyze_request", lambda r: [r["request"]], ctx), retries=1)
+    workflow.add_step("plan", agent_step("advait", "create_architecture_plan", lambda r: [r["analysis"]], ctx), depends_on=["analysis"], retries=1)
+    workflow.add_step("stories", agent_step("saanvi", "generate_user_stories", lambda r: [r["analysis"]], ctx), depends_on=["analysis"], retries=1)
+    workflow.add_step(
+        "code",
+        agent_step("shubham", "generate_feature", lambda r: [f"{r['plan']}\n\nUSER STORIES:\n{r['stories']}"], ctx),
+        depends_on=["plan", "stories"],
+        retries=1
+    )
+    workflow.add_step("review", agent_step("navya", "review_code", lambda r: [r["code"], r["plan"]], ctx), depends_on=["code"], retries=1)
+    return workflow
@@ -0,0 +1,52 @@
+"""
+FILE: context.py
+PATH: yugnex/backend/agents/context.py
+PURPOSE: Per-call state for an agent run (DB session, project, conversation, lane, deadline).
+WORKING:
+    1. Agents are process-wide singletons (see AgentRegistry) and hold no per-request state.
+    2. Everything that belongs to one request travels in an immutable AgentContext passed to
+       run() / invoke() / run_stream(), so concurrent requests never share a session or project.
+    3. 'memory' wraps the call's DB session; without a session (benchmarks, scripts) there is
+       no memory recall.
+    4. Work split into concurrent calls (fan-out, workflows, chunked review) must not share
+       the session: recall_memory() once, then pass the text and a context without 'db'.
+USAGE:
+    ctx = AgentContext(db=db, project_id=conversation.project_id, conversation_id=conversation.id)
+    response = await AgentRegistry.get_agent("advait").run("Design the schema", ctx)
+"""
+
+from dataclasses import dataclass, replace
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.deadline import Deadline
+from core.scheduler import LANE_INTERACTIVE
+from memory.persistent import MemorySystem
+
+
+@dataclass(frozen=True)
+class AgentContext:
+    db: Optional[AsyncSession] = None
+    project_id: Optional[int] = None
+    conversation_id: Optional[int] = None
+    priority: str = LANE_INTERACTIVE  # Scheduler lane ("interactive", "handoff", "background")
+    deadline: Optional[Deadline] = None  # None = the deadline inherited from the caller
+
+    @property
+    def memory(self) -> Optional[MemorySystem]:
+        """
+        PURPOSE: Memory facade bound to this call's DB session (None without a session).
+        """
+        return MemorySystem(self.db) if self.db is not None else None
+
+    async def recall_memory(self) -> str:
+        """
+        PURPOSE: The project's memory as prompt text ("" without a session or project).
+        """
+        memory = self.memory
+        if not self.project_id or memory is None:
+            return ""
+        return await memory.recall_context(self.project_id)
+
+    def with_priority(self, priority: str) -> "AgentContext":
+        return replace(self, priority=priority)
@@ -4,24 +4,38 @@ PATH: yugnex/backend/agents/developers.py
 PURPOSE: Implements Shubham (Developer) with code extraction logic.
 """
 
-import re
-from typing import Dict, List
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Optional
 from agents.base import BaseAgent
+from agents.context import AgentContext
+from services.code_blocks import CodeBlock, CodeBlockExtractor, iter_code_blocks
 
 class Shubham(BaseAgent):
     """
     ROLE: Senior Developer
     FOCUS: Implementation, Code Generation
     """
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, agent_key="shubham")
+    def __init__(self):
+        super().__init__(agent_key="shubham")
 
-    async def generate_feature(self, spec: str, project_id: int) -> str:
+    async def generate_feature(self, spec: str, ctx: Optional[AgentContext] = None) -> str:
         """
         PURPOSE: Write code based on a spec.
         """
-        prompt = f"""
+        response = await self.run(user_input=self._feature_prompt(spec), ctx=ctx)
+        return response
+
+    async def stream_feature_blocks(self, spec: str, ctx: Optional[AgentContext] = None) -> AsyncIterator[CodeBlock]:
+        """
+        PURPOSE: generate_feature(), streamed - yields each code block (language + FILE path)
+                 as soon as its closing fence arrives, while the rest is still generating.
+        """
+        stream = await self.run_stream(user_input=self._feature_prompt(spec), ctx=ctx)
+        async for block in iter_code_blocks(stream):
+            yield block
+
+    @staticmethod
+    def _feature_prompt(spec: str) -> str:
+        return f"""
         SPECIFICATION: {spec}
         
         TASK: Write the code for this feature.
@@ -29,24 +43,12 @@ class Shubham(BaseAgent):
         1. Include file paths in comments (e.g., # FILE: app.py)
         2. Write full implementations, no placeholders.
         """
-        
-        response = await self.run(user_input=prompt, project_id=project_id)
-        return response
 
-    def extract_code_blocks(self, text: str) -> List[Dict[str, str]]:
+    def extract_code_blocks(self, text: str) -> List[Dict[str, Any]]:
         """
         PURPOSE: Helper to parse the AI response and separate code from chat.
-        RETURNS: List of dicts {'language': 'python', 'code': '...'}
+        RETURNS: List of dicts {'language': 'python', 'code': '...', 'path': 'app.py' or None,
+                 'complete': False if the response ended before the block's closing fence}
+        NOTE: For streamed responses use CodeBlockExtractor / stream_feature_blocks instead.
         """
-        # Regex to find ```python ... ``` blocks
-        pattern = r"```(\w+)\n(.*?)```"
-        matches = re.findall(pattern, text, re.DOTALL)
-        
-        extracted = []
-        for lang, code in matches:
-            extracted.append({
-                "language": lang,
-                "code": code.strip()
-            })
-            
-        return extracted
\ No newline at end of file
+        return [block.as_dict() for block in CodeBlockExtractor.extract(text)]
\ No newline at end of file
@@ -3,22 +3,23 @@ FILE: leadership.py
 PATH: yugnex/backend/agents/leadership.py
 PURPOSE: Implements Advait (Tech Lead) with specific architecture logic.
 USAGE:
-    advait = Advait(db)
-    plan = await advait.create_architecture_plan("Build a CRM")
+    advait = AgentRegistry.get_agent("advait")
+    plan = await advait.create_architecture_plan("Build a CRM", AgentContext(db=db, project_id=1))
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from agents.base import BaseAgent
+from agents.context import AgentContext
 
 class Advait(BaseAgent):
     """
     ROLE: Tech Lead
     FOCUS: Architecture, Tech Stack, Feasibility
     """
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, agent_key="advait")
+    def __init__(self):
+        super().__init__(agent_key="advait")
 
-    async def create_architecture_plan(self, requirement_summary: str, project_id: int) -> str:
+    async def create_architecture_plan(self, requirement_summary: str, ctx: Optional[AgentContext] = None) -> str:
         """
         PURPOSE: specific method to generate a structured tech plan.
         """
@@ -36,7 +37,7 @@ class Advait(BaseAgent):
         
         response = await self.run(
             user_input=prompt,
-            project_id=project_id,
+            ctx=ctx,
             # Force complexity to high to trigger Claude via Router
             # (Note: BaseAgent passes this to Router)
         )
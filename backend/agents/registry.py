@@ -1,16 +1,19 @@
 """
 FILE: registry.py
 PATH: yugnex/backend/agents/registry.py
-PURPOSE: Central factory to load agents dynamically.
+PURPOSE: Central registry of the process-wide agent instances.
 WORKING:
     1. Maps string keys ('advait') to Classes (Advait).
-    2. Provides a 'get_agent' factory method.
+    2. Builds each agent once (at startup via preload(), or on first use) and hands the same
+       instance to every request - no router / prompt setup per call.
+    3. Agents are stateless: per-request state (DB session, project, conversation) is passed
+       to each call as an AgentContext.
 USAGE:
-    agent = AgentRegistry.get_agent("advait", db_session)
+    agent = AgentRegistry.get_agent("advait")
+    response = await agent.run("Design the schema", AgentContext(db=db_session, project_id=1))
 """
 
-from typing import Dict, Type
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Type
 
 # Import all agents
 from core.tilotma import Tilotma
@@ -30,18 +33,36 @@ class AgentRegistry:
         "navya": Navya
     }
 
+    # Process-wide instances, keyed like AGENTS
+    _instances: Dict[str, BaseAgent] = {}
+
     @staticmethod
-    def get_agent(agent_key: str, db: AsyncSession) -> BaseAgent:
+    def get_agent(agent_key: str) -> BaseAgent:
         """
-        PURPOSE: Factory method to instantiate an agent by name.
-        PARAMS: agent_key (str), db (AsyncSession)
+        PURPOSE: Return the shared instance of an agent by name (built on first use).
+        PARAMS: agent_key (str)
         RETURNS: Instance of the requested Agent.
         RAISES: ValueError if agent_key is unknown.
         """
-        agent_cls = AgentRegistry.AGENTS.get(agent_key.lower())
+        key = agent_key.lower()
+        agent = AgentRegistry._instances.get(key)
+        if agent is not None:
+            return agent
+
+        agent_cls = AgentRegistry.AGENTS.get(key)
         
         if not agent_cls:
             valid_keys = list(AgentRegistry.AGENTS.keys())
             raise ValueError(f"Unknown agent: '{agent_key}'. Valid agents: {valid_keys}")
             
-        return agent_cls(db)
\ No newline at end of file
+        # No await between the check and the insert, so concurrent requests get the same instance
+        agent = AgentRegistry._instances[key] = agent_cls()
+        return agent
+
+    @staticmethod
+    def preload() -> List[str]:
+        """
+        PURPOSE: Build every agent up front (app startup) so no request pays for it.
+        RETURNS: The agent keys.
+        """
+        return [AgentRegistry.get_agent(key).agent_key for key in AgentRegistry.AGENTS]
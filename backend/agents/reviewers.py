@@ -2,24 +2,387 @@
 FILE: reviewers.py
 PATH: yugnex/backend/agents/reviewers.py
 PURPOSE: Implements Navya (Reviewer) with QA logic.
+WORKING:
+    1. review_code: one prompt for one snippet.
+    2. review_changes: large / multi-file changes are split per file or top-level symbol
+       (services/code_chunks.py) and the chunks are reviewed concurrently
+       (REVIEW_MAX_CONCURRENCY); small chunks go to the fast model. The per-chunk verdicts
+       are aggregated into one verdict with the reason, so review time follows the largest
+       chunk rather than the whole diff.
+       With REVIEW_CACHE_ENABLED only changed hunks are sent, packed per file up to
+       REVIEW_CHUNK_MAX_TOKENS (one call per file unless it is large); findings for
+       unchanged files and hunks come from the content-hash review cache
+       (services/review_cache.py).
+    3. review_project_batch: offline re-review of many files through a provider batch job.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
 from agents.base import BaseAgent
+from agents.context import AgentContext
+from config.settings import settings
+from core.batch import BatchResult
+from core.model_manager import ModelResult
+from core.prompt_registry import get_prompt_registry
+from core.tokens import estimate_tokens
+from services.code_chunks import CodeChunk, content_hash, has_code, split_by_file, split_for_review, split_hunks
+from services.review_cache import ReviewCache, get_review_cache
+
+logger = logging.getLogger(__name__)
+
+VERDICT_APPROVED = "approved"
+VERDICT_REJECTED = "rejected"
+VERDICT_AMBIGUOUS = "ambiguous"
+VERDICT_ERROR = "error"  # The chunk could not be reviewed
+
+# Start of a hunk's findings when several changed hunks share one review call
+_HUNK_SECTION = re.compile(r"^\W*HUNK\s+(\d+)\b", re.IGNORECASE | re.MULTILINE)
+
+
+def _first_line(hunk: str) -> str:
+    line = next((line.strip() for line in hunk.split("\n") if has_code(line) and not line.lstrip().startswith("@")), "")
+    return line[:60]
+
+
+@dataclass(frozen=True)
+class PendingHunk:
+    slot: int  # Index of the hunk's review in the report
+    label: str
+    code: str
+    surrounding: str  # Unchanged lines around it ("" when none)
+    key: str  # Review-cache key
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.code)
+
+
+@dataclass
+class ChunkReview:
+    label: str
+    verdict: str
+    text: str = ""
+    model: Optional[str] = None
+    tokens: int = 0  # Size of the reviewed chunk
+    cached: bool = False  # Findings reused from an earlier review of identical code
+
+
+@dataclass
+class ReviewReport:
+    verdict: str
+    reason: str
+    chunks: List[ChunkReview] = field(default_factory=list)
+    results: List[ModelResult] = field(default_factory=list)
+
+    @property
+    def reused_tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.chunks if chunk.cached)
+
+    @property
+    def reviewed_tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.chunks if not chunk.cached)
+
+    @property
+    def reuse_summary(self) -> str:
+        reused = [chunk for chunk in self.chunks if chunk.cached]
+        return (
+            f"reused findings for {len(reused)} of {len(self.chunks)} part(s) ({self.reused_tokens} tokens), "
+            f"re-reviewed {len(self.chunks) - len(reused)} ({self.reviewed_tokens} tokens)"
+        )
+
+    @property
+    def text(self) -> str:
+        """
+        PURPOSE: Merged findings - overall verdict first, then each chunk (changes requested first).
+        """
+        order = {VERDICT_REJECTED: 0, VERDICT_ERROR: 1, VERDICT_AMBIGUOUS: 2, VERDICT_APPROVED: 3}
+        sections = [f"OVERALL VERDICT: {self.verdict.upper()} - {self.reason}\nReview scope: {self.reuse_summary}"]
+        for chunk in sorted(self.chunks, key=lambda c: order.get(c.verdict, 4)):
+            status = f"{chunk.verdict.upper()}, cached" if chunk.cached else chunk.verdict.upper()
+            sections.append(f"=== {chunk.label} [{status}] ===\n{chunk.text.strip()}")
+        return "\n\n".join(sections)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(result.total_tokens for result in self.results)
 
 class Navya(BaseAgent):
     """
     ROLE: Code Reviewer
     FOCUS: QA, Security, Best Practices
     """
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, agent_key="navya")
+    def __init__(self):
+        super().__init__(agent_key="navya")
+        self.review_cache = get_review_cache()
 
-    async def review_code(self, code_snippet: str, context: str, project_id: int) -> str:
+    async def review_code(self, code_snippet: str, context: str, ctx: Optional[AgentContext] = None) -> str:
         """
         PURPOSE: Review a specific piece of code.
         """
-        prompt = f"""
+        return await self.run(user_input=self._review_prompt(code_snippet, context), ctx=ctx)
+
+    async def review_changes(
+        self,
+        code: str,
+        context: str,
+        ctx: Optional[AgentContext] = None,
+        concurrency: Optional[int] = None,
+        incremental: Optional[bool] = None
+    ) -> ReviewReport:
+        """
+        PURPOSE: Review a large or multi-file change as concurrently reviewed chunks.
+        WORKING:
+            1. Recall project memory once (chunk calls run concurrently and must not share
+               the DB session).
+            2. Incremental (REVIEW_CACHE_ENABLED): split every file into hunks (top-level
+               definitions); reuse cached findings for unchanged files / hunks and send only
+               the changed hunks, with a few unchanged lines around them as context, packed
+               per file up to REVIEW_CHUNK_MAX_TOKENS.
+               Otherwise: split per file / top-level symbol (at most REVIEW_CHUNK_MAX_TOKENS).
+            3. Review with bounded parallelism; chunks up to REVIEW_SMALL_CHUNK_TOKENS go to
+               the fast model.
+            4. Aggregate the verdicts (see aggregate_verdicts).
+        RETURNS: ReviewReport ('.verdict', '.reason', merged findings in '.text',
+                 reused vs. re-reviewed counts).
+        """
+        ctx = ctx or AgentContext()
+        incremental = settings.REVIEW_CACHE_ENABLED if incremental is None else incremental
+        memory = await ctx.recall_memory()
+        shared_context = f"{context}\n{memory}".strip()
+
+        if incremental:
+            scope = ReviewCache.scope(context, ctx.project_id)
+            return await self._review_incremental(code, shared_context, scope, ctx, concurrency)
+
+        chunks = split_for_review(code, settings.REVIEW_CHUNK_MAX_TOKENS)
+        outcomes = await self._review_chunks(chunks, [""] * len(chunks), shared_context, ctx, concurrency)
+        return self._report([review for review, _ in outcomes], [result for _, result in outcomes if result is not None])
+
+    async def _review_incremental(
+        self,
+        code: str,
+        shared_context: str,
+        scope: str,
+        ctx: AgentContext,
+        concurrency: Optional[int]
+    ) -> ReviewReport:
+        """
+        PURPOSE: review_changes() sending only hunks without cached findings.
+        NOTE: 'scope' (project + review context, see ReviewCache.scope) is part of every key.
+              Findings are cached per hunk, but the changed hunks of a file are packed into
+              as few calls as REVIEW_CHUNK_MAX_TOKENS allows (persona and context are sent
+              once per call, not once per hunk).
+        """
+        cache = self.review_cache
+        prompt = get_prompt_registry().get(self.agent_key)
+        version = prompt.sha256 if prompt else "default"
+        context_lines = settings.REVIEW_HUNK_CONTEXT_LINES
+        max_tokens = settings.REVIEW_CHUNK_MAX_TOKENS
+
+        # 1. Look up every file, then every hunk of the files that changed
+        slots: List[Optional[ChunkReview]] = []  # Final review per hunk, in input order
+        packs = []  # (path, [PendingHunk, ...]) - changed hunks sharing one review call
+        files = []  # (file key, slots of its hunks)
+        for path, text in split_by_file(code):
+            hunks = split_hunks(text, max_tokens)
+            labels = [path if len(hunks) == 1 else f"{path} :: {_first_line(hunk)}" for hunk in hunks]
+            file_key = ReviewCache.make_key("file", content_hash(text), version, scope)
+            cached_file = cache.get(file_key)
+            if cached_file is not None and len(cached_file) == len(hunks):
+                slots.extend(replace(review, label=label, cached=True) for review, label in zip(cached_file, labels))
+                continue
+
+            indexes, pending = [], []
+            for index, (hunk, label) in enumerate(zip(hunks, labels)):
+                hunk_key = ReviewCache.make_key("hunk", content_hash(hunk), version, scope)
+                cached = cache.get(hunk_key)
+                indexes.append(len(slots))
+                if cached is not None:
+                    slots.append(replace(cached, label=label, cached=True))
+                    continue
+                before = hunks[index - 1].split("\n")[-context_lines:] if index > 0 and context_lines else []
+                after = hunks[index + 1].split("\n")[:context_lines] if index + 1 < len(hunks) and context_lines else []
+                surrounding = ""
+                if before or after:
+                    surrounding = (
+                        "SURROUNDING CODE (unchanged, already reviewed - for reference only):\n"
+                        + "\n".join(before) + "\n[... CODE TO REVIEW ...]\n" + "\n".join(after)
+                    )
+                pending.append(PendingHunk(len(slots), label, hunk, surrounding, hunk_key))
+                slots.append(None)
+            file_packs = self._pack_hunks(pending, max_tokens)
+            for n, pack in enumerate(file_packs, 1):
+                packs.append((path if len(file_packs) == 1 else f"{path} (part {n}/{len(file_packs)})", pack))
+            files.append((file_key, indexes))
+
+        # 2. Review what changed (one call per pack), then spread the findings over its hunks
+        requests = [self._pack_request(path, pack) for path, pack in packs]
+        outcomes = await self._review_chunks(
+            [chunk for chunk, _ in requests], [note for _, note in requests], shared_context, ctx, concurrency
+        )
+        unsettled = set()  # Slots whose findings were not cached (failed or not attributable)
+        for (_, pack), (review, _) in zip(packs, outcomes):
+            for hunk, (hunk_review, cacheable) in zip(pack, self._split_pack_review(pack, review)):
+                slots[hunk.slot] = hunk_review
+                if cacheable:
+                    cache.put(hunk.key, hunk_review)
+                else:
+                    unsettled.add(hunk.slot)
+
+        # 3. Remember whole files whose every hunk now has cached findings
+        for file_key, indexes in files:
+            reviews = [slots[i] for i in indexes]
+            if not unsettled.intersection(indexes):
+                cache.put(file_key, [replace(review, cached=False) for review in reviews])
+
+        report = self._report(slots, [result for _, result in outcomes if result is not None])
+        cache.record(report.reused_tokens, report.reviewed_tokens)
+        logger.info(f"Navya review: {report.reuse_summary}")
+        return report
+
+    async def _review_chunks(
+        self,
+        chunks: List[CodeChunk],
+        notes: List[str],
+        shared_context: str,
+        ctx: AgentContext,
+        concurrency: Optional[int]
+    ) -> List[tuple]:
+        """
+        PURPOSE: Review chunks concurrently (bounded); a failed chunk gets VERDICT_ERROR.
+        RETURNS: (ChunkReview, ModelResult or None) per chunk, in order.
+        """
+        chunk_ctx = replace(ctx, db=None)
+        semaphore = asyncio.Semaphore(max(1, concurrency or settings.REVIEW_MAX_CONCURRENCY))
+
+        async def review_chunk(index: int, chunk: CodeChunk, note: str):
+            part = f"PART {index + 1}/{len(chunks)}: {chunk.label} (the other parts are reviewed separately)"
+            small = chunk.tokens <= settings.REVIEW_SMALL_CHUNK_TOKENS
+            async with semaphore:
+                try:
+                    result = await self.invoke(
+                        user_input=self._review_prompt(chunk.code, "\n".join(filter(None, [shared_context, part, note]))),
+                        ctx=chunk_ctx,
+                        task_type="code_review",
+                        complexity="low" if small else "medium",
+                        requires_speed=small
+                    )
+                except Exception as e:
+                    logger.warning(f"Review of {chunk.label} failed: {e}")
+                    return ChunkReview(chunk.label, VERDICT_ERROR, text=f"(Not reviewed: {e})", tokens=chunk.tokens), None
+            return ChunkReview(chunk.label, self.parse_verdict(result.text), result.text, result.model, chunk.tokens), result
+
+        if chunks:
+            logger.info(f"Navya reviewing {len(chunks)} chunk(s) of {sum(c.tokens for c in chunks)} tokens")
+        return list(await asyncio.gather(*[review_chunk(i, chunk, note) for i, (chunk, note) in enumerate(zip(chunks, notes))]))
+
+    @staticmethod
+    def _pack_hunks(pending: List[PendingHunk], max_tokens: int) -> List[List[PendingHunk]]:
+        """
+        PURPOSE: Group consecutive changed hunks of one file into packs of at most max_tokens
+                 (a hunk is never split; one over the limit gets a pack of its own).
+        """
+        packs, current, current_tokens = [], [], 0
+        for hunk in pending:
+            if current and current_tokens + hunk.tokens > max_tokens:
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(hunk)
+            current_tokens += hunk.tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    @staticmethod
+    def _pack_request(path: str, pack: List[PendingHunk]) -> tuple:
+        """
+        PURPOSE: (CodeChunk, note) for one review call over the hunks of a pack.
+        """
+        if len(pack) == 1:
+            hunk = pack[0]
+            return CodeChunk(hunk.label, hunk.code, estimate_tokens(hunk.code)), hunk.surrounding
+        code = "\n\n".join(
+            "\n".join(filter(None, [f"### HUNK {n}: {hunk.label}", hunk.code, hunk.surrounding]))
+            for n, hunk in enumerate(pack, 1)
+        )
+        note = (
+            f"This part holds {len(pack)} separately reviewed hunks. Give the findings per hunk: "
+            f"start each with '### HUNK <n>' and its own [APPROVE] or [REQUEST CHANGES]."
+        )
+        return CodeChunk(path, code, sum(estimate_tokens(hunk.code) for hunk in pack)), note
+
+    def _split_pack_review(self, pack: List[PendingHunk], review: ChunkReview) -> List[tuple]:
+        """
+        PURPOSE: (ChunkReview, cacheable) per hunk of a pack from the pack's review.
+        NOTE: A hunk without its own '### HUNK n' section takes the pack's verdict; that is
+              only cached when the whole pack was approved (a rejection that does not say
+              which hunk it is about is re-reviewed next time).
+        """
+        if len(pack) == 1:
+            return [(replace(review, label=pack[0].label, tokens=pack[0].tokens), review.verdict != VERDICT_ERROR)]
+        marks = list(_HUNK_SECTION.finditer(review.text)) if review.verdict != VERDICT_ERROR else []
+        sections = {}
+        for mark, following in zip(marks, marks[1:] + [None]):
+            sections[int(mark.group(1))] = review.text[mark.start():following.start() if following else len(review.text)].strip()
+
+        reviews = []
+        for n, hunk in enumerate(pack, 1):
+            if n in sections:
+                verdict = self.parse_verdict(sections[n])
+                reviews.append((ChunkReview(hunk.label, verdict, sections[n], review.model, hunk.tokens), True))
+            else:
+                reviews.append((replace(review, label=hunk.label, tokens=hunk.tokens), review.verdict == VERDICT_APPROVED))
+        return reviews
+
+    def _report(self, reviews: List[ChunkReview], results: List[ModelResult]) -> ReviewReport:
+        verdict, reason = self.aggregate_verdicts(reviews)
+        return ReviewReport(verdict, reason, reviews, results)
+
+    @staticmethod
+    def aggregate_verdicts(reviews: List[ChunkReview]) -> tuple[str, str]:
+        """
+        PURPOSE: One verdict for the whole change, with the reason.
+        RULES:
+            - Any chunk requesting changes -> rejected (names those chunks).
+            - Else any chunk unreviewed or without a clear verdict -> ambiguous.
+            - Else (every chunk approved) -> approved.
+        """
+        if not reviews:
+            return VERDICT_AMBIGUOUS, "Nothing to review."
+        by_verdict: Dict[str, List[str]] = {}
+        for review in reviews:
+            by_verdict.setdefault(review.verdict, []).append(review.label)
+
+        if VERDICT_REJECTED in by_verdict:
+            labels = by_verdict[VERDICT_REJECTED]
+            return VERDICT_REJECTED, f"Changes requested in {len(labels)} of {len(reviews)} part(s): {', '.join(labels)}."
+        unclear = by_verdict.get(VERDICT_ERROR, []) + by_verdict.get(VERDICT_AMBIGUOUS, [])
+        if unclear:
+            return VERDICT_AMBIGUOUS, f"No clear verdict for {len(unclear)} of {len(reviews)} part(s): {', '.join(unclear)}."
+        return VERDICT_APPROVED, f"All {len(reviews)} part(s) approved."
+
+    async def review_project_batch(
+        self, files: Dict[str, str], context: str, ctx: Optional[AgentContext] = None
+    ) -> Dict[str, BatchResult]:
+        """
+        PURPOSE: Re-review many files as one batch job (offline; batch pricing).
+        PARAMS: files (Dict[str, str]): file path -> code.
+        RETURNS: file path -> BatchResult (use parse_verdict on result.text).
+        """
+        paths = list(files)
+        results = await self.run_batch(
+            [self._review_prompt(files[path], context) for path in paths],
+            ctx=ctx,
+            specific_claude_model="claude-sonnet-4-5",
+        )
+        return dict(zip(paths, results))
+
+    @staticmethod
+    def _review_prompt(code_snippet: str, context: str) -> str:
+        return f"""
         CONTEXT: {context}
         CODE TO REVIEW:
         {code_snippet}
@@ -31,8 +394,6 @@ class Navya(BaseAgent):
         
         FINAL VERDICT: Start your response with either [APPROVE] or [REQUEST CHANGES].
         """
-        
-        return await self.run(user_input=prompt, project_id=project_id)
 
     def parse_verdict(self, review_text: str) -> str:
         """
@@ -40,8 +401,8 @@ class Navya(BaseAgent):
         """
         upper_text = review_text.upper()
         if "[APPROVE]" in upper_text:
-            return "approved"
+            return VERDICT_APPROVED
         elif "[REQUEST CHANGES]" in upper_text or "REQUEST CHANGES" in upper_text:
-            return "rejected"
+            return VERDICT_REJECTED
         else:
-            return "ambiguous"
\ No newline at end of file
+            return VERDICT_AMBIGUOUS
\ No newline at end of file
@@ -7,7 +7,10 @@ PURPOSE: The entry point for the FastAPI application.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
-from api.routes import auth, chat, projects, agents
+from core.model_manager import init_model_manager, close_model_manager
+from core.prompt_registry import get_prompt_registry
+from agents.registry import AgentRegistry
+from api.routes import auth, chat, projects, agents, metrics
 
 # Initialize App
 app = FastAPI(
@@ -40,6 +43,7 @@ app.include_router(auth, prefix="/api")
 app.include_router(projects, prefix="/api")
 app.include_router(chat, prefix="/api")
 app.include_router(agents, prefix="/api")
+app.include_router(metrics, prefix="/api")
 
 # Root Endpoint (Health Check)
 @app.get("/health")
@@ -52,8 +56,15 @@ async def health_check():
 # Startup Event
 @app.on_event("startup")
 async def startup_db_client():
-    pass
+    # Build the shared ModelManager once so requests never pay client construction
+    init_model_manager()
+    # Load every agent prompt once (no disk reads per request) and watch for edits
+    get_prompt_registry().start_watching()
+    # Build the agents once; requests share them and pass their own AgentContext
+    AgentRegistry.preload()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    pass
\ No newline at end of file
+    # Close the shared provider connection pools
+    await close_model_manager()
+    await get_prompt_registry().stop_watching()
\ No newline at end of file
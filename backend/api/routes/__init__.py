@@ -8,5 +8,6 @@ from .auth import router as auth
 from .projects import router as projects
 from .chat import router as chat
 from .agents import router as agents
+from .metrics import router as metrics
 
-__all__ = ["auth", "projects", "chat", "agents"]
\ No newline at end of file
+__all__ = ["auth", "projects", "chat", "agents", "metrics"]
\ No newline at end of file
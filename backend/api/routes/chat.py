@@ -2,24 +2,65 @@
 FILE: chat.py
 PATH: yugnex/backend/api/routes/chat.py
 PURPOSE: Manage chat conversations.
+WORKING:
+    1. POST /conversations: Start a conversation.
+    2. GET /conversations: List the user's conversations.
+    3. POST /conversations/{id}/messages: Send a message and wait for the agent's full reply.
+    4. POST /conversations/{id}/stream: Send a message and stream the agent's reply (SSE).
+    5. Both cancel the agent's work (and the provider request) when the client disconnects.
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 
-from database.connection import get_db
+from database.connection import get_db, AsyncSessionLocal
 from database.models import User, Conversation
 from api.middleware.auth_middleware import get_current_user
+from agents.context import AgentContext
+from agents.registry import AgentRegistry
+from core.cancellation import ClientDisconnectedError, get_cancellation_stats, run_until_disconnected
+from core.deadline import request_deadline
+from memory.conversation import ConversationManager
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/conversations", tags=["Chat"])
 
+# Non-standard "client closed request" status (the client never sees it)
+HTTP_CLIENT_CLOSED_REQUEST = 499
+
 class ConversationCreate(BaseModel):
     project_id: int = None
     title: str = "New Chat"
 
+class MessageSend(BaseModel):
+    message: str
+    agent_key: str = "tilotma"
+    context_files: Optional[str] = None
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    """
+    PURPOSE: Format one Server-Sent Event frame.
+    """
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+async def _get_owned_conversation(conversation_id: int, user: User, db: AsyncSession) -> Conversation:
+    """
+    PURPOSE: Load a conversation, 404 if it doesn't exist or belongs to another user.
+    """
+    conversation = await db.get(Conversation, conversation_id)
+    if not conversation or conversation.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return conversation
+
 @router.post("/", response_model=dict)
 async def start_conversation(
     conv_in: ConversationCreate,
@@ -43,4 +84,112 @@ async def get_conversations(
 ):
     result = await db.execute(select(Conversation).where(Conversation.user_id == current_user.id))
     chats = result.scalars().all()
-    return [{"id": c.id, "title": c.title, "created_at": c.created_at} for c in chats]
\ No newline at end of file
+    return [{"id": c.id, "title": c.title, "created_at": c.created_at} for c in chats]
+
+@router.post("/{conversation_id}/messages", response_model=dict)
+async def send_message(
+    conversation_id: int,
+    msg_in: MessageSend,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    PURPOSE: Send a message and return the agent's full reply.
+    FLOW: Save user message -> Run agent (cancelled if the client disconnects) -> Save reply.
+    """
+    deadline = request_deadline()
+    conversation = await _get_owned_conversation(conversation_id, current_user, db)
+
+    try:
+        agent = AgentRegistry.get_agent(msg_in.agent_key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    ctx = AgentContext(db=db, project_id=conversation.project_id, conversation_id=conversation_id, deadline=deadline)
+
+    conversations = ConversationManager(db)
+    await conversations.add_message(conversation_id=conversation_id, role="user", content=msg_in.message)
+    try:
+        result = await run_until_disconnected(
+            request,
+            agent.invoke(user_input=msg_in.message, ctx=ctx, context_files=msg_in.context_files),
+            endpoint="messages"
+        )
+    except ClientDisconnectedError:
+        return Response(status_code=HTTP_CLIENT_CLOSED_REQUEST)
+
+    saved = await conversations.add_message(
+        conversation_id=conversation_id,
+        role="assistant",
+        content=result.text,
+        agent_key=agent.agent_key,
+        result=result
+    )
+    return {
+        "message_id": saved.id,
+        "agent_key": agent.agent_key,
+        "response": result.text,
+        "model": result.model,
+        "tokens_used": saved.tokens_used,
+    }
+
+@router.post("/{conversation_id}/stream")
+async def stream_message(
+    conversation_id: int,
+    msg_in: MessageSend,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    PURPOSE: Send a message and stream the agent's reply as Server-Sent Events.
+    FLOW: Save user message -> Stream tokens ('delta' events) -> Save full reply -> 'done' event.
+    NOTE: The request deadline (REQUEST_DEADLINE_SECONDS) starts here and bounds the whole
+          model call, retries and fallback included.
+          If the client disconnects, Starlette cancels the response task; the cancellation
+          reaches the provider stream and nothing is persisted.
+    """
+    deadline = request_deadline()
+    conversation = await _get_owned_conversation(conversation_id, current_user, db)
+
+    try:
+        agent = AgentRegistry.get_agent(msg_in.agent_key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    ctx = AgentContext(db=db, project_id=conversation.project_id, conversation_id=conversation_id, deadline=deadline)
+
+    # 1. Save the user's message and build the agent stream (memory recall happens here,
+    #    while the request's DB session is still open)
+    await ConversationManager(db).add_message(conversation_id=conversation_id, role="user", content=msg_in.message)
+    stream = await agent.run_stream(user_input=msg_in.message, ctx=ctx, context_files=msg_in.context_files)
+
+    async def event_source():
+        # 2. Forward tokens as soon as they arrive
+        try:
+            async for delta in stream:
+                yield _sse({"delta": delta})
+        except asyncio.CancelledError:
+            get_cancellation_stats().record_request("stream")
+            logger.info(f"Client disconnected from conversation {conversation_id} stream; generation cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Stream failed for conversation {conversation_id}: {e}")
+            yield _sse({"detail": "The AI provider failed while generating the reply."}, event="error")
+            return
+
+        # 3. Persist the full reply once the stream completes
+        # (own session: the request-scoped one is closed once the response starts)
+        async with AsyncSessionLocal() as session:
+            saved = await ConversationManager(session).add_message(
+                conversation_id=conversation_id,
+                role="assistant",
+                content=stream.text,
+                agent_key=agent.agent_key,
+                result=stream.result()
+            )
+        yield _sse({"message_id": saved.id, "model": stream.model, "tokens_used": saved.tokens_used}, event="done")
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
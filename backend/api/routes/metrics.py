@@ -0,0 +1,40 @@
+"""
+FILE: metrics.py
+PATH: yugnex/backend/api/routes/metrics.py
+PURPOSE: Expose runtime metrics of the AI layer (caches, providers).
+USAGE:
+    GET /api/metrics
+"""
+
+from fastapi import APIRouter
+
+from core.cancellation import get_cancellation_stats
+from core.model_manager import get_model_manager
+from core.prompt_registry import get_prompt_registry
+from services.response_cache import get_response_cache
+from services.similarity_cache import get_similarity_cache
+from services.model_scoreboard import get_model_scoreboard
+from services.circuit_breaker import get_circuit_breakers
+from services.single_flight import get_single_flight
+from services.context_budget import get_context_budget
+from services.review_cache import get_review_cache
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/")
+async def get_metrics():
+    """
+    PURPOSE: Snapshot of cache hit rates and provider health.
+    """
+    return {
+        "response_cache": get_response_cache().stats(),
+        "similarity_cache": get_similarity_cache().stats(),
+        "models": get_model_scoreboard().stats(),
+        "circuit_breakers": get_circuit_breakers().stats(),
+        "single_flight": get_single_flight().stats(),
+        "context_budget": get_context_budget().stats(),
+        "model_manager": get_model_manager().stats(),
+        "cancellations": get_cancellation_stats().stats(),
+        "prompts": get_prompt_registry().stats(),
+        "review_cache": get_review_cache().stats(),
+    }
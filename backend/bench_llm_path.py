@@ -0,0 +1,79 @@
+"""
+FILE: bench_llm_path.py
+PATH: backend/bench_llm_path.py
+PURPOSE: Offline throughput / latency benchmark of the agent -> router -> ModelManager path.
+WORKING:
+    1. Forces LLM_PROVIDER_MODE (default "simulate") so no API key or network is needed.
+    2. Fires N requests at an agent with the given concurrency.
+    3. Prints throughput, latency percentiles and the scheduler / cache metrics.
+USAGE:
+    python bench_llm_path.py --requests 200 --concurrency 20
+    python bench_llm_path.py --mode replay --agent navya   # Serve recordings made with LLM_PROVIDER_MODE=record
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config.settings import settings
+
+
+async def run_benchmark(agent_key: str, total: int, concurrency: int, distinct: int) -> None:
+    from agents.registry import AgentRegistry
+    from core.model_manager import get_model_manager
+    from services.response_cache import get_response_cache
+
+    agent = AgentRegistry.get_agent(agent_key)  # No AgentContext -> no DB access
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await agent.run(user_input=f"Benchmark request #{index % distinct}: outline a login API.")
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(total)])
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies) or [0.0]
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    print("=" * 60)
+    print(f"Mode: {settings.LLM_PROVIDER_MODE} | agent: {agent_key} | {total} requests @ {concurrency} concurrent")
+    print(f"Throughput: {total / elapsed:.1f} req/s ({elapsed:.2f}s total), errors: {errors}")
+    print(f"Latency p50={pct(0.5):.3f}s p90={pct(0.9):.3f}s p99={pct(0.99):.3f}s")
+    print("=" * 60)
+    print(json.dumps({
+        "model_manager": get_model_manager().stats(),
+        "response_cache": get_response_cache().stats(),
+    }, indent=2, default=str))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", default="simulate", choices=["simulate", "replay"])
+    parser.add_argument("--agent", default="tilotma")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--distinct", type=int, default=1000, help="Distinct prompts (lower = more cache hits)")
+    args = parser.parse_args()
+
+    settings.LLM_PROVIDER_MODE = args.mode
+    asyncio.run(run_benchmark(args.agent, args.requests, args.concurrency, args.distinct))
+
+
+if __name__ == "__main__":
+    main()
@@ -59,8 +59,112 @@ class Settings(BaseSettings):
         return v
     
     # Feature Flags
-    ENABLE_GEMINI_FALLBACK: bool = True
-    AUTO_SWITCH_ON_RATE_LIMIT: bool = True
+    ENABLE_GEMINI_FALLBACK: bool = True  # Use Gemini when Claude fails / is rate limited
+    AUTO_SWITCH_ON_RATE_LIMIT: bool = True  # Switch provider before a call when its budget is exhausted
+    
+    # Client-side Rate Limits (per model; synced from provider headers at runtime)
+    RATE_LIMIT_CLAUDE_RPM: int = 50
+    RATE_LIMIT_CLAUDE_TPM: int = 30000  # Input tokens per minute
+    RATE_LIMIT_GEMINI_RPM: int = 150
+    RATE_LIMIT_GEMINI_TPM: int = 2000000
+    RATE_LIMIT_OVERRIDES: Optional[str] = None  # JSON: {"claude-opus-4-5": {"rpm": 50, "tpm": 30000}}
+    
+    # LLM Provider Mode: "live", "record" (save request/response pairs),
+    # "replay" (serve recordings, synthetic text if missing) or "simulate" (synthetic only)
+    LLM_PROVIDER_MODE: str = "live"
+    LLM_RECORDINGS_DIR: str = "recordings/llm"
+    LLM_SIM_TTFT_SECONDS: float = 0.5  # Median time to first token
+    LLM_SIM_TTFT_JITTER: float = 0.3  # Lognormal sigma (0 = constant)
+    LLM_SIM_TOKENS_PER_SECOND: float = 60.0
+    LLM_SIM_ERROR_RATE: float = 0.0  # Fraction of calls failing with a simulated 529
+    LLM_SIM_OUTPUT_TOKENS: int = 200  # Length of synthetic responses
+    LLM_SIM_SEED: Optional[int] = None
+    
+    # Request Deadline & Model Call Retries (the deadline starts when the HTTP request arrives)
+    REQUEST_DEADLINE_SECONDS: Optional[float] = 120.0  # Total budget; the fallback gets what is left
+    LLM_ATTEMPT_TIMEOUT_SECONDS: Optional[float] = 90.0  # One attempt once admitted (above Opus p99), capped by the time left
+    LLM_ATTEMPT_TIMEOUT_OVERRIDES: Optional[str] = None  # JSON: {"claude-haiku-4-5": 30, "claude-opus-4-5": 110}
+    LLM_MAX_ATTEMPTS: int = 3  # Per provider, retryable errors only (not 429)
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5  # Exponential backoff with full jitter
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    LLM_MIN_ATTEMPT_SECONDS: float = 2.0  # Don't retry with less time than this left after the backoff
+    DISCONNECT_POLL_SECONDS: float = 0.5  # How often non-streaming endpoints check for a client disconnect
+    
+    # Agent Prompts (loaded once from config/prompts, hot-reloaded on file change)
+    PROMPT_RELOAD_INTERVAL_SECONDS: float = 2.0  # 0 = never reload
+    
+    # Multi-agent Fan-out (Tilotma runs Advait / Saanvi / Navya in parallel, then merges)
+    TILOTMA_FANOUT_ENABLED: bool = False  # Off = Tilotma answers every turn herself
+    FANOUT_MAX_CONCURRENCY: int = 3  # Branches running at once per fan-out
+    FANOUT_BRANCH_TIMEOUT_SECONDS: Optional[float] = 60.0  # Per branch, also capped by the request deadline
+    
+    # Agent Workflows (DAG engine, agents/collaboration/workflow.py)
+    WORKFLOW_MAX_CONCURRENCY: int = 4  # Steps running at once per workflow
+    WORKFLOW_STEP_TIMEOUT_SECONDS: Optional[float] = 120.0  # Per attempt, also capped by the request deadline
+    
+    # Chunked Code Review (Navya reviews large changes per file / top-level symbol, in parallel)
+    REVIEW_CHUNK_MAX_TOKENS: int = 3000  # Larger files are split at top-level definitions
+    REVIEW_SMALL_CHUNK_TOKENS: int = 800  # Chunks up to this size are reviewed by the fast model
+    REVIEW_MAX_CONCURRENCY: int = 4  # Chunk reviews running at once
+    REVIEW_CACHE_ENABLED: bool = True  # Re-review only changed hunks, reuse findings for the rest
+    REVIEW_CACHE_MAX_ENTRIES: int = 5000
+    REVIEW_HUNK_CONTEXT_LINES: int = 3  # Unchanged lines shown around a changed hunk
+    
+    # LLM Call Scheduler (per-model concurrency, lanes: interactive > handoff > background)
+    SCHEDULER_MAX_CONCURRENCY_PER_MODEL: int = 8
+    SCHEDULER_CONCURRENCY_OVERRIDES: Optional[str] = None  # JSON: {"claude-opus-4-5": 4}
+    SCHEDULER_AGING_SECONDS: float = 10.0  # Waiting this long promotes a call by one lane
+    
+    # AI Provider Connection Pool (shared per provider, per process)
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # Seconds an idle connection is kept open
+    
+    # LLM Response Cache (exact match on model + system instruction + prompt)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    RESPONSE_CACHE_SERVE_STALE: bool = True  # Serve an expired answer if Claude AND Gemini are failing
+    RESPONSE_CACHE_MAX_STALE_SECONDS: float = 86400.0
+    
+    # Similarity Cache (near-duplicate prompts, MinHash + LSH, local only)
+    # Opt-in: set SIMILARITY_CACHE_ENABLED=true and call the router with a task_type that has a
+    # threshold ("quick_answer" / "summarization", or add one below). No agent does so today.
+    SIMILARITY_CACHE_ENABLED: bool = False
+    SIMILARITY_CACHE_MAX_ENTRIES: int = 2000
+    SIMILARITY_CACHE_THRESHOLDS: Optional[str] = None  # JSON: {"quick_answer": 0.8, "summarization": 0.85}
+    
+    # Single-flight (identical concurrent requests share one upstream call)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    
+    # Hedged Requests (requires_speed / low complexity only)
+    # "off" = plain fallback, "hedge" = fire fallback after a delay, "race" = fire both at once
+    HEDGE_MODE: str = "hedge"
+    HEDGE_DELAY_QUANTILE: float = 0.9  # Hedge delay = this latency quantile of the primary model
+    HEDGE_DEFAULT_DELAY_SECONDS: float = 2.0  # Used until HEDGE_MIN_SAMPLES latencies are recorded
+    HEDGE_MIN_SAMPLES: int = 20
+    
+    # Context-window Budget (pre-flight trimming of memory / files)
+    CONTEXT_OUTPUT_RESERVE_TOKENS: int = 4096  # Matches the clients' max_tokens
+    CONTEXT_SAFETY_MARGIN: float = 0.05  # Fraction of the window left unused (estimates are approximate)
+    CONTEXT_MAX_INPUT_TOKENS: Optional[int] = None  # Optional cap below the model's window
+    
+    # Batch Inference (bulk / offline jobs)
+    BATCH_USE_PROVIDER_API: bool = True  # Claude -> Message Batches API; False = run locally
+    BATCH_POLL_INTERVAL_SECONDS: float = 30.0
+    BATCH_LOCAL_CONCURRENCY: int = 4  # Parallel calls when a batch runs locally (Gemini / tests)
+    
+    # Adaptive Model Selection (static table = quality floor + fallback policy)
+    ADAPTIVE_ROUTING_ENABLED: bool = True
+    ADAPTIVE_ROUTING_LATENCY_SLOS: Optional[str] = None  # JSON: {"speed": 5, "low": 10, "medium": 30, "high": 60}
+    ADAPTIVE_ROUTING_LATENCY_QUANTILE: float = 0.9
+    ADAPTIVE_ROUTING_MAX_ERROR_RATE: float = 0.2
+    ADAPTIVE_ROUTING_MIN_SAMPLES: int = 20  # Below this a model is assumed to meet the SLO
+    ADAPTIVE_ROUTING_SAMPLE_MAX_AGE_SECONDS: float = 600.0  # Older scoreboard samples are forgotten
+    
+    # Circuit Breakers (per provider/model)
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive retryable failures before opening
+    CIRCUIT_BREAKER_RECOVERY_SECONDS: float = 30.0  # Open time before a half-open trial call
     
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE) if ENV_FILE.exists() else ".env",  # Use absolute path if exists, else relative
@@ -0,0 +1,136 @@
+"""
+FILE: batch.py
+PATH: yugnex/backend/core/batch.py
+PURPOSE: Bulk (non-interactive) inference through provider batch APIs.
+WORKING:
+    1. Callers hand ModelManager.submit_batch a list of BatchRequest (one per prompt).
+    2. AnthropicBatchProvider turns Claude requests into ONE Message Batches job,
+       polls until it has ended and maps every result back by custom_id.
+       Batch jobs are billed at the batch tier and do not count against the
+       interactive (Messages API) rate limits.
+    3. LocalBatchProvider runs requests through the normal invoke path with bounded
+       concurrency - used for Gemini, when the batch API is disabled, and in tests.
+    4. One failed item never fails the batch: every request gets a BatchResult
+       with either 'text' or 'error'.
+USAGE:
+    results = await get_model_manager().submit_batch([
+        BatchRequest(custom_id="file-1", model_name="claude", messages=[...]),
+    ])
+    for result in results:
+        print(result.custom_id, result.text if result.ok else result.error)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    messages: List[BaseMessage]
+    model_name: str = "claude"
+    specific_claude_model: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    model: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def to_anthropic_params(model_id: str, messages: List[BaseMessage], max_tokens: int) -> Dict[str, Any]:
+    """
+    PURPOSE: Convert LangChain messages into Messages API request params.
+    NOTE: System content may be a string or a list of text blocks (prompt-cache breakpoints kept).
+    """
+    params: Dict[str, Any] = {"model": model_id, "max_tokens": max_tokens, "messages": []}
+    for message in messages:
+        if isinstance(message, SystemMessage):
+            params["system"] = message.content
+        else:
+            role = "assistant" if isinstance(message, AIMessage) else "user"
+            params["messages"].append({"role": role, "content": message.content})
+    return params
+
+
+class AnthropicBatchProvider:
+    def __init__(self, client: Any, poll_interval: float = 30.0, max_tokens: int = 4096):
+        """
+        PURPOSE: Submit Claude requests as a Message Batch.
+        PARAMS:
+            client: anthropic.AsyncAnthropic (shared SDK client).
+            poll_interval: Seconds between status checks.
+            max_tokens: Output limit per request (same as the interactive clients).
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_tokens = max_tokens
+
+    async def run(self, items: List[tuple[str, str, List[BaseMessage]]]) -> Dict[str, BatchResult]:
+        """
+        PURPOSE: Run (custom_id, model_id, messages) items as one batch job.
+        RETURNS: custom_id -> BatchResult
+        """
+        # 1. Submit
+        batch = await self.client.messages.batches.create(requests=[
+            {"custom_id": custom_id, "params": to_anthropic_params(model_id, messages, self.max_tokens)}
+            for custom_id, model_id, messages in items
+        ])
+        logger.info(f"Submitted message batch {batch.id} with {len(items)} requests")
+
+        # 2. Poll until every request has been processed
+        while batch.processing_status != "ended":
+            await asyncio.sleep(self.poll_interval)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+
+        # 3. Map results back by custom_id
+        results: Dict[str, BatchResult] = {}
+        async for entry in await self.client.messages.batches.results(batch.id):
+            result = entry.result
+            if result.type == "succeeded":
+                text = "".join(block.text for block in result.message.content if block.type == "text")
+                results[entry.custom_id] = BatchResult(entry.custom_id, text=text, model=result.message.model)
+            else:
+                error = getattr(getattr(result, "error", None), "error", None)
+                results[entry.custom_id] = BatchResult(entry.custom_id, error=str(error or result.type))
+        logger.info(f"Message batch {batch.id} ended: {batch.request_counts}")
+        return results
+
+
+class LocalBatchProvider:
+    def __init__(self, invoke: Callable[..., Awaitable[Any]], concurrency: int = 4):
+        """
+        PURPOSE: Stand-in batch provider that calls the model request by request.
+        PARAMS:
+            invoke: Coroutine like ModelManager.invoke_model(model_name, messages, specific_claude_model),
+                    returning a ModelResult.
+            concurrency: Max requests in flight at once.
+        """
+        self.invoke = invoke
+        self.concurrency = concurrency
+
+    async def run(self, requests: List[BatchRequest]) -> Dict[str, BatchResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(request: BatchRequest) -> BatchResult:
+            async with semaphore:
+                try:
+                    result = await self.invoke(request.model_name, request.messages, request.specific_claude_model)
+                    return BatchResult(request.custom_id, text=result.text, model=result.model)
+                except Exception as e:
+                    return BatchResult(request.custom_id, error=str(e))
+
+        results = await asyncio.gather(*[run_one(request) for request in requests])
+        return {result.custom_id: result for result in results}
@@ -0,0 +1,112 @@
+"""
+FILE: cancellation.py
+PATH: yugnex/backend/core/cancellation.py
+PURPOSE: Stop LLM work nobody is waiting for any more (client closed the tab / dropped the connection).
+WORKING:
+    1. run_until_disconnected: runs an agent call as a task and polls the HTTP request for a
+       disconnect; on disconnect the task is cancelled.
+    2. Streaming responses: Starlette cancels the response task itself when the client leaves;
+       the SSE endpoint only records it.
+    3. Cancellation travels down the whole task tree - router, handoffs, hedged and parallel
+       calls, single-flight (the shared call stops when its last waiter leaves) - and ends in
+       the provider HTTP request, whose connection is closed so generation stops.
+    4. CancellationStats counts cancelled requests per endpoint and cancelled in-flight model
+       calls per model (with the input tokens they had already sent), for /api/metrics.
+USAGE:
+    try:
+        response = await run_until_disconnected(request, agent.run(user_input=text), endpoint="chat")
+    except ClientDisconnectedError:
+        return Response(status_code=499)
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ClientDisconnectedError(Exception):
+    """The client went away before the response was ready; the work was cancelled."""
+
+
+class CancellationStats:
+    def __init__(self):
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.input_tokens: Dict[str, int] = defaultdict(int)
+
+    def record_request(self, endpoint: str) -> None:
+        self.requests[endpoint] += 1
+
+    def record_call(self, model_id: str, input_tokens: int) -> None:
+        """
+        PURPOSE: A model call was cancelled while in flight (disconnect, hedge loser, deadline).
+        """
+        self.calls[model_id] += 1
+        self.input_tokens[model_id] += input_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cancelled_requests": dict(self.requests),
+            "cancelled_calls": {
+                model_id: {"calls": count, "input_tokens": self.input_tokens[model_id]}
+                for model_id, count in self.calls.items()
+            },
+        }
+
+
+async def run_until_disconnected(
+    request: Any,
+    awaitable: Awaitable[T],
+    endpoint: str,
+    poll_interval: Optional[float] = None
+) -> T:
+    """
+    PURPOSE: Await 'awaitable', cancelling it if the HTTP client disconnects first.
+    PARAMS:
+        request: Starlette Request (anything with an async 'is_disconnected()').
+        endpoint: Name used in the cancellation metrics.
+        poll_interval: Seconds between disconnect checks (defaults to DISCONNECT_POLL_SECONDS).
+    RAISES: ClientDisconnectedError once the work has been cancelled.
+    """
+    interval = settings.DISCONNECT_POLL_SECONDS if poll_interval is None else poll_interval
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                get_cancellation_stats().record_request(endpoint)
+                logger.info(f"Client disconnected from {endpoint}; cancelled the in-flight work")
+                raise ClientDisconnectedError(f"Client disconnected from {endpoint}")
+    finally:
+        # We were cancelled ourselves (e.g. server shutdown) - don't leave the work running
+        if not task.done():
+            task.cancel()
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_stats: Optional[CancellationStats] = None
+
+
+def get_cancellation_stats() -> CancellationStats:
+    """
+    PURPOSE: Return the process-wide cancellation counters.
+    """
+    global _shared_stats
+    if _shared_stats is None:
+        _shared_stats = CancellationStats()
+    return _shared_stats
@@ -0,0 +1,274 @@
+"""
+FILE: deadline.py
+PATH: yugnex/backend/core/deadline.py
+PURPOSE: Request deadlines and the retry policy for model calls (bounded total wait per request).
+WORKING:
+    1. A Deadline is created when the HTTP request arrives (REQUEST_DEADLINE_SECONDS) and
+       passed down BaseAgent.run -> AIRouter, which sets it as 'current_deadline' for the
+       ModelManager calls it makes (same pattern as the scheduler lane).
+    2. RetryPolicy runs one provider call:
+       - every attempt is capped by LLM_ATTEMPT_TIMEOUT_SECONDS (per model via
+         LLM_ATTEMPT_TIMEOUT_OVERRIDES) and by the time left on the deadline; the cap starts
+         once the attempt is admitted (scheduler slot), the queue wait only uses the deadline,
+       - retryable failures are retried with exponential backoff and full jitter,
+         but only if the backoff plus a minimal attempt still fits in the time left,
+       - 429s are not retried on the same model (the router switches provider instead).
+    3. When the deadline runs out, DeadlineExceededError (a TimeoutError) is raised.
+       The router then stops trying further providers; the fallback provider only ever
+       gets the time the primary left over. A spent deadline is the request's own budget,
+       not a provider failure, so it never counts against a circuit breaker.
+USAGE:
+    deadline = Deadline(settings.REQUEST_DEADLINE_SECONDS)
+    with use_deadline(deadline):
+        response = await retry_policy.run(lambda: client.ainvoke(messages), current_deadline.get())
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+from config.settings import settings
+from core.errors import RETRYABLE, classify_error, get_status_code
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceededError(TimeoutError):
+    """The request's time budget ran out; no further attempts or fallbacks are made."""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        """
+        PURPOSE: Start a time budget of 'seconds' from now.
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, what: str = "") -> None:
+        """
+        PURPOSE: Raise DeadlineExceededError if no time is left.
+        """
+        if self.expired:
+            raise DeadlineExceededError(f"Request deadline of {self.seconds:.0f}s exceeded" + (f" {what}" if what else ""))
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        PURPOSE: Seconds the next operation may take (time left, optionally capped).
+        """
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+
+# Deadline of the request the current task is serving (inherited by child tasks)
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+@contextlib.contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Iterator[None]:
+    """
+    PURPOSE: Run the enclosed model calls under a deadline (None keeps the inherited one).
+    """
+    if deadline is None:
+        yield
+        return
+    token = current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+async def wait_with_deadline(awaitable: Awaitable[T], deadline: Optional[Deadline], cap: Optional[float] = None) -> T:
+    """
+    PURPOSE: Await with a timeout of min(cap, time left on the deadline).
+    RAISES: DeadlineExceededError if the deadline ran out, TimeoutError if only the cap did.
+    """
+    if deadline is None:
+        return await asyncio.wait_for(awaitable, cap) if cap else await awaitable
+    if deadline.expired:
+        # Don't leave a never-awaited coroutine behind
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        deadline.check()
+
+    timeout = deadline.timeout(cap)
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        deadline.check()
+        raise asyncio.TimeoutError(f"Model call timed out after {timeout:.1f}s")
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        attempt_timeout: Optional[float] = 90.0,
+        min_attempt_seconds: float = 2.0,
+        rng: Optional[random.Random] = None,
+        model_timeouts: Optional[Dict[str, float]] = None
+    ):
+        """
+        PURPOSE: Per-provider retry policy.
+        PARAMS:
+            max_attempts: Attempts per call (1 = no retries).
+            base_delay / max_delay: Backoff before retry n is uniform(0, min(max_delay, base_delay * 2**n)).
+            attempt_timeout: Cap on a single attempt (None = only the deadline).
+            min_attempt_seconds: Don't start a retry with less time than this left after the backoff.
+            model_timeouts: Per-model (label) caps overriding attempt_timeout.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.min_attempt_seconds = min_attempt_seconds
+        self.model_timeouts = dict(model_timeouts or {})
+        self._rng = rng or random.Random()
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.attempt_timeouts = 0
+        self.deadline_exceeded = 0
+
+    def backoff(self, retry: int) -> float:
+        """
+        PURPOSE: Full-jitter exponential backoff before retry number 'retry' (0-based).
+        """
+        return self._rng.uniform(0.0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+    def timeout_for(self, label: str) -> Optional[float]:
+        """
+        PURPOSE: Per-attempt cap for this model (slow models like Opus may get a longer one).
+        """
+        return self.model_timeouts.get(label, self.attempt_timeout)
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """
+        PURPOSE: Worth another attempt on the SAME model?
+        NOTE: 429 is left to the router (switch provider); a spent deadline is final.
+        """
+        if isinstance(error, DeadlineExceededError):
+            return False
+        return classify_error(error) == RETRYABLE and get_status_code(error) != 429
+
+    async def _attempt(
+        self,
+        call: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline],
+        cap: Optional[float],
+        admission: Optional[Callable[[], AsyncContextManager[Any]]]
+    ) -> T:
+        """
+        PURPOSE: One attempt; the cap only starts once 'admission' (e.g. a scheduler slot) is held.
+        """
+        if admission is None:
+            return await wait_with_deadline(call(), deadline, cap)
+
+        async def admitted():
+            async with admission():
+                return await wait_with_deadline(call(), deadline, cap)
+
+        # Waiting for admission is bounded by the deadline only
+        return await wait_with_deadline(admitted(), deadline)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        deadline: Optional[Deadline] = None,
+        label: str = "model",
+        admission: Optional[Callable[[], AsyncContextManager[Any]]] = None
+    ) -> T:
+        """
+        PURPOSE: Run 'call' with per-attempt timeouts and jittered retries within the deadline.
+        PARAMS:
+            call: Zero-argument factory for one attempt (called again for every retry).
+            deadline: Request deadline (None = per-attempt timeout only).
+            label: Model id (selects the per-model attempt timeout, names the call in logs).
+            admission: Factory for an async context entered before each attempt (the scheduler
+                       slot); time spent waiting for it does not count against the attempt cap.
+        RAISES: The last attempt's error, or DeadlineExceededError.
+        """
+        cap = self.timeout_for(label)
+        self.calls += 1
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._attempt(call, deadline, cap, admission)
+            except DeadlineExceededError:
+                self.deadline_exceeded += 1
+                raise
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.attempt_timeouts += 1
+                if attempt >= self.max_attempts or not self.is_retryable(e):
+                    raise
+
+                # 1. Retry only if backoff + a useful attempt still fit in the time left
+                delay = self.backoff(attempt - 1)
+                if deadline is not None and deadline.remaining() < delay + self.min_attempt_seconds:
+                    logger.warning(f"{label} failed ({e}); {deadline.remaining():.1f}s left - not retrying")
+                    raise
+
+                # 2. Back off, then try again
+                self.retries += 1
+                logger.warning(f"{label} attempt {attempt}/{self.max_attempts} failed: {e}. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "attempt_timeouts": self.attempt_timeouts,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+def request_deadline() -> Optional[Deadline]:
+    """
+    PURPOSE: New deadline for an incoming request (None if REQUEST_DEADLINE_SECONDS is unset).
+    """
+    return Deadline(settings.REQUEST_DEADLINE_SECONDS) if settings.REQUEST_DEADLINE_SECONDS else None
+
+
+def _attempt_timeouts_from_settings() -> Dict[str, float]:
+    if not settings.LLM_ATTEMPT_TIMEOUT_OVERRIDES:
+        return {}
+    try:
+        return {model: float(seconds) for model, seconds in json.loads(settings.LLM_ATTEMPT_TIMEOUT_OVERRIDES).items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Invalid LLM_ATTEMPT_TIMEOUT_OVERRIDES, using LLM_ATTEMPT_TIMEOUT_SECONDS: {e}")
+        return {}
+
+
+def create_retry_policy() -> RetryPolicy:
+    """
+    PURPOSE: Retry policy configured from settings (one per ModelManager).
+    """
+    return RetryPolicy(
+        max_attempts=settings.LLM_MAX_ATTEMPTS,
+        base_delay=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+        max_delay=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+        attempt_timeout=settings.LLM_ATTEMPT_TIMEOUT_SECONDS,
+        min_attempt_seconds=settings.LLM_MIN_ATTEMPT_SECONDS,
+        model_timeouts=_attempt_timeouts_from_settings(),
+    )
@@ -0,0 +1,74 @@
+"""
+FILE: errors.py
+PATH: yugnex/backend/core/errors.py
+PURPOSE: Provider error types and classification (retryable vs fatal).
+WORKING:
+    1. ProviderNotConfiguredError: raised when a provider has no key/client (never retried).
+    2. ProviderUnavailableError: raised when every candidate provider is short-circuited.
+    3. classify_error: maps any SDK / network exception to "retryable" or "fatal".
+       - retryable: timeouts, connection errors, 408/409/429, 5xx (incl. Anthropic 529).
+       - fatal: configuration errors and other 4xx (bad request, auth, not found).
+USAGE:
+    if classify_error(e) == RETRYABLE:
+        ...try the other provider...
+"""
+
+import asyncio
+from typing import Optional
+
+RETRYABLE = "retryable"
+FATAL = "fatal"
+
+# HTTP status codes that indicate a transient provider problem
+_RETRYABLE_STATUS = {408, 409, 429}
+
+# Exception class names (from httpx / anthropic / google SDKs) that mean "network trouble"
+_RETRYABLE_NAME_HINTS = ("Timeout", "Connect", "RemoteProtocol", "ReadError", "WriteError", "NetworkError")
+
+
+class ProviderNotConfiguredError(ValueError):
+    """A provider was requested but has no API key / client configured."""
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Every candidate provider is currently short-circuited (circuit breaker open)."""
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """
+    PURPOSE: Extract an HTTP status code from an SDK exception, if it carries one.
+    """
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    PURPOSE: Decide whether an error is worth retrying / failing over.
+    RETURNS: RETRYABLE or FATAL.
+    """
+    if isinstance(error, ProviderUnavailableError):
+        return RETRYABLE
+    if isinstance(error, (ProviderNotConfiguredError, ValueError, TypeError)):
+        return FATAL
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return RETRYABLE
+
+    status = get_status_code(error)
+    if status is not None:
+        if status in _RETRYABLE_STATUS or status >= 500:
+            return RETRYABLE
+        if 400 <= status < 500:
+            return FATAL
+
+    names = [cls.__name__ for cls in type(error).__mro__]
+    if any(hint in name for name in names for hint in _RETRYABLE_NAME_HINTS):
+        return RETRYABLE
+
+    # Unknown errors: assume transient so the other provider gets a chance
+    return RETRYABLE
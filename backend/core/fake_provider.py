@@ -0,0 +1,253 @@
+"""
+FILE: fake_provider.py
+PATH: yugnex/backend/core/fake_provider.py
+PURPOSE: Record/replay and latency-simulating stand-ins for the LLM clients (offline benchmarks).
+WORKING:
+    LLM_PROVIDER_MODE selects how ModelManager talks to providers:
+    1. "live"     - real clients (default).
+    2. "record"   - real clients, and every request/response pair (with its timings) is
+                    written to LLM_RECORDINGS_DIR as one JSON file per request.
+    3. "replay"   - no network: recorded responses are served back with their recorded
+                    timings; requests never recorded get synthetic text.
+    4. "simulate" - no network: synthetic text only.
+    Replay/simulate timings follow configurable distributions:
+    time-to-first-token (lognormal around LLM_SIM_TTFT_SECONDS), streaming speed
+    (LLM_SIM_TOKENS_PER_SECOND) and error injection (LLM_SIM_ERROR_RATE, HTTP 529).
+    Fake clients expose the same 'ainvoke' / 'astream' as the LangChain clients,
+    so routing, caching, breakers, scheduler and rate limits all run as in production.
+USAGE:
+    LLM_PROVIDER_MODE=simulate LLM_SIM_TTFT_SECONDS=0.8 uvicorn api.main:app
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from core.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+MODE_LIVE = "live"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+MODE_SIMULATE = "simulate"
+PROVIDER_MODES = (MODE_LIVE, MODE_RECORD, MODE_REPLAY, MODE_SIMULATE)
+
+_FILLER_WORDS = (
+    "the service validates the request and stores the result in the project database "
+    "then returns a summary so the agent can continue with the next step of the plan"
+).split()
+
+
+class SimulatedProviderError(Exception):
+    """Injected provider failure (looks like an overloaded API to error classification)."""
+
+    def __init__(self, message: str = "Simulated provider overload", status_code: int = 529):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def request_key(model_id: str, messages: List[BaseMessage]) -> str:
+    """
+    PURPOSE: Stable identity of a request (same model + same messages = same recording).
+    """
+    payload = json.dumps(
+        {"model": model_id, "messages": [[message.type, message.content] for message in messages]},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable recording {path}: {e}")
+            return None
+
+    def save(self, key: str, record: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path(key).write_text(json.dumps(record, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+class LatencyModel:
+    def __init__(
+        self,
+        ttft_seconds: float = 0.5,
+        ttft_jitter: float = 0.3,
+        tokens_per_second: float = 60.0,
+        error_rate: float = 0.0,
+        output_tokens: int = 200,
+        seed: Optional[int] = None
+    ):
+        """
+        PURPOSE: Timing / failure distributions for fake responses.
+        PARAMS:
+            ttft_seconds: Median time to first token.
+            ttft_jitter: Lognormal sigma of TTFT (0 = constant).
+            tokens_per_second: Streaming speed after the first token.
+            error_rate: Probability (0-1) that a call fails with SimulatedProviderError.
+            output_tokens: Length of synthetic responses.
+            seed: Fixed seed for reproducible runs.
+        """
+        self.ttft_seconds = ttft_seconds
+        self.ttft_jitter = ttft_jitter
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.output_tokens = output_tokens
+        self._rng = random.Random(seed)
+
+    def sample_ttft(self) -> float:
+        if self.ttft_jitter <= 0:
+            return self.ttft_seconds
+        return self.ttft_seconds * math.exp(self._rng.gauss(0.0, self.ttft_jitter))
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+
+def synthetic_text(key: str, model_id: str, tokens: int) -> str:
+    """
+    PURPOSE: Deterministic filler text (same request -> same text).
+    """
+    rng = random.Random(key)
+    words = [rng.choice(_FILLER_WORDS) for _ in range(max(1, tokens))]
+    return f"[simulated {model_id}] " + " ".join(words) + "."
+
+
+class FakeChatClient:
+    def __init__(self, model_id: str, latency: LatencyModel, store: Optional[RecordingStore] = None):
+        """
+        PURPOSE: Offline chat client for replay / simulate modes.
+        PARAMS:
+            store: Recordings to replay (None = synthetic text only).
+        """
+        self.model = model_id
+        self.latency = latency
+        self.store = store
+
+        # Metrics
+        self.replayed = 0
+        self.synthesized = 0
+
+    def _response_for(self, messages: List[BaseMessage]) -> tuple[str, Optional[float], Optional[float]]:
+        """
+        RETURNS: (text, recorded ttft or None, recorded total seconds or None)
+        """
+        key = request_key(self.model, messages)
+        record = self.store.load(key) if self.store else None
+        if record is not None:
+            self.replayed += 1
+            return record["response"], record.get("ttft_seconds"), record.get("total_seconds")
+        self.synthesized += 1
+        return synthetic_text(key, self.model, self.latency.output_tokens), None, None
+
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+
+    async def ainvoke(self, messages: List[BaseMessage]) -> AIMessage:
+        text, ttft, total = self._response_for(messages)
+        if self.latency.should_fail():
+            await asyncio.sleep(self.latency.sample_ttft())
+            raise SimulatedProviderError()
+        if total is None:
+            total = self.latency.sample_ttft() + estimate_tokens(text) * self.latency.token_delay()
+        await asyncio.sleep(total)
+        return AIMessage(content=text, usage_metadata=_usage(messages, text))
+
+    async def astream(self, messages: List[BaseMessage]) -> AsyncIterator[AIMessageChunk]:
+        text, ttft, total = self._response_for(messages)
+        await asyncio.sleep(ttft if ttft is not None else self.latency.sample_ttft())
+        if self.latency.should_fail():
+            raise SimulatedProviderError()
+
+        chunks = self._chunks(text)
+        if total is not None and ttft is not None and len(chunks) > 1:
+            delay = max(0.0, total - ttft) / (len(chunks) - 1)
+        else:
+            delay = self.latency.token_delay()
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+        yield AIMessageChunk(content="", usage_metadata=_usage(messages, text))
+
+
+class RecordingChatClient:
+    def __init__(self, client: Any, model_id: str, store: RecordingStore):
+        """
+        PURPOSE: Wrap a live LangChain client and save every request/response pair.
+        """
+        self.client = client
+        self.model = model_id
+        self.store = store
+
+    def _save(self, messages: List[BaseMessage], text: str, ttft: float, total: float) -> None:
+        try:
+            self.store.save(request_key(self.model, messages), {
+                "model": self.model,
+                "messages": [{"type": message.type, "content": message.content} for message in messages],
+                "response": text,
+                "ttft_seconds": round(ttft, 4),
+                "total_seconds": round(total, 4),
+                "recorded_at": time.time(),
+            })
+        except OSError as e:
+            logger.warning(f"Could not save LLM recording: {e}")
+
+    async def ainvoke(self, messages: List[BaseMessage]) -> Any:
+        started = time.perf_counter()
+        response = await self.client.ainvoke(messages)
+        elapsed = time.perf_counter() - started
+        self._save(messages, _text(response.content), elapsed, elapsed)
+        return response
+
+    async def astream(self, messages: List[BaseMessage]) -> AsyncIterator[Any]:
+        started = time.perf_counter()
+        ttft: Optional[float] = None
+        parts: List[str] = []
+        async for chunk in self.client.astream(messages):
+            text = _text(chunk.content)
+            if text and ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(text)
+            yield chunk
+        total = time.perf_counter() - started
+        self._save(messages, "".join(parts), ttft if ttft is not None else total, total)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return ""
+
+
+def _usage(messages: List[BaseMessage], text: str) -> Dict[str, Any]:
+    input_tokens = sum(estimate_tokens(_text(message.content)) for message in messages)
+    output_tokens = estimate_tokens(text)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
@@ -4,34 +4,67 @@ PATH: yugnex/backend/core/model_manager.py
 PURPOSE: Manages direct connections to AI providers (Claude & Gemini).
 WORKING:
     1. Initializes LangChain clients for ChatAnthropic and ChatGoogleGenerativeAI.
-    2. Provides a unified 'invoke_model' method to send messages to either provider.
-    3. Handles basic error catching (though specific retry logic is often handled by LangChain).
+    2. Owns one keep-alive HTTP connection pool per provider, shared by every client.
+    3. Provides a unified 'invoke_model' method to send messages to either provider.
+    4. Every call runs under the retry policy and the request deadline (core/deadline.py);
+       SDK-level retries are disabled so they cannot stack on top of it.
+    5. Applies provider prompt caching to split system prompts and tracks cache token usage.
+    6. 'submit_batch' runs bulk, non-interactive work through provider batch APIs.
+    7. Every call waits for a slot from the per-model priority scheduler (core/scheduler.py).
+    8. LLM_PROVIDER_MODE swaps in record / replay / simulate clients (core/fake_provider.py).
+    9. Calls cancelled in flight (client disconnect, hedge loser) are counted (core/cancellation.py).
+    10. Every response comes back as a ModelResult: text + who answered + tokens + timings.
 USAGE:
-    manager = ModelManager()
-    response = await manager.invoke_model("claude", [HumanMessage(content="Hello")])
+    manager = get_model_manager()  # Process-wide instance, created at app startup
+    result = await manager.invoke_model("claude", [HumanMessage(content="Hello")])
+    print(result.text, result.model, result.total_tokens)
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Optional
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
 
 from importlib import import_module
 from typing import Any
 
+import anthropic
+import httpx
 from langchain_core.messages import BaseMessage
 from langchain_anthropic import ChatAnthropic
 from config.settings import settings
+from core.batch import AnthropicBatchProvider, BatchRequest, BatchResult, LocalBatchProvider
+from core.cancellation import get_cancellation_stats
+from core.deadline import create_retry_policy, current_deadline, wait_with_deadline
+from core.errors import ProviderNotConfiguredError
+from core.fake_provider import (
+    MODE_LIVE, MODE_RECORD, MODE_REPLAY, PROVIDER_MODES, FakeChatClient, LatencyModel, RecordingChatClient, RecordingStore,
+)
+from core.prompt_cache import PromptCacheStats, parse_usage, prepare_messages
+from core.rate_limiter import RateLimiterRegistry
+from core.scheduler import LANE_BACKGROUND, create_scheduler, current_lane, use_lane
+from core.tokens import estimate_tokens
 
 ChatGoogleGenerativeAI: Any | None
 try:  # pragma: no cover - optional dependency at runtime
     ChatGoogleGenerativeAI = import_module("langchain_google_genai").ChatGoogleGenerativeAI
+    genai = import_module("google.genai")
     _HAS_GOOGLE_GENAI = True
 except ModuleNotFoundError:  # pragma: no cover
     ChatGoogleGenerativeAI = None
+    genai = None
     _HAS_GOOGLE_GENAI = False
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Defaults used when a provider is requested without a specific model
+DEFAULT_CLAUDE_MODEL = "claude-sonnet-4-5"
+DEFAULT_GEMINI_MODEL = "gemini-2.5-pro"
+
 # Model name mapping: friendly names -> actual API model identifiers
 # Based on official Claude API documentation: https://platform.claude.com/docs/en/about-claude/models/overview
 def get_model_name_map() -> dict:
@@ -140,17 +173,41 @@ class ModelManager:
             if settings.ENV == "development":
                 logger.info(f"Anthropic key length: {len(api_key)} chars, starts with: {api_key[:15]}...")
             
-            # Set as environment variable (LangChain prefers this)
-            import os
-            os.environ["ANTHROPIC_API_KEY"] = api_key
+            # Passed explicitly to the SDK client below (no os.environ mutation)
             self.anthropic_api_key = api_key
         else:
             self.anthropic_api_key = None
             if settings.ENV == "development":
                 logger.warning("ANTHROPIC_API_KEY not found in environment variables")
         
+        # Shared connection pools (one per provider, keep-alive enabled).
+        # Every client created below borrows these instead of opening its own.
+        self._http_pools: dict[str, Any] = {}
+        self._anthropic_client: Optional[anthropic.AsyncAnthropic] = None
+
         # Cache for created Claude clients (lazy initialization)
         self._claude_clients: dict[str, ChatAnthropic] = {}
+
+        # Per-model request/token buckets (synced from provider rate-limit headers)
+        self.rate_limits = RateLimiterRegistry()
+
+        # Prompt-cache read/write token counts per model
+        self.prompt_cache = PromptCacheStats()
+
+        # Per-model concurrency limit with priority lanes (interactive > handoff > background)
+        self.scheduler = create_scheduler()
+
+        # Per-attempt timeout + jittered retries, bounded by the request deadline
+        self.retry_policy = create_retry_policy()
+
+        # Live, record, replay or simulate (offline benchmarks / load tests)
+        self.provider_mode = settings.LLM_PROVIDER_MODE
+        if self.provider_mode not in PROVIDER_MODES:
+            raise ValueError(f"Unknown LLM_PROVIDER_MODE: {self.provider_mode}. Use one of {PROVIDER_MODES}")
+        self._recordings = RecordingStore(settings.LLM_RECORDINGS_DIR)
+        self._fake_clients: dict[str, FakeChatClient] = {}
+        if self.provider_mode != MODE_LIVE:
+            logger.warning(f"LLM provider mode: {self.provider_mode} (recordings: {settings.LLM_RECORDINGS_DIR})")
         
         # List of working Claude models (from test results)
         self.available_claude_models = [
@@ -178,15 +235,22 @@ class ModelManager:
 
         self.gemini = (
             ChatGoogleGenerativeAI(
-                model="gemini-2.5-pro",
+                model=DEFAULT_GEMINI_MODEL,
                 temperature=0,
                 max_output_tokens=4096,
                 google_api_key=google_key,
                 convert_system_message_to_human=True,  # Gemini sometimes prefers system instructions differently
+                max_retries=0,  # Retries are handled by self.retry_policy
             )
             if google_key and _HAS_GOOGLE_GENAI
             else None
         )
+        if self.gemini is not None:
+            # Swap the per-instance SDK client for one that borrows the shared pool
+            self.gemini.client = genai.Client(
+                api_key=google_key,
+                http_options=genai.types.HttpOptions(httpx_async_client=self._get_http_pool("gemini")),
+            )
         
         # Debug logging (only in development)
         if settings.ENV == "development":
@@ -198,6 +262,108 @@ class ModelManager:
             if google_key:
                 logger.info(f"Google key starts with: {google_key[:10]}...")
 
+    def _get_http_pool(self, provider: str) -> Any:
+        """
+        PURPOSE: Return the shared async HTTP connection pool for a provider.
+        NOTE: The Anthropic SDK ships its own httpx flavour, so its pool is built from
+              the SDK's client/limits classes; Gemini uses plain httpx.
+        """
+        pool = self._http_pools.get(provider)
+        if pool is not None and not pool.is_closed:
+            return pool
+
+        limits = dict(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        )
+        event_hooks = {"response": [self._observe_response]}
+        if provider == "claude":
+            limits_cls = type(anthropic.DEFAULT_CONNECTION_LIMITS)
+            pool = anthropic.DefaultAsyncHttpxClient(limits=limits_cls(**limits), event_hooks=event_hooks)
+        else:
+            pool = httpx.AsyncClient(limits=httpx.Limits(**limits), event_hooks=event_hooks)
+
+        self._http_pools[provider] = pool
+        return pool
+
+    async def _observe_response(self, response: Any) -> None:
+        """
+        PURPOSE: Pool response hook - keep the rate-limit buckets in sync with the provider.
+        WORKING:
+            1. Work out which model the request was for (Anthropic: JSON body; Gemini: URL).
+            2. Sync buckets from 'anthropic-ratelimit-*' headers when present.
+            3. On 429, block the model until 'retry-after' so the router switches early.
+        """
+        try:
+            request = response.request
+            model_id = None
+            match = re.search(r"models/([^:/]+)", str(request.url.path))
+            if match:
+                model_id = match.group(1)
+            elif str(request.url.path).endswith("/messages"):
+                model_id = json.loads(request.content or b"{}").get("model")
+            if not model_id:
+                return
+
+            limiter = self.rate_limits.get(model_id)
+            if "anthropic-ratelimit-requests-limit" in response.headers:
+                limiter.update_from_headers(response.headers)
+            if response.status_code == 429:
+                retry_after = float(response.headers.get("retry-after") or 60)
+                limiter.block_for(retry_after)
+                logger.warning(f"Rate limited by provider for {model_id}; pausing it for {retry_after:.0f}s")
+        except Exception as e:
+            logger.debug(f"Could not read rate-limit headers: {e}")
+
+    def has_capacity(self, model_name: str, specific_claude_model: Optional[str] = None, estimated_tokens: int = 0) -> bool:
+        """
+        PURPOSE: Does the model's client-side rate-limit budget allow a call right now?
+        """
+        model_id = self.resolve_model_id(model_name, specific_claude_model)
+        return self.rate_limits.get(model_id).has_capacity(estimated_tokens)
+
+    def stats(self) -> dict:
+        """
+        PURPOSE: Runtime metrics (rate-limit buckets, prompt-cache usage, scheduler queues).
+        """
+        return {
+            "rate_limits": self.rate_limits.stats(),
+            "prompt_cache": self.prompt_cache.stats(),
+            "scheduler": self.scheduler.stats(),
+            "retries": self.retry_policy.stats(),
+            "provider_mode": self.provider_mode,
+            "fake_clients": {
+                model_id: {"replayed": client.replayed, "synthesized": client.synthesized}
+                for model_id, client in self._fake_clients.items()
+            },
+        }
+
+    def _get_anthropic_client(self) -> anthropic.AsyncAnthropic:
+        """
+        PURPOSE: Single Anthropic SDK client shared by every ChatAnthropic instance.
+        """
+        if self._anthropic_client is None:
+            self._anthropic_client = anthropic.AsyncAnthropic(
+                api_key=self.anthropic_api_key,
+                http_client=self._get_http_pool("claude"),
+                max_retries=0,  # Retries are handled by self.retry_policy
+            )
+        return self._anthropic_client
+
+    async def aclose(self) -> None:
+        """
+        PURPOSE: Close the shared connection pools (called on app shutdown).
+        """
+        for provider, pool in self._http_pools.items():
+            try:
+                await pool.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing {provider} connection pool: {e}")
+        self._http_pools.clear()
+        self._anthropic_client = None
+        self._claude_clients.clear()
+
     def get_claude_client(self, model_name: str) -> ChatAnthropic:
         """
         Get or create a Claude client for the specified model.
@@ -210,7 +376,7 @@ class ModelManager:
             ChatAnthropic client instance
         """
         if not self.anthropic_api_key:
-            raise ValueError("Anthropic API Key not configured.")
+            raise ProviderNotConfiguredError("Anthropic API Key not configured.")
         
         # Map friendly name to actual API model identifier
         actual_model_name = get_actual_model_name(model_name)
@@ -224,8 +390,12 @@ class ModelManager:
             model=actual_model_name,
             temperature=0,
             max_tokens=4096,
-            api_key=self.anthropic_api_key
+            api_key=self.anthropic_api_key,
+            max_retries=0
         )
+        # Borrow the shared SDK client (and its keep-alive pool) instead of letting
+        # LangChain build one lazily per instance.
+        client.__dict__["_async_client"] = self._get_anthropic_client()
         
         # Cache it
         self._claude_clients[actual_model_name] = client
@@ -262,41 +432,419 @@ class ModelManager:
         # Default: Sonnet 4.5 (best balance of speed and intelligence)
         return "claude-sonnet-4-5"
     
-    async def invoke_model(self, model_name: str, messages: List[BaseMessage], specific_claude_model: Optional[str] = None) -> str:
+    def is_configured(self, model_name: str) -> bool:
+        """
+        PURPOSE: Can this provider be called at all? (Checked before routing, so a missing
+                 key sends requests straight to the other provider instead of failing first.)
+        """
+        if self.offline and (model_name in ("claude", "gemini") or model_name.startswith("claude-")):
+            return True
+        if model_name == "claude" or model_name.startswith("claude-"):
+            return bool(self.anthropic_api_key)
+        if model_name == "gemini":
+            return self.gemini is not None
+        return False
+
+    @property
+    def offline(self) -> bool:
+        """
+        PURPOSE: True in replay / simulate mode (no provider is contacted).
+        """
+        return self.provider_mode not in (MODE_LIVE, MODE_RECORD)
+
+    def _get_fake_client(self, model_id: str) -> FakeChatClient:
+        client = self._fake_clients.get(model_id)
+        if client is None:
+            latency = LatencyModel(
+                ttft_seconds=settings.LLM_SIM_TTFT_SECONDS,
+                ttft_jitter=settings.LLM_SIM_TTFT_JITTER,
+                tokens_per_second=settings.LLM_SIM_TOKENS_PER_SECOND,
+                error_rate=settings.LLM_SIM_ERROR_RATE,
+                output_tokens=settings.LLM_SIM_OUTPUT_TOKENS,
+                seed=settings.LLM_SIM_SEED,
+            )
+            store = self._recordings if self.provider_mode == MODE_REPLAY else None
+            client = self._fake_clients[model_id] = FakeChatClient(model_id, latency, store)
+        return client
+
+    def resolve_model_id(self, model_name: str, specific_claude_model: Optional[str] = None) -> str:
+        """
+        PURPOSE: Resolve a request ('claude', 'gemini', or a Claude model name) to the
+                 actual API model id, without needing the provider to be configured.
+        """
+        if model_name == "claude" or model_name.startswith("claude-"):
+            # Use specific model if provided, otherwise the named model, otherwise default
+            claude_model = specific_claude_model or (model_name if model_name.startswith("claude-") else DEFAULT_CLAUDE_MODEL)
+            return get_actual_model_name(claude_model)
+        if model_name == "gemini":
+            return self.gemini.model if self.gemini else DEFAULT_GEMINI_MODEL
+        return model_name
+
+    def _resolve_client(self, model_name: str, specific_claude_model: Optional[str] = None) -> tuple[str, str, Any]:
+        """
+        PURPOSE: Map a requested model to (provider, resolved model id, LangChain client).
+        NOTE: In record mode the live client is wrapped; in replay / simulate a fake client is used.
+        RAISES: ProviderNotConfiguredError / ValueError if the provider is missing or the name is unknown.
+        """
+        if self.offline:
+            if model_name not in ("claude", "gemini") and not model_name.startswith("claude-"):
+                raise ValueError(f"Unknown model name: {model_name}. Use 'claude', 'gemini', or a specific Claude model name.")
+            provider = "gemini" if model_name == "gemini" else "claude"
+            model_id = self.resolve_model_id(model_name, specific_claude_model)
+            return provider, model_id, self._get_fake_client(model_id)
+
+        provider, model_id, client = self._resolve_live_client(model_name, specific_claude_model)
+        if self.provider_mode == MODE_RECORD:
+            client = RecordingChatClient(client, model_id, self._recordings)
+        return provider, model_id, client
+
+    def _resolve_live_client(self, model_name: str, specific_claude_model: Optional[str] = None) -> tuple[str, str, Any]:
+        """
+        PURPOSE: _resolve_client for the real provider clients.
+        """
+        # Handle Claude ('claude' or a specific Claude model name)
+        if model_name == "claude" or model_name.startswith("claude-"):
+            if not self.anthropic_api_key:
+                raise ProviderNotConfiguredError("Anthropic API Key not configured.")
+
+            model_id = self.resolve_model_id(model_name, specific_claude_model)
+            return "claude", model_id, self.get_claude_client(model_id)
+
+        if model_name == "gemini":
+            if not self.gemini:
+                google_key = settings.GOOGLE_AI_STUDIO_KEY or settings.GOOGLE_API_KEY
+                if not google_key:
+                    raise ProviderNotConfiguredError("Google API Key not configured. Set GOOGLE_AI_STUDIO_KEY or GOOGLE_API_KEY in .env")
+                else:
+                    raise ProviderNotConfiguredError(f"Google API Key is set but Gemini client not initialized. Check langchain-google-genai installation.")
+            return "gemini", self.gemini.model, self.gemini
+
+        raise ValueError(f"Unknown model name: {model_name}. Use 'claude', 'gemini', or a specific Claude model name.")
+
+    async def invoke_model(self, model_name: str, messages: List[BaseMessage], specific_claude_model: Optional[str] = None) -> "ModelResult":
         """
         PURPOSE: Send a standardized message list to the requested model.
         PARAMS:
             model_name (str): 'claude' or 'gemini', or specific model name.
             messages (List[BaseMessage]): LangChain message objects (System, Human, AI).
             specific_claude_model (str, optional): Specific Claude model to use (e.g., "claude-sonnet-4-5").
-        RETURNS: str (The content of the AI response).
+        RETURNS: ModelResult (response text, resolved model/provider, token usage, latency;
+                 'provider_seconds' is the answering attempt alone - no queue wait or backoff).
+        NOTE: A SystemMessage whose content is a list of text blocks is treated as
+              [cacheable prefix, volatile suffix] (see core/prompt_cache.py).
+              Retryable failures are retried on the same model while the request deadline
+              ('current_deadline') allows; the per-attempt cap starts once the scheduler slot
+              is held (the queue wait only counts against the deadline).
         """
+        started = time.perf_counter()
         try:
-            # Handle specific Claude model names
-            if model_name.startswith("claude-") or (model_name == "claude" and specific_claude_model):
-                if not self.anthropic_api_key:
-                    raise ValueError("Anthropic API Key not configured.")
-                
-                # Use specific model if provided, otherwise use default selection
-                claude_model = specific_claude_model if specific_claude_model else "claude-sonnet-4-5"
-                client = self.get_claude_client(claude_model)
-                response = await client.ainvoke(messages)
-                return response.content
-
-            elif model_name == "gemini":
-                if not self.gemini:
-                    google_key = settings.GOOGLE_AI_STUDIO_KEY or settings.GOOGLE_API_KEY
-                    if not google_key:
-                        raise ValueError("Google API Key not configured. Set GOOGLE_AI_STUDIO_KEY or GOOGLE_API_KEY in .env")
-                    else:
-                        raise ValueError(f"Google API Key is set but Gemini client not initialized. Check langchain-google-genai installation.")
-                response = await self.gemini.ainvoke(messages)
-                return response.content
-            
-            else:
-                raise ValueError(f"Unknown model name: {model_name}. Use 'claude', 'gemini', or a specific Claude model name.")
+            provider, model_id, client = self._resolve_client(model_name, specific_claude_model)
+            prepared = prepare_messages(provider, messages)
+
+            attempt_started = [started]
+
+            async def attempt():
+                self.rate_limits.get(model_id).acquire(estimate_input_tokens(messages))
+                attempt_started[0] = time.perf_counter()  # Scheduler slot held, rate limit passed
+                return await client.ainvoke(prepared)
+
+            response = await self.retry_policy.run(
+                attempt, current_deadline.get(), label=model_id,
+                admission=lambda: self.scheduler.slot(model_id)
+            )
+            usage = getattr(response, "usage_metadata", None)
+            self.prompt_cache.record(model_id, usage)
+            return ModelResult.from_usage(
+                _chunk_text(response.content), provider, model_id, parse_usage(usage), messages,
+                latency_seconds=time.perf_counter() - started,
+                provider_seconds=time.perf_counter() - attempt_started[0],
+            )
 
+        except asyncio.CancelledError:
+            # Nobody is waiting any more; the provider request was closed with the task
+            get_cancellation_stats().record_call(model_id, estimate_input_tokens(messages))
+            raise
         except Exception as e:
             logger.error(f"Error invoking {model_name}: {str(e)}")
             # In a production v2, we would trigger auto-fallback here
-            raise e
\ No newline at end of file
+            raise e
+
+    def stream_model(self, model_name: str, messages: List[BaseMessage], specific_claude_model: Optional[str] = None) -> "ModelStream":
+        """
+        PURPOSE: Stream the response token-by-token instead of waiting for the full text.
+        PARAMS: Same as invoke_model.
+        RETURNS: ModelStream (async iterator of text deltas; '.text' holds everything received).
+        NOTE: Nothing is sent until the stream is iterated; errors surface on the first read.
+              The scheduler lane and request deadline are taken from the caller's context when
+              stream_model is called; the slot is held until the stream ends. Streams are not
+              retried here (the router falls back before the first token), but every read is
+              bounded by the deadline so a hung stream cannot outlive the request.
+        """
+        lane = current_lane.get()
+        deadline = current_deadline.get()
+
+        async def produce(stream: "ModelStream"):
+            try:
+                stream.provider, stream.model, client = self._resolve_client(model_name, specific_claude_model)
+                async with self.scheduler.slot(stream.model, lane):
+                    self.rate_limits.get(stream.model).acquire(estimate_input_tokens(messages))
+                    chunks = client.astream(prepare_messages(stream.provider, messages)).__aiter__()
+                    try:
+                        while True:
+                            try:
+                                chunk = await wait_with_deadline(chunks.__anext__(), deadline)
+                            except StopAsyncIteration:
+                                break
+                            usage = getattr(chunk, "usage_metadata", None)
+                            self.prompt_cache.record(stream.model, usage)
+                            stream.add_usage(usage)
+                            delta = _chunk_text(chunk.content)
+                            if delta:
+                                yield delta
+                    finally:
+                        if hasattr(chunks, "aclose"):
+                            await chunks.aclose()
+            except asyncio.CancelledError:
+                get_cancellation_stats().record_call(stream.model, estimate_input_tokens(messages))
+                raise
+            except Exception as e:
+                logger.error(f"Error streaming {model_name}: {str(e)}")
+                raise
+
+        return ModelStream(produce, messages)
+
+    async def submit_batch(self, requests: List[BatchRequest]) -> List[BatchResult]:
+        """
+        PURPOSE: Run many prompts as bulk work (batch pricing, off the interactive rate limits).
+        PARAMS: requests (List[BatchRequest]): One entry per prompt, each with a unique custom_id.
+        RETURNS: List[BatchResult] in the same order as 'requests'.
+        WORKING:
+            1. Claude requests go to ONE Anthropic Message Batches job (BATCH_USE_PROVIDER_API).
+            2. Everything else (Gemini, batch API disabled) runs locally with bounded concurrency,
+               in the scheduler's background lane.
+            3. Results are mapped back to their request by custom_id.
+        NOTE: Provider batches can take minutes to hours; only await this from background jobs.
+        """
+        # Provider batches are live-only (never recorded, never sent in replay / simulate)
+        use_batch_api = settings.BATCH_USE_PROVIDER_API and bool(self.anthropic_api_key) and self.provider_mode == MODE_LIVE
+        claude_items, local_requests = [], []
+        for request in requests:
+            if use_batch_api and request.model_name != "gemini":
+                model_id = self.resolve_model_id(request.model_name, request.specific_claude_model)
+                claude_items.append((request.custom_id, model_id, prepare_messages("claude", request.messages)))
+            else:
+                local_requests.append(request)
+
+        results: dict[str, BatchResult] = {}
+        if claude_items:
+            provider = AnthropicBatchProvider(
+                # Long-running polls keep the SDK's own retries (not bound to a request deadline)
+                self._get_anthropic_client().with_options(max_retries=2),
+                poll_interval=settings.BATCH_POLL_INTERVAL_SECONDS,
+                max_tokens=4096,
+            )
+            try:
+                results.update(await provider.run(claude_items))
+            except Exception as e:
+                logger.error(f"Message batch submission failed: {str(e)}")
+                results.update({custom_id: BatchResult(custom_id, error=str(e)) for custom_id, _, _ in claude_items})
+        if local_requests:
+            provider = LocalBatchProvider(self.invoke_model, concurrency=settings.BATCH_LOCAL_CONCURRENCY)
+            with use_lane(LANE_BACKGROUND):
+                results.update(await provider.run(local_requests))
+
+        return [
+            results.get(request.custom_id) or BatchResult(request.custom_id, error="Missing from batch results")
+            for request in requests
+        ]
+
+
+def _chunk_text(content: Any) -> str:
+    """
+    PURPOSE: Extract plain text from a streamed chunk (string or list of content blocks).
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+            if not isinstance(block, dict) or block.get("type", "text") == "text"
+        )
+    return ""
+
+
+def estimate_input_tokens(messages: List[BaseMessage]) -> int:
+    """
+    PURPOSE: Rough input token count of a message list (text blocks included).
+    """
+    return sum(estimate_tokens(_chunk_text(message.content)) for message in messages)
+
+
+@dataclass
+class ModelResult:
+    """
+    PURPOSE: A model response plus who produced it, what it cost and how long it took.
+    NOTE: Token counts come from the provider's usage metadata; if a provider reports none,
+          they are estimated and 'usage_estimated' is set. 'cached' results (response cache,
+          or a single-flight joiner sharing another caller's call) cost nothing and carry
+          no tokens. The router adds why this model was chosen
+          ('selection_reason') and how the context window was used ('context_budget').
+    """
+    text: str
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    latency_seconds: Optional[float] = None
+    provider_seconds: Optional[float] = None  # Successful attempt only (no queue wait, retries or backoff)
+    ttft_seconds: Optional[float] = None  # Streaming only
+    cached: bool = False
+    usage_estimated: bool = False
+    selection_reason: Optional[str] = None
+    context_budget: Optional[Dict[str, Any]] = None  # BudgetReport.as_dict() (None = no context fitted)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @classmethod
+    def from_usage(
+        cls,
+        text: str,
+        provider: Optional[str],
+        model: Optional[str],
+        usage: Dict[str, int],
+        messages: List[BaseMessage],
+        **timings: Optional[float]
+    ) -> "ModelResult":
+        """
+        PURPOSE: Build a result from token counts (see prompt_cache.parse_usage), estimating if missing.
+        """
+        tokens = {**parse_usage(None), **usage}
+        estimated = not tokens["input_tokens"] and not tokens["output_tokens"]
+        if estimated:
+            tokens["input_tokens"] = estimate_input_tokens(messages)
+            tokens["output_tokens"] = estimate_tokens(text)
+        return cls(text=text, provider=provider, model=model, usage_estimated=estimated, **tokens, **timings)
+
+    def metadata(self) -> Dict[str, Any]:
+        """
+        PURPOSE: Everything but the text, rounded - stored as Message.metadata.
+        """
+        data = asdict(self)
+        del data["text"]
+        for key in ("latency_seconds", "provider_seconds", "ttft_seconds"):
+            if data[key] is not None:
+                data[key] = round(data[key], 3)
+        return data
+
+
+class ModelStream:
+    """
+    PURPOSE: Async iterator over a streamed model response.
+    WORKING:
+        1. Wraps a producer (async generator) that yields text deltas.
+        2. Accumulates every delta so '.text' is the full response once iteration ends.
+        3. Exposes 'provider' / 'model' of whoever actually answered (set by the producer).
+    USAGE:
+        stream = manager.stream_model("claude", messages)
+        async for delta in stream:
+            send(delta)
+        save(stream.text)
+    """
+
+    def __init__(self, producer, messages: Optional[List[BaseMessage]] = None):
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.completed = False
+        self.usage: Dict[str, int] = {}  # Summed usage metadata of the chunks (set by the producer)
+        self.messages = messages or []  # For token estimates when the provider reports no usage
+        self.ttft_seconds: Optional[float] = None
+        self.latency_seconds: Optional[float] = None
+        self.selection_reason: Optional[str] = None  # Set by the router (see ModelResult)
+        self.context_budget: Optional[Dict[str, Any]] = None
+        self._started: Optional[float] = None
+        self._chunks: List[str] = []
+        self._iterator = producer(self)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def add_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            for key, value in parse_usage(usage).items():
+                self.usage[key] = self.usage.get(key, 0) + value
+
+    def result(self) -> ModelResult:
+        """
+        PURPOSE: What was received so far as a ModelResult (complete once iteration ended).
+        """
+        result = ModelResult.from_usage(
+            self.text, self.provider, self.model, self.usage, self.messages,
+            latency_seconds=self.latency_seconds, ttft_seconds=self.ttft_seconds,
+        )
+        result.selection_reason, result.context_budget = self.selection_reason, self.context_budget
+        return result
+
+    def __aiter__(self) -> "ModelStream":
+        return self
+
+    async def __anext__(self) -> str:
+        if self._started is None:
+            self._started = time.perf_counter()
+        try:
+            delta = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self.completed = True
+            self.latency_seconds = time.perf_counter() - self._started
+            raise
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.perf_counter() - self._started
+        self._chunks.append(delta)
+        return delta
+
+    async def aclose(self) -> None:
+        """
+        PURPOSE: Stop the underlying provider stream early (closes the HTTP response).
+        """
+        await self._iterator.aclose()
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_manager: Optional[ModelManager] = None
+
+
+def get_model_manager() -> ModelManager:
+    """
+    PURPOSE: Return the process-wide ModelManager (created on first use).
+    NOTE: The FastAPI app creates it at startup via init_model_manager().
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = ModelManager()
+    return _shared_manager
+
+
+def init_model_manager() -> ModelManager:
+    """
+    PURPOSE: Eagerly build the shared ModelManager (app startup hook).
+    """
+    manager = get_model_manager()
+    logger.info("ModelManager initialized (shared provider connection pools ready)")
+    return manager
+
+
+async def close_model_manager() -> None:
+    """
+    PURPOSE: Release the shared ModelManager and its connection pools (app shutdown hook).
+    """
+    global _shared_manager
+    if _shared_manager is not None:
+        await _shared_manager.aclose()
+        _shared_manager = None
@@ -0,0 +1,102 @@
+"""
+FILE: prompt_cache.py
+PATH: yugnex/backend/core/prompt_cache.py
+PURPOSE: Provider-side prompt caching for the large, static part of agent system prompts.
+WORKING:
+    1. Callers send the system prompt as two text blocks: a stable prefix (persona + rules)
+       followed by the volatile suffix (project memory, files).
+    2. Claude: the prefix block gets an Anthropic 'cache_control' breakpoint, so repeat
+       calls read it from the prompt cache instead of reprocessing it.
+    3. Gemini: the blocks are flattened back into one string with the prefix first;
+       Gemini 2.5 caches repeated prompt prefixes implicitly.
+    4. PromptCacheStats accumulates cache read / write token counts per model from the
+       responses' usage metadata (parsed by parse_usage, also used for ModelResult).
+USAGE:
+    messages = prepare_messages("claude", messages)
+    stats.record("claude-sonnet-4-5", response.usage_metadata)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+# Anthropic's default (5 minute) cache breakpoint
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def system_blocks(prefix: str, suffix: str) -> List[Dict[str, Any]]:
+    """
+    PURPOSE: System message content with the cacheable prefix as its first block.
+    """
+    blocks = [{"type": "text", "text": prefix}]
+    if suffix:
+        blocks.append({"type": "text", "text": suffix})
+    return blocks
+
+
+def _flatten(blocks: List[Any]) -> str:
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in blocks)
+
+
+def prepare_messages(provider: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    PURPOSE: Turn provider-neutral split system prompts into what each provider caches.
+    RETURNS: A new message list (the input is not modified).
+    """
+    prepared = []
+    for message in messages:
+        if isinstance(message, SystemMessage) and isinstance(message.content, list) and message.content:
+            if provider == "claude":
+                first, *rest = message.content
+                content = [{**first, "cache_control": CACHE_CONTROL}, *rest]
+            else:
+                content = _flatten(message.content)
+            message = SystemMessage(content=content)
+        prepared.append(message)
+    return prepared
+
+
+def parse_usage(usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    PURPOSE: Normalize LangChain 'usage_metadata' (either provider) into token counts.
+    RETURNS: {"input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens"} (all 0 if missing)
+    """
+    usage = usage or {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+        "cache_read_tokens": details.get("cache_read") or 0,
+        "cache_write_tokens": sum(
+            details.get(key) or 0
+            for key in ("cache_creation", "ephemeral_5m_input_tokens", "ephemeral_1h_input_tokens")
+        ),
+    }
+
+
+class PromptCacheStats:
+    def __init__(self):
+        self._models: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model_id: str, usage: Optional[Dict[str, Any]]) -> None:
+        """
+        PURPOSE: Add one response's (or stream chunk's) usage metadata to the totals.
+        """
+        if not usage:
+            return
+        tokens = parse_usage(usage)
+        totals = self._models.setdefault(
+            model_id, {"input_tokens": 0, "cache_read_tokens": 0, "cache_write_tokens": 0}
+        )
+        for key in totals:
+            totals[key] += tokens[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            model_id: {
+                **totals,
+                "cache_read_ratio": round(totals["cache_read_tokens"] / totals["input_tokens"], 4)
+                if totals["input_tokens"] else 0.0,
+            }
+            for model_id, totals in self._models.items()
+        }
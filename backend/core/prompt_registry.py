@@ -0,0 +1,148 @@
+"""
+FILE: prompt_registry.py
+PATH: yugnex/backend/core/prompt_registry.py
+PURPOSE: Agent persona prompts, loaded once and kept in memory (no disk I/O per request).
+WORKING:
+    1. At startup every 'config/prompts/*.txt' is read into an immutable PromptTemplate with
+       its SHA-256 and token estimate. The directory is resolved from this file, not the CWD.
+    2. Agents look prompts up by key - a dict read, never a file read.
+    3. A background task checks the files' mtimes every PROMPT_RELOAD_INTERVAL_SECONDS
+       (in a worker thread, off the event loop) and swaps in changed, new or deleted files,
+       so prompt edits go live without a restart.
+    4. The hash identifies the exact prompt version (stable key for prompt / response caching).
+USAGE:
+    prompt = get_prompt_registry().get("tilotma")
+    if prompt:
+        print(prompt.sha256[:12], prompt.tokens)
+"""
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from core.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "config" / "prompts"
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    key: str
+    text: str
+    sha256: str
+    tokens: int
+    mtime: float
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PromptTemplate":
+        text = path.read_text(encoding="utf-8")
+        return cls(
+            key=path.stem,
+            text=text,
+            sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            tokens=estimate_tokens(text),
+            mtime=path.stat().st_mtime,
+        )
+
+
+class PromptRegistry:
+    def __init__(self, directory: Path = PROMPTS_DIR):
+        """
+        PURPOSE: Load every prompt file in 'directory' (blocking - call at startup).
+        """
+        self.directory = Path(directory)
+        self._prompts: Dict[str, PromptTemplate] = {}
+        self._watcher: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.reload_changed()
+
+    def get(self, key: str) -> Optional[PromptTemplate]:
+        return self._prompts.get(key)
+
+    def keys(self) -> List[str]:
+        return sorted(self._prompts)
+
+    def reload_changed(self) -> List[str]:
+        """
+        PURPOSE: Re-read files whose mtime changed, add new ones, drop deleted ones.
+        RETURNS: Keys that changed.
+        NOTE: Blocking file I/O - run it in a thread from async code.
+        """
+        try:
+            paths = {path.stem: path for path in self.directory.glob("*.txt")}
+        except OSError as e:
+            logger.error(f"Cannot list prompt directory {self.directory}: {e}")
+            return []
+
+        # Build the new mapping aside and swap it in one assignment (readers never see a partial state)
+        prompts = {key: prompt for key, prompt in self._prompts.items() if key in paths}
+        changed = [key for key in self._prompts if key not in paths]
+        for key, path in paths.items():
+            current = prompts.get(key)
+            try:
+                if current is not None and path.stat().st_mtime == current.mtime:
+                    continue
+                prompts[key] = PromptTemplate.from_file(path)
+                changed.append(key)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error(f"Could not load prompt {path}: {e}")  # Keep the previous version, if any
+
+        if changed:
+            self._prompts = prompts
+            self.reloads += 1
+            logger.info(f"Prompts loaded: {', '.join(sorted(changed))}")
+        return changed
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_changed)
+            except Exception as e:
+                logger.error(f"Prompt reload failed: {e}")
+
+    def start_watching(self, interval: Optional[float] = None) -> None:
+        """
+        PURPOSE: Start the mtime watcher on the running event loop (app startup).
+        """
+        interval = settings.PROMPT_RELOAD_INTERVAL_SECONDS if interval is None else interval
+        if interval and (self._watcher is None or self._watcher.done()):
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def stop_watching(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reloads": self.reloads,
+            "prompts": {key: {"sha256": p.sha256[:12], "tokens": p.tokens} for key, p in sorted(self._prompts.items())},
+        }
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    PURPOSE: Return the process-wide prompt registry (loaded on first use).
+    NOTE: The FastAPI app loads it at startup, so requests never touch the disk.
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = PromptRegistry()
+    return _shared_registry
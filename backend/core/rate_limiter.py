@@ -0,0 +1,162 @@
+"""
+FILE: rate_limiter.py
+PATH: yugnex/backend/core/rate_limiter.py
+PURPOSE: Client-side token buckets that mirror each model's provider rate limits.
+WORKING:
+    1. Every model gets a request bucket (RPM) and an input-token bucket (TPM),
+       sized from settings and refilled continuously.
+    2. Calls consume from both buckets; the router checks 'has_capacity' first and
+       switches provider BEFORE a call would hit a 429.
+    3. Provider responses re-sync the buckets from rate-limit headers
+       (anthropic-ratelimit-*), and a 429 blocks the model until 'retry-after'.
+USAGE:
+    limiter = RateLimiterRegistry().get("claude-sonnet-4-5")
+    if limiter.has_capacity(estimated_tokens):
+        limiter.acquire(estimated_tokens)
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        PURPOSE: Full bucket of 'capacity' tokens, refilled at 'refill_per_second'.
+        """
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def has(self, amount: float) -> bool:
+        return self.available >= amount
+
+    def consume(self, amount: float) -> None:
+        """
+        PURPOSE: Take tokens even if that goes negative (the call is made anyway;
+                 the debt delays the next caller instead).
+        """
+        self._refill()
+        self._tokens -= amount
+
+    def sync(self, limit: Optional[float] = None, remaining: Optional[float] = None) -> None:
+        """
+        PURPOSE: Re-align the bucket with what the provider reports.
+        """
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+            self.refill_per_second = float(limit) / 60.0
+        if remaining is not None:
+            self._tokens = min(self.capacity, float(remaining))
+
+    def fill_level(self) -> float:
+        return max(0.0, self.available) / self.capacity if self.capacity else 0.0
+
+
+class ModelRateLimiter:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self._blocked_until = 0.0
+        self.throttled = 0  # Times a 429 was received
+
+    def has_capacity(self, estimated_tokens: int = 0) -> bool:
+        """
+        PURPOSE: Would a call with this many input tokens fit right now?
+        """
+        if time.monotonic() < self._blocked_until:
+            return False
+        return self.requests.has(1) and self.tokens.has(min(estimated_tokens, self.tokens.capacity))
+
+    def acquire(self, estimated_tokens: int = 0) -> None:
+        self.requests.consume(1)
+        self.tokens.consume(estimated_tokens)
+
+    def block_for(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.throttled += 1
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        PURPOSE: Sync buckets from Anthropic 'anthropic-ratelimit-*' response headers.
+        """
+        def number(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.requests.sync(
+            limit=number("anthropic-ratelimit-requests-limit"),
+            remaining=number("anthropic-ratelimit-requests-remaining"),
+        )
+        token_kind = "input-tokens" if headers.get("anthropic-ratelimit-input-tokens-limit") else "tokens"
+        self.tokens.sync(
+            limit=number(f"anthropic-ratelimit-{token_kind}-limit"),
+            remaining=number(f"anthropic-ratelimit-{token_kind}-remaining"),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_available": round(self.requests.available, 2),
+            "requests_fill": round(self.requests.fill_level(), 4),
+            "tokens_available": round(self.tokens.available),
+            "tokens_fill": round(self.tokens.fill_level(), 4),
+            "blocked_for_s": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "throttled": self.throttled,
+        }
+
+
+class RateLimiterRegistry:
+    def __init__(self):
+        self._limiters: Dict[str, ModelRateLimiter] = {}
+        self._overrides = self._load_overrides()
+
+    @staticmethod
+    def _load_overrides() -> Dict[str, Dict[str, int]]:
+        if not settings.RATE_LIMIT_OVERRIDES:
+            return {}
+        try:
+            return json.loads(settings.RATE_LIMIT_OVERRIDES)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid RATE_LIMIT_OVERRIDES, using defaults: {e}")
+            return {}
+
+    def get(self, model_id: str) -> ModelRateLimiter:
+        """
+        PURPOSE: Limiter for a model (sized from settings on first use).
+        """
+        limiter = self._limiters.get(model_id)
+        if limiter is None:
+            if model_id.startswith("claude"):
+                rpm, tpm = settings.RATE_LIMIT_CLAUDE_RPM, settings.RATE_LIMIT_CLAUDE_TPM
+            else:
+                rpm, tpm = settings.RATE_LIMIT_GEMINI_RPM, settings.RATE_LIMIT_GEMINI_TPM
+            override = self._overrides.get(model_id, {})
+            limiter = self._limiters[model_id] = ModelRateLimiter(
+                requests_per_minute=override.get("rpm", rpm),
+                tokens_per_minute=override.get("tpm", tpm),
+            )
+        return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        return {model_id: limiter.stats() for model_id, limiter in self._limiters.items()}
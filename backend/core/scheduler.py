@@ -0,0 +1,200 @@
+"""
+FILE: scheduler.py
+PATH: yugnex/backend/core/scheduler.py
+PURPOSE: Priority-aware admission of LLM calls, so background work cannot push chat latency up.
+WORKING:
+    1. Each model has a global concurrency limit (calls in flight to the provider).
+    2. Calls beyond the limit wait in one queue per model, ordered by lane:
+       interactive (chat) < handoff (agent-to-agent) < background (reviews, batches).
+    3. Aging: every 'aging_seconds' a call waits, it is treated as one lane more urgent,
+       so background work is delayed under load but never starved.
+    4. The lane of a call comes from the 'current_lane' context variable; entry points set
+       it with 'use_lane' (AIRouter.process_request(priority=...), batches, handoffs).
+    5. Queue depth and wait times per model/lane are kept for /api/metrics.
+USAGE:
+    with use_lane(LANE_BACKGROUND):
+        async with scheduler.slot("claude-sonnet-4-5"):
+            ...call the provider...
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_HANDOFF = "handoff"
+LANE_BACKGROUND = "background"
+LANES = {LANE_INTERACTIVE: 0, LANE_HANDOFF: 1, LANE_BACKGROUND: 2}
+
+# Lane of the LLM calls made by the current task (inherited by child tasks)
+current_lane: ContextVar[str] = ContextVar("llm_call_lane", default=LANE_INTERACTIVE)
+
+
+@contextlib.contextmanager
+def use_lane(lane: str) -> Iterator[None]:
+    """
+    PURPOSE: Run the enclosed LLM calls in a priority lane.
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown priority lane: {lane}. Use one of {list(LANES)}")
+    token = current_lane.set(lane)
+    try:
+        yield
+    finally:
+        current_lane.reset(token)
+
+
+@dataclass
+class _Waiter:
+    lane: str
+    seq: int
+    enqueued_at: float
+    future: asyncio.Future
+
+
+@dataclass
+class _ModelQueue:
+    limit: int
+    running: int = 0
+    waiters: List[_Waiter] = field(default_factory=list)
+
+
+class CallScheduler:
+    def __init__(self, default_limit: int = 8, limits: Optional[Dict[str, int]] = None, aging_seconds: float = 10.0):
+        """
+        PURPOSE: Create a scheduler.
+        PARAMS:
+            default_limit: Max concurrent calls per model.
+            limits: Per-model overrides (model id -> limit).
+            aging_seconds: Waiting this long promotes a call by one lane.
+        """
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.aging_seconds = aging_seconds
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._seq = itertools.count()
+
+        # Metrics: recent wait times per lane, calls per lane
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=500) for lane in LANES}
+        self.admitted: Dict[str, int] = {lane: 0 for lane in LANES}
+
+    def _queue(self, model_id: str) -> _ModelQueue:
+        queue = self._queues.get(model_id)
+        if queue is None:
+            queue = self._queues[model_id] = _ModelQueue(limit=self.limits.get(model_id, self.default_limit))
+        return queue
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> tuple[float, int]:
+        aged = (now - waiter.enqueued_at) / self.aging_seconds if self.aging_seconds > 0 else 0.0
+        return (LANES[waiter.lane] - aged, waiter.seq)
+
+    def _dispatch(self, queue: _ModelQueue) -> None:
+        """
+        PURPOSE: Hand free slots to the most urgent waiters.
+        """
+        now = time.monotonic()
+        while queue.running < queue.limit and queue.waiters:
+            waiter = min(queue.waiters, key=lambda w: self._effective_priority(w, now))
+            queue.waiters.remove(waiter)
+            if waiter.future.done():  # Cancelled while queued
+                continue
+            queue.running += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, model_id: str, lane: Optional[str] = None) -> None:
+        """
+        PURPOSE: Wait for a slot on this model (call release() when done).
+        """
+        lane = lane or current_lane.get()
+        queue = self._queue(model_id)
+        started = time.monotonic()
+
+        if queue.running < queue.limit and not queue.waiters:
+            queue.running += 1
+        else:
+            waiter = _Waiter(lane, next(self._seq), started, asyncio.get_running_loop().create_future())
+            queue.waiters.append(waiter)
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter in queue.waiters:
+                    queue.waiters.remove(waiter)
+                elif waiter.future.done() and not waiter.future.cancelled():
+                    # Slot was granted as we were cancelled - pass it on
+                    self.release(model_id)
+                raise
+
+        waited = time.monotonic() - started
+        self._waits[lane].append(waited)
+        self.admitted[lane] += 1
+        if waited > 1.0:
+            logger.info(f"LLM call to {model_id} ({lane}) waited {waited:.1f}s for a slot")
+
+    def release(self, model_id: str) -> None:
+        queue = self._queue(model_id)
+        queue.running = max(0, queue.running - 1)
+        self._dispatch(queue)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model_id: str, lane: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        PURPOSE: 'async with' form of acquire/release.
+        """
+        await self.acquire(model_id, lane)
+        try:
+            yield
+        finally:
+            self.release(model_id)
+
+    def stats(self) -> Dict[str, Any]:
+        def summary(waits: Deque[float]) -> Dict[str, Any]:
+            ordered = sorted(waits)
+            return {
+                "avg_wait_s": round(sum(ordered) / len(ordered), 4) if ordered else None,
+                "p95_wait_s": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4) if ordered else None,
+                "max_wait_s": round(ordered[-1], 4) if ordered else None,
+            }
+
+        return {
+            "models": {
+                model_id: {
+                    "limit": queue.limit,
+                    "running": queue.running,
+                    "queued": {lane: sum(1 for w in queue.waiters if w.lane == lane) for lane in LANES},
+                }
+                for model_id, queue in self._queues.items()
+            },
+            "lanes": {lane: {"admitted": self.admitted[lane], **summary(self._waits[lane])} for lane in LANES},
+        }
+
+
+def _limits_from_settings() -> Dict[str, int]:
+    if not settings.SCHEDULER_CONCURRENCY_OVERRIDES:
+        return {}
+    try:
+        return json.loads(settings.SCHEDULER_CONCURRENCY_OVERRIDES)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Invalid SCHEDULER_CONCURRENCY_OVERRIDES, using defaults: {e}")
+        return {}
+
+
+def create_scheduler() -> CallScheduler:
+    """
+    PURPOSE: Scheduler configured from settings (one per ModelManager).
+    """
+    return CallScheduler(
+        default_limit=settings.SCHEDULER_MAX_CONCURRENCY_PER_MODEL,
+        limits=_limits_from_settings(),
+        aging_seconds=settings.SCHEDULER_AGING_SECONDS,
+    )
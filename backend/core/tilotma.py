@@ -4,51 +4,92 @@ PATH: yugnex/backend/core/tilotma.py
 PURPOSE: Implementation of the Chief AI Officer (Tilotma).
 WORKING:
     1. Inherits from BaseAgent.
-    2. Overrides 'run' if specific orchestration logic is needed.
-    3. Acts as the gateway to the rest of the team (delegation logic will go here in v2).
+    2. Overrides 'invoke' (and so 'run') for her orchestration logic.
+    3. Acts as the gateway to the rest of the team: with TILOTMA_FANOUT_ENABLED, a planning
+       request ("build / design / plan ...") is fanned out to Advait (technical plan),
+       Saanvi (requirements) and Navya (risk review) in parallel, and she merges their
+       results into one answer. Any other turn she answers directly.
+    4. If every branch fails she answers the request herself.
 USAGE:
-    tilotma = Tilotma(db_session)
-    response = await tilotma.run("Build me a website")
+    tilotma = AgentRegistry.get_agent("tilotma")
+    response = await tilotma.run("Build me a website", AgentContext(db=db_session))
 """
 
 import logging
-from sqlalchemy.ext.asyncio import AsyncSession
+import re
+from typing import List, Optional
 from agents.base import BaseAgent
+from agents.collaboration.fanout import FanoutBranch, FanoutManager
+from agents.context import AgentContext
+from config.settings import settings
+from core.model_manager import ModelResult
 
 logger = logging.getLogger(__name__)
 
+# Requests that open a new piece of work and benefit from the whole team
+# (whole words only: "planet", "rebuild" or "the architecture?" don't fan out)
+FANOUT_TRIGGERS = re.compile(r"\b(?:build|design|plan|architect|new project|create an?)\b", re.IGNORECASE)
+
+# Independent subtasks of such a request (one per specialist)
+FANOUT_BRANCHES = (
+    FanoutBranch("advait", "Draft the technical plan: tech stack, data model, key API endpoints."),
+    FanoutBranch("saanvi", "Write the requirements as user stories with acceptance criteria; list open questions."),
+    FanoutBranch("navya", "Review the request for risks: security, scalability, edge cases and likely failure points."),
+)
+
+
 class Tilotma(BaseAgent):
-    def __init__(self, db: AsyncSession):
+    def __init__(self):
         """
         PURPOSE: Initialize Tilotma with her specific key.
         """
-        super().__init__(db, agent_key="tilotma")
-
-    async def run(
-        self, 
-        user_input: str, 
-        project_id: int = None, 
-        conversation_id: int = None,
-        context_files: str = None
-    ) -> str:
+        super().__init__(agent_key="tilotma")
+
+    def plan_fanout(self, user_input: str) -> List[FanoutBranch]:
+        """
+        PURPOSE: Decide which specialists should work on this turn in parallel.
+        RETURNS: The branches to run (empty = Tilotma answers directly).
+        """
+        if not settings.TILOTMA_FANOUT_ENABLED:
+            return []
+        return list(FANOUT_BRANCHES) if FANOUT_TRIGGERS.search(user_input) else []
+
+    async def invoke(
+        self,
+        user_input: str,
+        ctx: Optional[AgentContext] = None,
+        context_files: str = None,
+        **routing
+    ) -> ModelResult:
         """
         PURPOSE: Process user input as the Chief AI Officer.
-        NOTE: In v1, Tilotma handles the conversation directly. 
-              In v2, this method will parse intent and call 'advait.run()' etc.
+        WORKING:
+            1. Plan the turn: fan out to the team, or answer directly.
+            2. Fan-out: recall project memory once, run the branches concurrently,
+               then merge their outputs (the merged result carries every branch's tokens).
         """
         logger.info(f"Tilotma processing: {user_input[:50]}...")
-        
-        # In the future, we can add 'intent detection' logic here.
-        # Example:
-        # if "review this code" in user_input:
-        #     return await self.delegate_to_navya(user_input, ...)
-
-        # For v1 Phase 2, she processes it using her System Prompt + Router
-        response = await super().run(
-            user_input=user_input,
-            project_id=project_id,
-            conversation_id=conversation_id,
-            context_files=context_files
+        ctx = ctx or AgentContext()
+
+        # 1. Plan
+        branches = self.plan_fanout(user_input)
+        if not branches:
+            return await super().invoke(user_input=user_input, ctx=ctx, context_files=context_files, **routing)
+
+        # 2. Fan out (branches don't share the DB session, so memory is recalled here, once)
+        shared_context = await ctx.recall_memory()
+        fanout = await FanoutManager.fan_out(
+            branches,
+            request=user_input,
+            ctx=ctx,
+            context=shared_context,
+            context_files=context_files,
+            from_agent_key=self.agent_key
         )
-        
-        return response
\ No newline at end of file
+        if not fanout.succeeded:
+            logger.warning("Every fan-out branch failed; Tilotma answers directly")
+            return await super().invoke(user_input=user_input, ctx=ctx, context_files=context_files, **routing)
+
+        # 3. Merge
+        merged = await super().invoke(user_input=fanout.merge_prompt(user_input), ctx=ctx)
+        return fanout.with_branch_usage(merged)
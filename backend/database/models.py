@@ -4,7 +4,7 @@ PATH: yugnex/backend/database/models.py
 PURPOSE: Defines the database schema (tables) using SQLAlchemy ORM.
 WORKING:
     1. Imports types and Base class.
-    2. Defines classes for Users, Projects, Conversations, Messages, etc.
+    2. Defines classes for Users, Projects, Conversations, Messages, Workflow Checkpoints, etc.
     3. Configures relationships between tables.
 USAGE:
     new_user = User(email="...", username="...")
@@ -13,7 +13,7 @@ USAGE:
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from sqlalchemy import String, Integer, Boolean, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Integer, Boolean, Text, DateTime, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from database.connection import Base
@@ -142,4 +142,21 @@ class AgentLog(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Step 3: Relationships
-    conversation: Mapped["Conversation"] = relationship("Conversation", back_populates="agent_logs")
\ No newline at end of file
+    conversation: Mapped["Conversation"] = relationship("Conversation", back_populates="agent_logs")
+
+
+# --- Workflow Checkpoints Table ---
+class WorkflowCheckpoint(Base):
+    __tablename__ = "workflow_checkpoints"
+    __table_args__ = (UniqueConstraint("run_id", "step", name="uq_workflow_checkpoints_run_step"),)
+
+    # Step 1: Primary Fields
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    run_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    step: Mapped[str] = mapped_column(String(100), nullable=False)
+    input_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # SHA-256 of the step's inputs
+    output: Mapped[Dict[str, Any]] = mapped_column(JSON, default={})  # {"value": <step result>}
+    
+    # Step 2: Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
@@ -4,7 +4,7 @@ PATH: yugnex/backend/memory/conversation.py
 PURPOSE: Manages chat history and context retrieval for active conversations.
 WORKING:
     1. create_conversation: Starts a new chat thread.
-    2. add_message: Saves a user or agent message to the DB.
+    2. add_message: Saves a user or agent message to the DB (with model / token usage for replies).
     3. get_history: Retrieves recent messages formatted for the LLM (Context Window).
 USAGE:
     chat_mgr = ConversationManager(db_session)
@@ -15,6 +15,7 @@ USAGE:
 from typing import List, Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from core.model_manager import ModelResult
 from database.models import Conversation, Message
 
 class ConversationManager:
@@ -48,20 +49,25 @@ class ConversationManager:
         role: str, 
         content: str, 
         agent_key: Optional[str] = None,
-        model_used: Optional[str] = None
+        model_used: Optional[str] = None,
+        result: Optional[ModelResult] = None
     ) -> Message:
         """
         PURPOSE: Save a message to the history.
         PARAMS: 
             role: 'user', 'assistant', or 'system'.
             agent_key: 'tilotma', 'advait', etc. (if applicable).
+            result: The ModelResult that produced this message; stores the model that answered,
+                    tokens_used (input + output) and the full usage / timings as metadata.
         """
         new_msg = Message(
             conversation_id=conversation_id,
             role=role,
             content=content,
             agent_key=agent_key,
-            model_used=model_used
+            model_used=model_used or (result.model if result else None),
+            tokens_used=result.total_tokens if result else None,
+            metadata_json=result.metadata() if result else {}
         )
         self.db.add(new_msg)
         await self.db.commit()
@@ -4,6 +4,7 @@ PATH: yugnex/backend/memory/persistent.py
 PURPOSE: The high-level facade for the Memory System.
 """
 
+from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from memory.project_memory import ProjectMemoryManager
 from memory.conversation import ConversationManager
@@ -29,31 +30,39 @@ class MemorySystem:
             importance=importance
         )
 
-    async def recall_context(self, project_id: int) -> str:
+    async def recall_context_entries(self, project_id: int) -> tuple[List[str], List[str]]:
         """
-        PURPOSE: Build a text block of context to feed into an AI Agent's prompt.
+        PURPOSE: The memory lines behind recall_context, for callers that need to budget them.
+        RETURNS: (critical decisions, most important first; recent updates, newest first)
         """
         # 1. Get Critical Context (High Importance)
         critical_items = await self.project_memory.get_important(project_id, min_importance=8, limit=5)
         
         # 2. Get Recent Context (Short-term memory)
         recent_items = await self.project_memory.get_recent(project_id, limit=5)
-        
+
+        # Avoid duplicates if an item is both critical and recent
+        critical = [f"- [{item.memory_type.upper()}] {item.content}" for item in critical_items]
+        recent = [f"- [{item.memory_type.upper()}] {item.content}" for item in recent_items if item not in critical_items]
+        return critical, recent
+
+    async def recall_context(self, project_id: int) -> str:
+        """
+        PURPOSE: Build a text block of context to feed into an AI Agent's prompt.
+        """
+        critical, recent = await self.recall_context_entries(project_id)
+
         # 3. Format Output
         context_lines = ["--- PROJECT CONTEXT ---"]
         
-        if critical_items:
+        if critical:
             context_lines.append("\n[CRITICAL DECISIONS]")
-            for item in critical_items:
-                context_lines.append(f"- [{item.memory_type.upper()}] {item.content}")
+            context_lines.extend(critical)
                 
-        if recent_items:
+        if recent:
             context_lines.append("\n[RECENT UPDATES]")
-            for item in recent_items:
-                # Avoid duplicates if an item is both critical and recent
-                if item not in critical_items:
-                    context_lines.append(f"- [{item.memory_type.upper()}] {item.content}")
+            context_lines.extend(recent)
         
         context_lines.append("-----------------------")
         
-        return "\n".join(context_lines)
\ No newline at end of file
+        return "\n".join(context_lines)
@@ -5,28 +5,74 @@ PURPOSE: Determines which AI model should handle a specific task.
 WORKING:
     1. select_model: Implements the logic table from Blueprint Part 11.
     2. process_request: Orchestrates the call to ModelManager.
-    3. Handles the 'fallback' logic (if Claude fails, try Gemini).
+    3. stream_request: Same routing, but streams tokens as they arrive.
+    4. Handles the 'fallback' logic (if Claude fails, try Gemini).
+    5. Hedges latency-sensitive requests: fires the other provider if the primary is slow.
+    6. Skips providers whose circuit breaker is open (per provider/model).
+    7. Switches provider before the call when a model's rate-limit budget is exhausted.
+    8. Coalesces identical concurrent requests into one upstream call (single-flight).
+    9. Adapts model choice to live latency / error rate / cost (static table as fallback).
+    10. Fits context sections (memory, files) into the model's context window before the call.
+    11. Runs under the request deadline: the fallback only gets the time the primary left over.
+    12. 'invoke' returns a ModelResult (who answered, why, tokens, latency, context-window use);
+        'process_request' just the text.
 USAGE:
-    router = AIRouter()
+    router = AIRouter()  # Borrows the process-wide ModelManager
     response = await router.process_request("Create a DB schema", task_type="architecture")
+    result = await router.invoke("Create a DB schema", task_type="architecture")  # + usage / model
 """
 
+import asyncio
 import logging
+import time
+from dataclasses import replace
 from typing import List, Optional
 from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
 
-from core.model_manager import ModelManager
+from core.model_manager import ModelManager, ModelResult, ModelStream, get_model_manager
+from services.response_cache import ResponseCache, get_response_cache
+from services.similarity_cache import SimilarityCache, get_similarity_cache
+from services.model_scoreboard import ModelScoreboard, get_model_scoreboard
+from services.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, get_circuit_breakers
+from services.single_flight import SingleFlight, get_single_flight
+from services.model_selector import ModelSelector, estimate_cost
+from services.context_budget import BudgetReport, ContextBudgetPlanner, ContextSection, get_context_budget
+from core.tokens import estimate_tokens
+from core.scheduler import LANE_INTERACTIVE, use_lane
+from core.deadline import Deadline, DeadlineExceededError, current_deadline, use_deadline
+from core.prompt_cache import system_blocks
+from core.errors import FATAL, RETRYABLE, ProviderNotConfiguredError, ProviderUnavailableError, classify_error
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 class AIRouter:
-    def __init__(self):
-        self.manager = ModelManager()
+    def __init__(
+        self,
+        manager: Optional[ModelManager] = None,
+        cache: Optional[ResponseCache] = None,
+        similarity_cache: Optional[SimilarityCache] = None,
+        scoreboard: Optional[ModelScoreboard] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        flights: Optional[SingleFlight] = None,
+        budget: Optional[ContextBudgetPlanner] = None
+    ):
+        """
+        PURPOSE: Bind the router to a ModelManager and the response caches.
+        NOTE: Defaults to the shared process-wide instances so routers are cheap to create.
+        """
+        self.manager = manager or get_model_manager()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.similarity_cache = similarity_cache if similarity_cache is not None else get_similarity_cache()
+        self.scoreboard = scoreboard if scoreboard is not None else get_model_scoreboard()
+        self.breakers = breakers if breakers is not None else get_circuit_breakers()
+        self.flights = flights if flights is not None else get_single_flight()
+        self.selector = ModelSelector(self.scoreboard)
+        self.budget = budget if budget is not None else get_context_budget()
 
     def select_model(self, task_type: str, complexity: str = "medium", requires_speed: bool = False) -> tuple[str, Optional[str]]:
         """
-        PURPOSE: Select the best model based on task requirements.
+        PURPOSE: Static model policy (quality floor for the adaptive selector, and its fallback).
         RULES:
             - Complex/Architecture/Review -> Claude Opus 4.5 (smartest)
             - Simple/Quick/Bulk -> Gemini or Claude Haiku (fastest)
@@ -52,65 +98,580 @@ class AIRouter:
         # Default: Claude Sonnet 4.5 (best balance)
         return ("claude", "claude-sonnet-4-5")
 
-    async def process_request(
+    def _resolve_target(
+        self,
+        task_type: str,
+        complexity: str,
+        requires_speed: bool,
+        model_override: Optional[str]
+    ) -> tuple[tuple[str, Optional[str]], str]:
+        """
+        PURPOSE: Turn the request options into (provider, specific_model).
+        RETURNS: ((provider, specific_model), why this model was chosen).
+        """
+        if model_override:
+            # Parse override: could be "claude", "gemini", or specific model like "claude-sonnet-4-5"
+            reason = f"Model override: {model_override}"
+            if model_override.startswith("claude-"):
+                return ("claude", model_override), reason
+            elif model_override == "claude":
+                return ("claude", None), reason  # Will use default
+            else:
+                return (model_override, None), reason
+
+        static_choice = self.select_model(task_type, complexity, requires_speed)
+        if not settings.ADAPTIVE_ROUTING_ENABLED:
+            return static_choice, f"Static policy for {task_type}/{complexity} (adaptive routing off)"
+
+        selection = self.selector.select(self.manager, task_type, complexity, requires_speed, static_choice)
+        self.scoreboard.record_selection({"task_type": task_type, "complexity": complexity, **selection.explain()})
+        if selection.policy == "adaptive" and selection.target != static_choice:
+            logger.warning(f"Adaptive routing: {selection.reason}")
+        else:
+            logger.debug(f"Model selection: {selection.reason}")
+        return selection.target, selection.reason
+
+    @staticmethod
+    def _fallback_target(target_provider: str) -> Optional[tuple[str, Optional[str]]]:
+        """
+        PURPOSE: Fallback Strategy: Gemini if Claude failed, Claude Haiku if Gemini failed.
+        NOTE: Returns None for Claude when ENABLE_GEMINI_FALLBACK is off.
+        """
+        if target_provider == "claude":
+            return ("gemini", None) if settings.ENABLE_GEMINI_FALLBACK else None
+        return ("claude", "claude-haiku-4-5")
+
+    def fit_context(
+        self,
+        system_instruction: str,
+        prompt: str,
+        context_sections: List[ContextSection],
+        *targets: Optional[tuple[str, Optional[str]]]
+    ) -> str:
+        """
+        PURPOSE: Append the context sections to the system instruction, trimmed to fit the
+                 smallest context window among the models that may answer.
+        RETURNS: The full system instruction (system_instruction stays its unchanged prefix).
+        """
+        return self._fit_context(system_instruction, prompt, context_sections, *targets)[0]
+
+    def _fit_context(
+        self,
+        system_instruction: str,
+        prompt: str,
+        context_sections: List[ContextSection],
+        *targets: Optional[tuple[str, Optional[str]]]
+    ) -> tuple[str, BudgetReport]:
+        """
+        PURPOSE: fit_context plus the budget report (returned with the request's ModelResult).
+        """
+        model_ids = [self.manager.resolve_model_id(*target) for target in targets if target]
+        context, report = self.budget.fit(model_ids, system_instruction, prompt, context_sections)
+        log = logger.warning if report.trimmed else logger.info
+        log(f"Context budget: {report.used}/{report.budget} tokens ({report.utilization:.0%}) for {report.model}"
+            + (f"; dropped {report.dropped}, truncated {report.truncated}" if report.trimmed else ""))
+        return system_instruction + context, report
+
+    def _cache_key(self, provider: str, specific_model: Optional[str], system_instruction: str, prompt: str) -> str:
+        model_id = self.manager.resolve_model_id(provider, specific_model)
+        return ResponseCache.make_key(model_id, system_instruction, prompt)
+
+    def _lookup_cached(
+        self,
+        cache_key: str,
+        provider: str,
+        specific_model: Optional[str],
+        task_type: str,
+        system_instruction: str,
+        prompt: str
+    ) -> Optional[str]:
+        """
+        PURPOSE: Exact-match cache first, then near-duplicate (similarity) cache.
+        """
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Response cache hit for task_type={task_type} ({provider}/{specific_model})")
+            return cached
+
+        if settings.SIMILARITY_CACHE_ENABLED:
+            model_id = self.manager.resolve_model_id(provider, specific_model)
+            hit = self.similarity_cache.lookup(task_type, model_id, system_instruction, prompt)
+            if hit is not None:
+                logger.info(f"Similarity cache hit for task_type={task_type} ({model_id}), similarity={hit.similarity:.3f}")
+                return hit.response
+        return None
+
+    def _remember(
+        self,
+        cache_key: str,
+        provider: str,
+        specific_model: Optional[str],
+        task_type: str,
+        system_instruction: str,
+        prompt: str,
+        response: str,
+        cache_ttl: Optional[float]
+    ) -> None:
+        """
+        PURPOSE: Store a fresh response in both caches.
+        """
+        self.cache.set(cache_key, response, ttl=cache_ttl)
+        if settings.SIMILARITY_CACHE_ENABLED:
+            model_id = self.manager.resolve_model_id(provider, specific_model)
+            self.similarity_cache.add(task_type, model_id, system_instruction, prompt, response)
+
+    @staticmethod
+    def _build_messages(prompt: str, system_instruction: str, cacheable_prefix: Optional[str] = None) -> List[BaseMessage]:
+        """
+        PURPOSE: System + user messages; a cacheable prefix is sent as its own first block
+                 so ModelManager can apply provider prompt caching to it.
+        """
+        if cacheable_prefix and system_instruction.startswith(cacheable_prefix):
+            system_content = system_blocks(cacheable_prefix, system_instruction[len(cacheable_prefix):])
+        else:
+            system_content = system_instruction
+        return [
+            SystemMessage(content=system_content),
+            HumanMessage(content=prompt)
+        ]
+
+    def _should_hedge(self, complexity: str, requires_speed: bool, model_override: Optional[str]) -> bool:
+        """
+        PURPOSE: Hedging only pays off for latency-sensitive, cheap requests.
+        """
+        if settings.HEDGE_MODE not in ("hedge", "race") or model_override:
+            return False
+        return requires_speed or complexity == "low"
+
+    def _hedge_delay(self, provider: str, specific_model: Optional[str]) -> float:
+        """
+        PURPOSE: How long to wait for the primary before firing the secondary.
+        RULES: 0 in race mode; otherwise the primary's HEDGE_DELAY_QUANTILE latency
+               (or HEDGE_DEFAULT_DELAY_SECONDS until enough samples exist).
+        """
+        if settings.HEDGE_MODE == "race":
+            return 0.0
+        model_id = self.manager.resolve_model_id(provider, specific_model)
+        delay = self.scoreboard.latency_quantile(model_id, settings.HEDGE_DELAY_QUANTILE, min_samples=settings.HEDGE_MIN_SAMPLES)
+        return settings.HEDGE_DEFAULT_DELAY_SECONDS if delay is None else delay
+
+    def _breaker(self, provider: str, specific_model: Optional[str]) -> CircuitBreaker:
+        return self.breakers.get(f"{provider}/{self.manager.resolve_model_id(provider, specific_model)}")
+
+    def _available_targets(
+        self,
+        *candidates: Optional[tuple[str, Optional[str]]],
+        estimated_tokens: int = 0
+    ) -> List[tuple[str, Optional[str]]]:
+        """
+        PURPOSE: Drop providers that can't answer right now (not configured / circuit open),
+                 so requests go straight to the healthy one instead of waiting for a failure.
+        NOTE: With AUTO_SWITCH_ON_RATE_LIMIT, a model whose rate-limit buckets are empty is
+              moved behind the others (switch BEFORE the call, not after a 429).
+        """
+        available = []
+        for candidate in candidates:
+            if candidate is None:
+                continue
+            provider, specific_model = candidate
+            if not self.manager.is_configured(provider):
+                logger.info(f"Skipping {provider}: not configured")
+            elif not self._breaker(provider, specific_model).allow_request():
+                logger.warning(f"Circuit open for {provider} ({specific_model}); routing to the next provider")
+            else:
+                available.append(candidate)
+
+        if settings.AUTO_SWITCH_ON_RATE_LIMIT and len(available) > 1:
+            with_capacity = [t for t in available if self.manager.has_capacity(*t, estimated_tokens=estimated_tokens)]
+            if with_capacity and with_capacity[0] != available[0]:
+                logger.warning(f"Rate limit budget exhausted for {available[0][0]} ({available[0][1]}); switching to {with_capacity[0][0]}")
+            available = with_capacity + [t for t in available if t not in with_capacity]
+        return available
+
+    @staticmethod
+    def _check_deadline(provider: str, specific_model: Optional[str], last_error: Optional[BaseException] = None) -> None:
+        """
+        PURPOSE: Don't start another provider once the request deadline has run out.
+        """
+        deadline = current_deadline.get()
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceededError(
+                f"Request deadline of {deadline.seconds:.0f}s exceeded before trying {specific_model or provider}"
+            ) from last_error
+
+    @staticmethod
+    def _is_provider_failure(error: BaseException) -> bool:
+        """
+        PURPOSE: Did the provider fail (timeouts, 429, 5xx), rather than the request itself?
+        NOTE: A spent request deadline (slow caller, long local queue) says nothing about the
+              provider's health, so it is neither a failure nor a success.
+        """
+        return classify_error(error) == RETRYABLE and not isinstance(error, DeadlineExceededError)
+
+    @classmethod
+    def _record_error(cls, breaker: CircuitBreaker, error: BaseException) -> None:
+        """
+        PURPOSE: Only provider failures count against a breaker.
+                 A fatal 4xx proves the provider is up; config errors never reached it.
+        """
+        if cls._is_provider_failure(error):
+            breaker.record_failure()
+        elif classify_error(error) == FATAL and not isinstance(error, ProviderNotConfiguredError):
+            breaker.record_success()
+
+    async def _timed_invoke(self, provider: str, specific_model: Optional[str], messages: List[BaseMessage]) -> ModelResult:
+        """
+        PURPOSE: invoke_model + record latency, outcome and spend on the scoreboard,
+                 and the outcome on the breaker.
+        NOTE: The latency recorded is the provider's ('provider_seconds', measured by the
+              manager after the scheduler slot is held), so a busy local queue or retry
+              backoff doesn't make a healthy model look slow. Wall time is only the fallback
+              for managers that don't report it.
+        """
+        breaker = self._breaker(provider, specific_model)
+        model_id = self.manager.resolve_model_id(provider, specific_model)
+        started = time.perf_counter()
+        try:
+            response = await self.manager.invoke_model(provider, messages, specific_claude_model=specific_model)
+        except Exception as e:
+            self._record_error(breaker, e)
+            if self._is_provider_failure(e):
+                self.scoreboard.record_outcome(model_id, ok=False)
+            raise
+        breaker.record_success()
+        provider_seconds = response.provider_seconds
+        self.scoreboard.record_latency(model_id, time.perf_counter() - started if provider_seconds is None else provider_seconds)
+        self._record_success(model_id, response)
+        return response
+
+    def _record_success(self, model_id: str, result: ModelResult) -> None:
+        """
+        PURPOSE: Outcome + spend (the provider's reported token counts) on the scoreboard.
+        """
+        self.scoreboard.record_outcome(model_id, ok=True)
+        self.scoreboard.record_usage(
+            model_id, result.input_tokens, result.output_tokens,
+            estimate_cost(model_id, result.input_tokens, result.output_tokens)
+        )
+
+    async def _invoke_with_fallback(
+        self,
+        targets: List[tuple[str, Optional[str]]],
+        messages: List[BaseMessage]
+    ) -> tuple[ModelResult, str, Optional[str]]:
+        """
+        PURPOSE: Call each target in order until one answers.
+        NOTE: Fatal errors (bad request, config) are raised at once - another provider won't help.
+              A fallback only runs if the request deadline has time left (and gets only that).
+        RETURNS: (response, provider, specific_model) of whoever answered.
+        """
+        last_error: Optional[Exception] = None
+        for index, (provider, specific_model) in enumerate(targets):
+            self._check_deadline(provider, specific_model, last_error)
+            try:
+                return (await self._timed_invoke(provider, specific_model, messages), provider, specific_model)
+            except Exception as e:
+                if classify_error(e) == FATAL:
+                    logger.error(f"Model {provider} ({specific_model}) failed with a non-retryable error: {e}")
+                    raise
+                last_error = e
+                if index == 0:
+                    logger.warning(f"Primary model {provider} ({specific_model}) failed: {e}. Attempting fallback.")
+                else:
+                    logger.error(f"Fallback to {specific_model or provider} also failed: {e}")
+        raise last_error
+
+    def _raise_if_fatal(self, task: asyncio.Task) -> None:
+        """
+        PURPOSE: Re-raise a finished hedge call's fatal error (another provider won't help).
+        """
+        error = task.exception()
+        if error is not None and classify_error(error) == FATAL:
+            logger.error(f"Hedged call failed with a non-retryable error: {error}")
+            raise error
+
+    async def _hedged_invoke(
+        self,
+        primary: tuple[str, Optional[str]],
+        secondary: tuple[str, Optional[str]],
+        messages: List[BaseMessage]
+    ) -> tuple[ModelResult, str, Optional[str]]:
+        """
+        PURPOSE: Hedged request - fire the secondary if the primary is slow, keep the first answer.
+        WORKING:
+            1. Start the primary.
+            2. After the hedge delay (0 in race mode), or as soon as the primary fails,
+               start the secondary too.
+            3. Return the first successful answer and cancel the loser.
+            4. Raise the last error only if both fail.
+        NOTE: A fatal error (bad request, config) is raised at once, as in _invoke_with_fallback -
+              the other provider is not started (or is cancelled).
+        RETURNS: (response, provider, specific_model) of the winner.
+        """
+        delay = self._hedge_delay(*primary)
+        started = time.perf_counter()
+        tasks = {asyncio.create_task(self._timed_invoke(*primary, messages)): primary}
+
+        try:
+            done, pending = await asyncio.wait(tasks.keys(), timeout=delay)
+            winner = next((t for t in done if t.exception() is None), None)
+            for task in done:
+                if task.exception() is not None:
+                    self._raise_if_fatal(task)
+                    logger.warning(f"Primary model {primary[0]} ({primary[1]}) failed: {task.exception()}. Hedging immediately.")
+            if winner is None:
+                self._check_deadline(*secondary, next((t.exception() for t in done), None))
+                tasks[asyncio.create_task(self._timed_invoke(*secondary, messages))] = secondary
+                pending = {t for t in tasks if not t.done()}
+
+            last_error: Optional[BaseException] = None
+            while winner is None and pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        break
+                    self._raise_if_fatal(task)
+                    last_error = task.exception()
+                    logger.warning(f"Hedged call to {tasks[task][0]} ({tasks[task][1]}) failed: {last_error}")
+
+            if winner is None:
+                raise last_error or RuntimeError("Hedged request failed")
+
+            provider, specific_model = tasks[winner]
+            model_id = self.manager.resolve_model_id(provider, specific_model)
+            self.scoreboard.record_hedge_win(model_id)
+            logger.info(
+                f"Hedge winner: {model_id} in {time.perf_counter() - started:.2f}s "
+                f"(mode={settings.HEDGE_MODE}, delay={delay:.2f}s, hedged={len(tasks) > 1})"
+            )
+            return winner.result(), provider, specific_model
+        finally:
+            # Cancel the loser (and anything still running if we are cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def process_request(self, *args, **kwargs) -> str:
+        """
+        PURPOSE: invoke() for callers that only need the response text (same parameters).
+        """
+        return (await self.invoke(*args, **kwargs)).text
+
+    async def invoke(
         self, 
         prompt: str, 
         system_instruction: str, 
         task_type: str = "general", 
         complexity: str = "medium",
         requires_speed: bool = False,
-        model_override: Optional[str] = None
-    ) -> str:
+        model_override: Optional[str] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        cacheable_prefix: Optional[str] = None,
+        context_sections: Optional[List[ContextSection]] = None,
+        priority: str = LANE_INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> ModelResult:
         """
         PURPOSE: Main entry point for Agents to get an AI response.
+        RETURNS: ModelResult - text plus the model that actually answered (after any fallback),
+                 token usage and latency ('cached' for response-cache hits), why that model
+                 was selected and how this request used the context window.
+        PARAMS:
+            priority: Scheduler lane - "interactive" (chat), "handoff" or "background".
+            deadline: Request time budget (defaults to the one inherited from the caller's context);
+                      retries and the fallback provider share whatever is left of it.
+            context_sections: Trimmable context appended to system_instruction after fitting it
+                              into the context window (see services/context_budget.py).
+            cacheable_prefix: Stable leading part of system_instruction (persona + rules);
+                              sent so the provider can cache it across calls.
+            use_cache: Set False to bypass the response cache for this call (no read, no write)
+                       and to get an independent generation (no single-flight coalescing).
+            cache_ttl: Seconds to keep this response fresh (defaults to RESPONSE_CACHE_TTL_SECONDS).
         WORKING:
             1. Selects model based on task requirements (or uses override).
-            2. Constructs message list.
-            3. Calls Manager with specific model.
-            4. Implements fallback logic (Part 11: "Claude hits limit -> Switch to Gemini").
+            2. Returns a cached response for the same model + system instruction + prompt
+               (or, for eligible task types, a near-duplicate prompt).
+            3. Joins an identical request already in flight instead of making a second call.
+            4. Constructs message list.
+            5. Calls Manager with specific model:
+               - providers with an open circuit breaker (or no key) are skipped up front,
+               - latency-sensitive requests are hedged/raced against the fallback provider,
+               - everything else uses fallback logic (Part 11: "Claude hits limit -> Switch to Gemini"),
+               - fatal errors (bad request / config) are raised without a pointless fallback.
+            6. Caches the answer under the model that actually produced it.
+            7. If both providers fail, serves a stale cached answer instead of raising.
         """
-        # 1. Determine Model
-        if model_override:
-            # Parse override: could be "claude", "gemini", or specific model like "claude-sonnet-4-5"
-            if model_override.startswith("claude-"):
-                target_provider = "claude"
-                specific_model = model_override
-            elif model_override == "claude":
-                target_provider = "claude"
-                specific_model = None  # Will use default
-            else:
-                target_provider = model_override
-                specific_model = None
-        else:
-            target_provider, specific_model = self.select_model(task_type, complexity, requires_speed)
+        # 1. Determine Model (and fit the context into its window)
+        (target_provider, specific_model), reason = self._resolve_target(task_type, complexity, requires_speed, model_override)
+        fallback = self._fallback_target(target_provider)
+        budget_report: Optional[BudgetReport] = None
+        if context_sections is not None:
+            system_instruction, budget_report = self._fit_context(
+                system_instruction, prompt, context_sections, (target_provider, specific_model), fallback
+            )
+        explain = dict(selection_reason=reason, context_budget=budget_report.as_dict() if budget_report else None)
+
+        # 2. Response Cache
+        coalesce = use_cache and settings.SINGLE_FLIGHT_ENABLED
+        use_cache = use_cache and settings.RESPONSE_CACHE_ENABLED
+        cache_key = self._cache_key(target_provider, specific_model, system_instruction, prompt) if use_cache else None
+        if cache_key:
+            cached = self._lookup_cached(cache_key, target_provider, specific_model, task_type, system_instruction, prompt)
+            if cached is not None:
+                model_id = self.manager.resolve_model_id(target_provider, specific_model)
+                return ModelResult(text=cached, provider=target_provider, model=model_id, cached=True, **explain)
         
-        # 2. Build Messages
-        messages: List[BaseMessage] = [
-            SystemMessage(content=system_instruction),
-            HumanMessage(content=prompt)
-        ]
+        # 3. Single-flight: identical concurrent requests share one upstream call
+        execute = lambda: self._execute(
+            prompt, system_instruction, task_type, complexity, requires_speed, model_override,
+            target_provider, specific_model, fallback, use_cache, cache_key, cache_ttl, cacheable_prefix
+        )
+        with use_lane(priority), use_deadline(deadline):
+            if coalesce:
+                flight_key = cache_key or self._cache_key(target_provider, specific_model, system_instruction, prompt)
+                result = await self.flights.do(flight_key, execute, for_joiners=self._joined)
+            else:
+                result = await execute()
+        return replace(result, **explain)
+
+    @staticmethod
+    def _joined(result: ModelResult) -> ModelResult:
+        """
+        PURPOSE: A coalesced caller's copy of the leader's result - like a cache hit, it
+                 carries no tokens, so one upstream call is counted (and billed) once.
+        """
+        return replace(
+            result, cached=True, input_tokens=0, output_tokens=0,
+            cache_read_tokens=0, cache_write_tokens=0, usage_estimated=False
+        )
+
+    async def _execute(
+        self,
+        prompt: str,
+        system_instruction: str,
+        task_type: str,
+        complexity: str,
+        requires_speed: bool,
+        model_override: Optional[str],
+        target_provider: str,
+        specific_model: Optional[str],
+        fallback: Optional[tuple[str, Optional[str]]],
+        use_cache: bool,
+        cache_key: Optional[str],
+        cache_ttl: Optional[float],
+        cacheable_prefix: Optional[str]
+    ) -> ModelResult:
+        """
+        PURPOSE: The upstream part of invoke (steps 4-7), run once per single-flight key.
+        """
+        # 4. Build Messages
+        messages = self._build_messages(prompt, system_instruction, cacheable_prefix)
 
-        # 3. Attempt Execution with Fallback
+        # 5. Attempt Execution (hedged, or primary with fallback)
+        if settings.ENV == "development" and specific_model:
+            logger.info(f"Using model: {specific_model} for task_type={task_type}, complexity={complexity}")
+
+        # Providers that are unconfigured or have an open circuit are skipped up front
+        targets = self._available_targets(
+            (target_provider, specific_model), fallback,
+            estimated_tokens=estimate_tokens(system_instruction) + estimate_tokens(prompt)
+        )
         try:
-            if settings.ENV == "development" and specific_model:
-                logger.info(f"Using model: {specific_model} for task_type={task_type}, complexity={complexity}")
-            
-            return await self.manager.invoke_model(target_provider, messages, specific_claude_model=specific_model)
-        except Exception as primary_error:
-            logger.warning(f"Primary model {target_provider} ({specific_model}) failed: {primary_error}. Attempting fallback.")
-            
-            # Fallback Strategy: Try Gemini if Claude failed, or Claude Haiku if other Claude failed
-            if target_provider == "claude":
-                # Try Gemini as fallback
-                try:
-                    return await self.manager.invoke_model("gemini", messages)
-                except Exception as secondary_error:
-                    logger.error(f"Fallback to Gemini also failed: {secondary_error}")
-                    raise secondary_error
+            if not targets:
+                raise ProviderUnavailableError(f"No AI provider available for task_type={task_type} (circuits open)")
+            if len(targets) == 2 and self._should_hedge(complexity, requires_speed, model_override):
+                response, provider, model = await self._hedged_invoke(targets[0], targets[1], messages)
             else:
-                # Try Claude Haiku (fastest Claude) as fallback
+                response, provider, model = await self._invoke_with_fallback(targets, messages)
+        except Exception as error:
+            # 7. Stale-on-outage: an old answer is better than an error (not for bad requests)
+            if use_cache and settings.RESPONSE_CACHE_SERVE_STALE and classify_error(error) == RETRYABLE:
+                fallback_key = self._cache_key(*fallback, system_instruction, prompt) if fallback else None
+                stale = self.cache.get_stale(cache_key) or self.cache.get_stale(fallback_key)
+                if stale is not None:
+                    logger.warning(f"All providers failing; serving stale cached response for task_type={task_type}")
+                    return ModelResult(text=stale, provider=target_provider, cached=True)
+            raise
+
+        # 6. Cache under the model that answered
+        if use_cache:
+            answered_key = self._cache_key(provider, model, system_instruction, prompt)
+            self._remember(answered_key, provider, model, task_type, system_instruction, prompt, response.text, cache_ttl)
+        return response
+
+    def stream_request(
+        self,
+        prompt: str,
+        system_instruction: str,
+        task_type: str = "general",
+        complexity: str = "medium",
+        requires_speed: bool = False,
+        model_override: Optional[str] = None,
+        cacheable_prefix: Optional[str] = None,
+        context_sections: Optional[List[ContextSection]] = None,
+        priority: str = LANE_INTERACTIVE,
+        deadline: Optional[Deadline] = None
+    ) -> ModelStream:
+        """
+        PURPOSE: Streaming twin of process_request (same routing, tokens as they arrive).
+        WORKING:
+            1. Selects model and builds messages exactly like process_request.
+            2. Streams from the primary model (skipped if unconfigured / circuit open).
+            3. Falls back only if the primary fails BEFORE the first token;
+               once text has been sent to the client, errors are raised as-is.
+            4. The whole stream (fallback included) is bounded by the request deadline.
+        RETURNS: ModelStream (provider/model reflect whoever actually answered; its result()
+                 carries the selection reason and context budget like invoke's).
+        """
+        deadline = deadline or current_deadline.get()
+        (target_provider, specific_model), reason = self._resolve_target(task_type, complexity, requires_speed, model_override)
+        fallback = self._fallback_target(target_provider)
+        budget_report: Optional[BudgetReport] = None
+        if context_sections is not None:
+            system_instruction, budget_report = self._fit_context(
+                system_instruction, prompt, context_sections, (target_provider, specific_model), fallback
+            )
+        messages = self._build_messages(prompt, system_instruction, cacheable_prefix)
+        targets = self._available_targets(
+            (target_provider, specific_model), fallback,
+            estimated_tokens=estimate_tokens(system_instruction) + estimate_tokens(prompt)
+        )
+
+        async def produce(stream: ModelStream):
+            if not targets:
+                raise ProviderUnavailableError(f"No AI provider available for task_type={task_type} (circuits open)")
+
+            last_error: Optional[Exception] = None
+            for provider, model in targets:
+                with use_lane(priority), use_deadline(deadline):
+                    self._check_deadline(provider, model, last_error)
+                    source = self.manager.stream_model(provider, messages, specific_claude_model=model)
+                breaker = self._breaker(provider, model)
+                started = False
                 try:
-                    return await self.manager.invoke_model("claude", messages, specific_claude_model="claude-haiku-4-5")
-                except Exception as secondary_error:
-                    logger.error(f"Fallback to Claude Haiku also failed: {secondary_error}")
-                    raise secondary_error
\ No newline at end of file
+                    async for delta in source:
+                        if not started:
+                            started = True
+                            stream.provider, stream.model = source.provider, source.model
+                        yield delta
+                    stream.provider, stream.model = source.provider, source.model
+                    stream.usage = source.usage
+                    breaker.record_success()
+                    self._record_success(source.model, source.result())
+                    return
+                except Exception as e:
+                    self._record_error(breaker, e)
+                    if self._is_provider_failure(e):
+                        self.scoreboard.record_outcome(self.manager.resolve_model_id(provider, model), ok=False)
+                    if started or classify_error(e) == FATAL:
+                        raise
+                    last_error = e
+                    logger.warning(f"Stream from {provider} ({model}) failed before first token: {e}. Attempting fallback.")
+            raise last_error
+
+        stream = ModelStream(produce, messages)
+        stream.selection_reason = reason
+        stream.context_budget = budget_report.as_dict() if budget_report else None
+        return stream
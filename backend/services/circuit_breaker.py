@@ -0,0 +1,132 @@
+"""
+FILE: circuit_breaker.py
+PATH: yugnex/backend/services/circuit_breaker.py
+PURPOSE: Per provider/model circuit breakers so an outage costs one failure, not one per request.
+WORKING:
+    1. CLOSED: calls flow; consecutive retryable failures are counted.
+    2. OPEN: after 'failure_threshold' failures, calls are refused for 'recovery_timeout' seconds
+       (the router sends them straight to the healthy provider).
+    3. HALF_OPEN: after the timeout, one trial call per recovery window is let through;
+       success closes the breaker, failure re-opens it.
+USAGE:
+    breaker = get_circuit_breakers().get("claude/claude-haiku-4-5")
+    if breaker.allow_request():
+        try:
+            ...call...
+            breaker.record_success()
+        except Exception:
+            breaker.record_failure()
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """
+        PURPOSE: Create a closed breaker.
+        PARAMS:
+            failure_threshold: Consecutive retryable failures that open the breaker.
+            recovery_timeout: Seconds to stay open before allowing a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._last_trial_at: Optional[float] = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._last_trial_at = None
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        PURPOSE: Should this call be attempted?
+        NOTE: In HALF_OPEN only one trial is allowed per recovery window.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+
+        now = time.monotonic()
+        if self._last_trial_at is None or now - self._last_trial_at >= self.recovery_timeout:
+            self._last_trial_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._open()
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        """
+        PURPOSE: Breaker for a provider/model key (created closed on first use).
+        """
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {key: breaker.stats() for key, breaker in self._breakers.items()}
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_registry: Optional[CircuitBreakerRegistry] = None
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """
+    PURPOSE: Return the process-wide breaker registry (configured from settings).
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = CircuitBreakerRegistry(
+            failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_SECONDS,
+        )
+    return _shared_registry
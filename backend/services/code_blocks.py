@@ -0,0 +1,158 @@
+"""
+FILE: code_blocks.py
+PATH: yugnex/backend/services/code_blocks.py
+PURPOSE: Incremental extraction of fenced code blocks from a (streamed) model response.
+WORKING:
+    1. CodeBlockExtractor is a line-based state machine (TEXT <-> CODE) fed with text
+       deltas of any size; partial lines are buffered until their newline arrives.
+    2. A fence is 3+ backticks or tildes (any indentation). The info string after it gives
+       the language and, optionally, a path ("```python app/main.py"); a block without
+       a language tag has language "".
+    3. The block closes on a line of the same fence character, at least as long, with
+       nothing after it - so shorter fences inside a longer one are kept as code.
+    4. Each block is emitted as soon as its closing fence line completes, so file writes
+       or review can start while the model is still generating.
+    5. The path comes from the info string or from a '# FILE: path' style comment
+       ('#', '//', '--', '/*', '<!--') on the block's first lines.
+    6. close() flushes the end of the stream; an unterminated block is emitted with
+       complete=False.
+USAGE:
+    extractor = CodeBlockExtractor()
+    async for delta in stream:
+        for block in extractor.feed(delta):
+            await write_file(block.path, block.code)
+    leftovers = extractor.close()
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+
+# Opening fence: indentation, 3+ backticks or tildes, info string
+_FENCE_RE = re.compile(r"^(?P<indent>\s*)(?P<fence>`{3,}|~{3,})(?P<info>.*)$")
+
+# '# FILE: app.py', '// FILE: src/index.ts', '<!-- FILE: index.html -->' ...
+_FILE_COMMENT_RE = re.compile(r"^\s*(?:#|//|--|/\*|<!--|;)\s*FILE\s*:\s*(?P<path>[^\s*>]+)", re.IGNORECASE)
+
+# Lines at the top of a block searched for a FILE comment (after a shebang, for instance)
+FILE_COMMENT_LINES = 3
+
+
+@dataclass(frozen=True)
+class CodeBlock:
+    language: str
+    code: str
+    path: Optional[str] = None
+    index: int = 0  # Position in the response (0 = first block)
+    complete: bool = True  # False = the stream ended before the closing fence
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"language": self.language, "code": self.code, "path": self.path, "complete": self.complete}
+
+
+class CodeBlockExtractor:
+    def __init__(self):
+        self._partial = ""  # Text after the last newline
+        self._fence: Optional[str] = None  # Opening fence while inside a block
+        self._language = ""
+        self._info_path: Optional[str] = None
+        self._lines: List[str] = []
+        self._count = 0
+
+    @property
+    def in_block(self) -> bool:
+        return self._fence is not None
+
+    def feed(self, delta: str) -> List[CodeBlock]:
+        """
+        PURPOSE: Consume the next chunk of the response.
+        RETURNS: Blocks whose closing fence arrived in this chunk (usually none).
+        """
+        self._partial += delta
+        if "\n" not in self._partial:
+            return []
+        *lines, self._partial = self._partial.split("\n")
+        return [block for line in lines if (block := self._consume_line(line)) is not None]
+
+    def close(self) -> List[CodeBlock]:
+        """
+        PURPOSE: End of stream - process the last line and flush an unterminated block.
+        """
+        blocks = []
+        if self._partial:
+            line, self._partial = self._partial, ""
+            block = self._consume_line(line)
+            if block is not None:
+                blocks.append(block)
+        if self.in_block:
+            blocks.append(self._finish(complete=False))
+        return blocks
+
+    @classmethod
+    def extract(cls, text: str) -> List[CodeBlock]:
+        """
+        PURPOSE: Every block of a finished response.
+        """
+        extractor = cls()
+        return extractor.feed(text) + extractor.close()
+
+    def _consume_line(self, line: str) -> Optional[CodeBlock]:
+        line = line.rstrip("\r")
+        match = _FENCE_RE.match(line)
+
+        # 1. TEXT: look for an opening fence
+        if not self.in_block:
+            if match is None:
+                return None
+            fence, info = match.group("fence"), match.group("info").strip()
+            if fence[0] == "`" and "`" in info:
+                return None  # Inline code such as ```x``` - not a fence
+            words = info.split()
+            self._fence = fence
+            self._language = words[0].lower() if words else ""
+            self._info_path = words[1] if len(words) > 1 else None
+            self._lines = []
+            return None
+
+        # 2. CODE: a closing fence ends the block, anything else is code
+        if (
+            match is not None
+            and match.group("fence")[0] == self._fence[0]
+            and len(match.group("fence")) >= len(self._fence)
+            and not match.group("info").strip()
+        ):
+            return self._finish(complete=True)
+        self._lines.append(line)
+        return None
+
+    def _finish(self, complete: bool) -> CodeBlock:
+        path = self._info_path
+        if path is None:
+            for line in self._lines[:FILE_COMMENT_LINES]:
+                comment = _FILE_COMMENT_RE.match(line)
+                if comment:
+                    path = comment.group("path")
+                    break
+
+        block = CodeBlock(
+            language=self._language,
+            code="\n".join(self._lines),
+            path=path,
+            index=self._count,
+            complete=complete,
+        )
+        self._count += 1
+        self._fence, self._language, self._info_path, self._lines = None, "", None, []
+        return block
+
+
+async def iter_code_blocks(deltas: AsyncIterable[str]) -> AsyncIterator[CodeBlock]:
+    """
+    PURPOSE: Yield code blocks from a stream of text deltas as soon as each one closes.
+    """
+    extractor = CodeBlockExtractor()
+    async for delta in deltas:
+        for block in extractor.feed(delta):
+            yield block
+    for block in extractor.close():
+        yield block
@@ -0,0 +1,196 @@
+"""
+FILE: code_chunks.py
+PATH: yugnex/backend/services/code_chunks.py
+PURPOSE: Split code (files, multi-file blobs or diffs) into reviewable chunks of bounded size.
+WORKING:
+    1. Split by file: 'diff --git' headers for diffs, 'FILE:' headers otherwise (same
+       convention as the context budget's split_files).
+    2. A file larger than 'max_tokens' is split at top-level definitions (def / class /
+       function / export / ... at column 0, also on '+' / '-' / ' ' diff lines); consecutive
+       definitions are packed together up to the limit.
+    3. A single definition still over the limit is cut at its nested definitions (methods,
+       inner functions), then at blank lines, and only as a last resort at line boundaries,
+       so every chunk fits (a chunk is never empty and never cut mid-line). Syntactic cuts
+       keep the pieces stable: an inserted line changes only the piece it lands in.
+    4. Each chunk is labelled with its file path (and part number when a file was split).
+    5. For incremental review, split_hunks() gives the unpacked definitions of a file
+       (header-only pieces dropped) and content_hash() a hash that ignores whitespace-only
+       edits, FILE / diff headers ('index', '---', '+++') and '@@' line ranges, so code
+       that only moved keeps its hash.
+USAGE:
+    for chunk in split_for_review(diff_text, max_tokens=3000):
+        print(chunk.label, chunk.tokens)
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from core.tokens import estimate_tokens
+from services.context_budget import split_files
+
+_DIFF_HEADER = re.compile(r"^diff --git a/\S+ b/(?P<path>\S+)", re.MULTILINE)
+_FILE_PATH = re.compile(r"^\s*(?:#|//|--|/\*)?\s*FILE:\s*(?P<path>[^\s*]+)", re.IGNORECASE)
+
+# Diff metadata: where the code is, not what it is
+_DIFF_META = re.compile(
+    r"^(?:index [0-9a-f]+\.\.[0-9a-f]+|--- (?:a/|/dev/null)|\+\+\+ (?:b/|/dev/null)|"
+    r"(?:new|deleted) file mode |similarity index |rename (?:from|to) )"
+)
+_HUNK_RANGE = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@ ?")
+
+# Top-level definitions (optionally behind a diff marker) where a long file may be cut
+_TOP_LEVEL = re.compile(
+    r"^[+\- ]?(?:@|async\s+def\b|def\b|class\b|function\b|export\b|const\b|let\b|var\b|"
+    r"func\b|fn\b|pub\b|impl\b|struct\b|interface\b|type\b|enum\b|public\b|private\b|protected\b)"
+)
+
+# Indented definitions (methods, inner functions) where an oversized definition may be cut
+_NESTED = re.compile(
+    r"^[+\-]?(?P<indent>[ \t]+)(?:@|async\s+def\b|def\b|class\b|function\b|func\b|fn\b|"
+    r"pub\b|public\b|private\b|protected\b|static\b)"
+)
+
+
+@dataclass(frozen=True)
+class CodeChunk:
+    label: str  # File path, plus "(part n)" when a file was split
+    code: str
+    tokens: int
+
+
+def _file_path(text: str) -> Optional[str]:
+    match = _DIFF_HEADER.match(text) or _FILE_PATH.match(text)
+    return match.group("path") if match else None
+
+
+def _split_files(code: str) -> List[str]:
+    starts = [match.start() for match in _DIFF_HEADER.finditer(code)]
+    if not starts:
+        return split_files(code)
+    if starts[0] != 0 and code[:starts[0]].strip():
+        starts = [0] + starts
+    bounds = starts + [len(code)]
+    return [code[a:b].strip("\n") for a, b in zip(bounds, bounds[1:]) if code[a:b].strip()]
+
+
+def _pack(pieces: List[str], max_tokens: int) -> List[str]:
+    """
+    PURPOSE: Join consecutive pieces into chunks of at most max_tokens (pieces stay whole).
+    """
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def split_by_file(code: str) -> List[Tuple[str, str]]:
+    """
+    PURPOSE: (path, text) per file of a blob or diff ("chunk n" when a file has no header).
+    """
+    files = _split_files(code) or ([code] if code.strip() else [])
+    return [(_file_path(text) or f"chunk {index + 1}", text) for index, text in enumerate(files)]
+
+
+def _is_header(line: str) -> bool:
+    return bool(_FILE_PATH.match(line) or _DIFF_HEADER.match(line) or _DIFF_META.match(line) or _HUNK_RANGE.match(line))
+
+
+def has_code(text: str) -> bool:
+    """
+    PURPOSE: Does the text hold anything besides blank lines and FILE / diff headers?
+    """
+    return any(line.strip() and not _is_header(line) for line in text.split("\n"))
+
+
+def content_hash(text: str) -> str:
+    """
+    PURPOSE: Hash of code that survives cosmetic edits (trailing spaces, blank lines, CRLF)
+             and moves (FILE / diff headers and '@@' line numbers are ignored; the symbol
+             after '@@' is kept).
+    """
+    lines = []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        line = line.rstrip()
+        if _HUNK_RANGE.match(line):
+            symbol = _HUNK_RANGE.sub("", line)
+            line = f"@@ {symbol}" if symbol else ""
+        if not line or _FILE_PATH.match(line) or _DIFF_HEADER.match(line) or _DIFF_META.match(line):
+            continue
+        lines.append(line)
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _cut(lines: List[str], starts_piece: Callable[[int], bool]) -> List[str]:
+    """
+    PURPOSE: Cut lines before every index where starts_piece() holds (decorators stay with
+             what follows them).
+    """
+    pieces, current = [], []
+    for index, line in enumerate(lines):
+        after_decorator = bool(current) and current[-1].lstrip("+- \t").startswith("@")
+        if current and not after_decorator and starts_piece(index):
+            pieces.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def _split_large(segment: str, max_tokens: int) -> List[str]:
+    """
+    PURPOSE: Cut a definition over max_tokens at its shallowest nested definitions, else at
+             blank lines (recursively); only a single block still too large is cut by lines.
+    """
+    if estimate_tokens(segment) <= max_tokens:
+        return [segment]
+    lines = segment.split("\n")
+    indents = {i: len(m.group("indent").expandtabs(4)) for i, line in enumerate(lines) if i and (m := _NESTED.match(line))}
+    shallowest = min(indents.values(), default=0)
+
+    def at_nested(index: int) -> bool:
+        return index in indents and indents[index] - shallowest <= 1  # +1: a ' ' diff marker
+
+    def after_blank(index: int) -> bool:
+        return bool(lines[index].strip("+- \t")) and not lines[index - 1].strip("+- \t")
+
+    for starts_piece in (at_nested, after_blank):
+        pieces = _cut(lines, starts_piece)
+        if len(pieces) > 1:
+            return [hunk for piece in pieces for hunk in _split_large(piece, max_tokens)]
+    return _pack(lines, max_tokens)
+
+
+def split_hunks(text: str, max_tokens: int) -> List[str]:
+    """
+    PURPOSE: A file as its top-level definitions (module header first), unpacked;
+             a definition over max_tokens is cut at nested definitions / blank lines
+             (see _split_large). Pieces holding only headers (e.g. the 'diff --git' /
+             'index' / '---' / '+++' block) are dropped.
+    """
+    lines = text.split("\n")
+    segments = _cut(lines, lambda index: bool(_TOP_LEVEL.match(lines[index])))
+    hunks = [hunk for segment in segments for hunk in _split_large(segment, max_tokens)]
+    return [hunk for hunk in hunks if has_code(hunk)]
+
+
+def split_for_review(code: str, max_tokens: int) -> List[CodeChunk]:
+    """
+    PURPOSE: Chunks of at most ~max_tokens, one or more per file, in input order.
+    """
+    chunks = []
+    for path, file_text in split_by_file(code):
+        parts = [file_text] if estimate_tokens(file_text) <= max_tokens else _pack(split_hunks(file_text, max_tokens), max_tokens)
+        for part_index, part in enumerate(parts):
+            label = path if len(parts) == 1 else f"{path} (part {part_index + 1}/{len(parts)})"
+            chunks.append(CodeChunk(label=label, code=part, tokens=estimate_tokens(part)))
+    return chunks
@@ -0,0 +1,237 @@
+"""
+FILE: context_budget.py
+PATH: yugnex/backend/services/context_budget.py
+PURPOSE: Pre-flight context-window budgeting for assembled prompts.
+WORKING:
+    1. The budget is the smallest context window among the models that may answer
+       (primary + fallback), minus the reserved output ('max_tokens') and a safety margin.
+       CONTEXT_MAX_INPUT_TOKENS can cap it further (latency / cost).
+    2. The fixed part (persona + rules + user prompt) is never trimmed.
+    3. Context comes in ContextSections whose items are ordered most-important-first.
+       While over budget, the lowest-priority section loses its last item
+       (old memories first, then the least relevant files).
+    4. If dropping a whole item would free more than needed, it is truncated instead.
+    5. If the fixed part alone does not fit, ContextBudgetExceededError is raised
+       before anything is sent to the provider.
+    6. Every fit produces a BudgetReport (tokens used / budget, what was trimmed).
+USAGE:
+    sections = [ContextSection("=== PROVIDED FILES/CODE ===", split_files(files), priority=1)]
+    context, report = get_context_budget().fit(["claude-sonnet-4-5", "gemini-2.5-pro"], system, prompt, sections)
+"""
+
+import re
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from config.settings import settings
+from core.tokens import estimate_tokens
+
+# Context windows (input + output tokens), matched by model id prefix
+MODEL_CONTEXT_LIMITS: Dict[str, int] = {
+    "claude-": 200_000,
+    "gemini-2.5": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+}
+DEFAULT_CONTEXT_LIMIT = 200_000
+
+# Output tokens reserved per call (the clients' max_tokens / max_output_tokens)
+DEFAULT_OUTPUT_RESERVE = 4096
+
+# Lines that start a new file inside 'context_files' (e.g. "# FILE: app.py", "// FILE: ui.tsx")
+_FILE_HEADER = re.compile(r"^\s*(?:#|//|--|/\*)?\s*FILE:\s*\S+", re.IGNORECASE | re.MULTILINE)
+_WORDS = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+
+class ContextBudgetExceededError(ValueError):
+    """The non-trimmable part of a prompt does not fit the model's context window."""
+
+
+def context_limit(model_id: str) -> int:
+    for prefix, limit in MODEL_CONTEXT_LIMITS.items():
+        if model_id.startswith(prefix):
+            return limit
+    return DEFAULT_CONTEXT_LIMIT
+
+
+def split_files(context_files: Optional[str]) -> List[str]:
+    """
+    PURPOSE: Split an uploaded files/code blob into one chunk per file (on FILE: headers).
+    """
+    if not context_files:
+        return []
+    starts = [match.start() for match in _FILE_HEADER.finditer(context_files)]
+    if not starts or starts[0] != 0:
+        starts = [0] + starts
+    bounds = starts + [len(context_files)]
+    return [context_files[a:b].strip("\n") for a, b in zip(bounds, bounds[1:]) if context_files[a:b].strip()]
+
+
+def rank_by_relevance(chunks: List[str], query: str) -> List[str]:
+    """
+    PURPOSE: Order chunks most-relevant-first by identifier overlap with the query
+             (stable: equally relevant chunks keep their original order).
+    """
+    query_words = {word.lower() for word in _WORDS.findall(query)}
+
+    def score(chunk: str) -> float:
+        words = {word.lower() for word in _WORDS.findall(chunk)}
+        return len(words & query_words) / (len(words) ** 0.5) if words else 0.0
+
+    return sorted(chunks, key=score, reverse=True)
+
+
+@dataclass
+class ContextSection:
+    title: str
+    items: List[str]
+    priority: int = 0  # Lower = trimmed first
+    empty_text: str = "None"
+
+    def render(self) -> str:
+        body = "\n".join(self.items) if self.items else self.empty_text
+        return f"{self.title}\n{body}\n\n"
+
+
+@dataclass
+class BudgetReport:
+    model: str
+    context_limit: int
+    reserved_output: int
+    budget: int
+    used: int
+    dropped: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+
+    @property
+    def utilization(self) -> float:
+        return round(self.used / self.budget, 4) if self.budget else 0.0
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.dropped or self.truncated)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "utilization": self.utilization}
+
+
+class ContextBudgetPlanner:
+    def __init__(
+        self,
+        output_reserve: int = DEFAULT_OUTPUT_RESERVE,
+        safety_margin: float = 0.05,
+        max_input_tokens: Optional[int] = None
+    ):
+        """
+        PURPOSE: Create a planner.
+        PARAMS:
+            output_reserve: Tokens kept free for the response.
+            safety_margin: Fraction of the window left unused (the estimator is approximate).
+            max_input_tokens: Optional hard cap on prompt size, below the model limit.
+        """
+        self.output_reserve = output_reserve
+        self.safety_margin = safety_margin
+        self.max_input_tokens = max_input_tokens
+
+        # Metrics
+        self.requests = 0
+        self.trimmed_requests = 0
+        self.recent_reports: Deque[Dict[str, Any]] = deque(maxlen=50)
+
+    def budget_for(self, model_ids: List[str]) -> tuple[str, int, int]:
+        """
+        PURPOSE: (tightest model, its context limit, input token budget) for these models.
+        """
+        model = min(model_ids, key=context_limit)
+        limit = context_limit(model)
+        budget = int((limit - self.output_reserve) * (1 - self.safety_margin))
+        if self.max_input_tokens:
+            budget = min(budget, self.max_input_tokens)
+        return model, limit, budget
+
+    def fit(self, model_ids: List[str], system_instruction: str, prompt: str, sections: List[ContextSection]) -> tuple[str, BudgetReport]:
+        """
+        PURPOSE: Trim context sections until system + context + prompt fits the budget.
+        RETURNS: (rendered context to append to the system instruction, BudgetReport)
+        RAISES: ContextBudgetExceededError if even the untrimmable part is too large.
+        """
+        model, limit, budget = self.budget_for(model_ids)
+        report = BudgetReport(model=model, context_limit=limit, reserved_output=self.output_reserve, budget=budget, used=0)
+
+        # 1. The fixed part must fit on its own
+        fixed = estimate_tokens(system_instruction) + estimate_tokens(prompt)
+        if fixed > budget:
+            raise ContextBudgetExceededError(
+                f"Prompt needs ~{fixed} tokens but {model} allows {budget} input tokens "
+                f"({limit} context - {self.output_reserve} reserved for output)"
+            )
+
+        # 2. Trim lowest-priority sections from the end until everything fits
+        sections = [ContextSection(s.title, list(s.items), s.priority, s.empty_text) for s in sections]
+        used = fixed + sum(estimate_tokens(section.render()) for section in sections)
+        for section in sorted(sections, key=lambda s: s.priority):
+            while used > budget and section.items:
+                item = section.items.pop()
+                item_tokens = estimate_tokens(item)
+                overshoot = used - budget
+                if item_tokens > overshoot + 100:
+                    # Keeping part of this item is enough - truncate instead of dropping
+                    kept = _truncate(item, item_tokens - overshoot - 50)
+                    section.items.append(kept)
+                    report.truncated.append(section.title)
+                    used -= item_tokens - estimate_tokens(kept)
+                else:
+                    report.dropped[section.title] = report.dropped.get(section.title, 0) + 1
+                    used -= item_tokens
+            if used <= budget:
+                break
+
+        context = "".join(section.render() for section in sections)
+        report.used = fixed + estimate_tokens(context)
+
+        self.requests += 1
+        if report.trimmed:
+            self.trimmed_requests += 1
+        self.recent_reports.append(report.as_dict())
+        return context, report
+
+    def stats(self) -> Dict[str, Any]:
+        utilizations = [report["utilization"] for report in self.recent_reports]
+        return {
+            "requests": self.requests,
+            "trimmed_requests": self.trimmed_requests,
+            "avg_utilization": round(sum(utilizations) / len(utilizations), 4) if utilizations else None,
+            "recent": list(self.recent_reports)[-10:],
+        }
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """
+    PURPOSE: Keep roughly the first 'max_tokens' tokens of a text, marking the cut.
+    """
+    tokens = estimate_tokens(text)
+    if max_tokens <= 0:
+        return "[... truncated to fit the context window ...]"
+    keep_chars = int(len(text) * max_tokens / tokens)
+    return f"{text[:keep_chars]}\n[... truncated ~{tokens - max_tokens} tokens to fit the context window ...]"
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_planner: Optional[ContextBudgetPlanner] = None
+
+
+def get_context_budget() -> ContextBudgetPlanner:
+    """
+    PURPOSE: Return the process-wide budget planner (configured from settings).
+    """
+    global _shared_planner
+    if _shared_planner is None:
+        _shared_planner = ContextBudgetPlanner(
+            output_reserve=settings.CONTEXT_OUTPUT_RESERVE_TOKENS,
+            safety_margin=settings.CONTEXT_SAFETY_MARGIN,
+            max_input_tokens=settings.CONTEXT_MAX_INPUT_TOKENS,
+        )
+    return _shared_planner
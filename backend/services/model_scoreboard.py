@@ -0,0 +1,142 @@
+"""
+FILE: model_scoreboard.py
+PATH: yugnex/backend/services/model_scoreboard.py
+PURPOSE: Rolling per-model performance statistics shared by every AIRouter.
+WORKING:
+    1. Keeps a bounded window of recent successful call latencies per model; samples older
+       than ADAPTIVE_ROUTING_SAMPLE_MAX_AGE_SECONDS are forgotten, so a model routed around
+       after a bad stretch drops below the sample minimum and gets traffic again.
+    2. Answers latency quantile queries (e.g. p90 used as the hedge delay).
+    3. Counts which model won hedged/raced requests, to tune the hedge delay.
+    4. Keeps a rolling error rate and the (estimated) token spend per model.
+    5. Remembers the most recent routing decisions and why they were made.
+USAGE:
+    board = get_model_scoreboard()
+    board.record_latency("claude-haiku-4-5", 1.2)
+    p90 = board.latency_quantile("claude-haiku-4-5", 0.9)
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.settings import settings
+
+
+class ModelScoreboard:
+    def __init__(
+        self,
+        window: int = 200,
+        max_age_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        PURPOSE: Create an empty scoreboard.
+        PARAMS:
+            window (int): Number of recent samples kept per model.
+            max_age_seconds (float): Samples older than this are ignored and dropped
+                                     (default ADAPTIVE_ROUTING_SAMPLE_MAX_AGE_SECONDS).
+        """
+        self.window = window
+        self.max_age_seconds = settings.ADAPTIVE_ROUTING_SAMPLE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        self._clock = clock
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = {}  # (recorded at, seconds)
+        self._outcomes: Dict[str, Deque[Tuple[float, bool]]] = {}  # (recorded at, ok)
+        self._usage: Dict[str, Dict[str, float]] = {}
+        self.hedge_wins: Dict[str, int] = {}
+        self.recent_selections: Deque[Dict[str, Any]] = deque(maxlen=50)
+
+    def _recent(self, series: Dict[str, Deque[tuple]], model: str) -> List[Any]:
+        """
+        PURPOSE: Values of a model's samples that are not older than max_age_seconds
+                 (expired ones are dropped; samples are stored oldest first).
+        """
+        samples = series.get(model)
+        if not samples:
+            return []
+        oldest = self._clock() - self.max_age_seconds
+        while samples and samples[0][0] < oldest:
+            samples.popleft()
+        return [value for _, value in samples]
+
+    def _append(self, series: Dict[str, Deque[tuple]], model: str, value: Any) -> None:
+        samples = series.get(model)
+        if samples is None:
+            samples = series[model] = deque(maxlen=self.window)
+        samples.append((self._clock(), value))
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        self._append(self._latencies, model, seconds)
+
+    def latency_quantile(self, model: str, quantile: float, min_samples: int = 1) -> Optional[float]:
+        """
+        PURPOSE: Latency at the given quantile (0-1), or None with too few recent samples.
+        """
+        samples = self._recent(self._latencies, model)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(quantile * len(ordered)))
+        return ordered[index]
+
+    def record_outcome(self, model: str, ok: bool) -> None:
+        """
+        PURPOSE: Count a call as succeeded / failed (only provider-side failures should be recorded).
+        """
+        self._append(self._outcomes, model, ok)
+
+    def error_rate(self, model: str, min_samples: int = 1) -> Optional[float]:
+        """
+        PURPOSE: Share of recent calls that failed, or None with too few recent samples.
+        """
+        outcomes = self._recent(self._outcomes, model)
+        if not outcomes or len(outcomes) < min_samples:
+            return None
+        return outcomes.count(False) / len(outcomes)
+
+    def record_usage(self, model: str, input_tokens: int, output_tokens: int, cost_usd: float) -> None:
+        usage = self._usage.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
+        usage["cost_usd"] += cost_usd
+
+    def record_hedge_win(self, model: str) -> None:
+        self.hedge_wins[model] = self.hedge_wins.get(model, 0) + 1
+
+    def record_selection(self, selection: Dict[str, Any]) -> None:
+        self.recent_selections.append(selection)
+
+    def stats(self) -> Dict[str, Any]:
+        models: List[str] = sorted(set(self._latencies) | set(self._outcomes) | set(self._usage))
+        return {
+            "models": {
+                model: {
+                    "samples": len(self._recent(self._latencies, model)),
+                    "p50_latency_s": self.latency_quantile(model, 0.5),
+                    "p90_latency_s": self.latency_quantile(model, 0.9),
+                    "p95_latency_s": self.latency_quantile(model, 0.95),
+                    "error_rate": self.error_rate(model),
+                    "usage": dict(self._usage.get(model, {})),
+                }
+                for model in models
+            },
+            "hedge_wins": dict(self.hedge_wins),
+            "recent_selections": list(self.recent_selections),
+        }
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_scoreboard: Optional[ModelScoreboard] = None
+
+
+def get_model_scoreboard() -> ModelScoreboard:
+    """
+    PURPOSE: Return the process-wide scoreboard.
+    """
+    global _shared_scoreboard
+    if _shared_scoreboard is None:
+        _shared_scoreboard = ModelScoreboard()
+    return _shared_scoreboard
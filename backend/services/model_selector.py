@@ -0,0 +1,195 @@
+"""
+FILE: model_selector.py
+PATH: yugnex/backend/services/model_selector.py
+PURPOSE: Latency- and cost-adaptive model selection (routes around a model that is slow today).
+WORKING:
+    1. The static table (AIRouter.select_model) still decides the MINIMUM capability tier
+       a task needs - it is the quality floor and the fallback policy.
+    2. Candidates are the configured models at or above that tier.
+    3. Each candidate is checked against the scoreboard:
+       - p90 latency must meet the latency SLO for the request (speed / low / medium / high),
+       - rolling error rate must stay under ADAPTIVE_ROUTING_MAX_ERROR_RATE.
+       Models without enough samples are assumed to be fine.
+    4. The cheapest passing candidate wins (list price for a typical call).
+    5. If nothing passes, the static choice is used.
+    6. Every decision comes with an explanation, kept on the scoreboard for /api/metrics.
+USAGE:
+    selector = ModelSelector(get_model_scoreboard())
+    selection = selector.select(manager, "general", "medium", False, static_choice=("claude", "claude-sonnet-4-5"))
+    logger.info(selection.reason)
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from services.model_scoreboard import ModelScoreboard
+
+logger = logging.getLogger(__name__)
+
+# List prices, USD per 1M tokens (input, output)
+MODEL_PRICES: Dict[str, tuple[float, float]] = {
+    "claude-opus-4-5": (5.0, 25.0),
+    "claude-opus-4-1": (15.0, 75.0),
+    "claude-sonnet-4-5": (3.0, 15.0),
+    "claude-haiku-4-5": (1.0, 5.0),
+    "gemini-2.5-pro": (1.25, 10.0),
+}
+
+# Relative capability; a task never goes to a model below its static choice's tier
+MODEL_TIERS: Dict[str, int] = {
+    "claude-haiku-4-5": 1,
+    "gemini-2.5-pro": 2,
+    "claude-sonnet-4-5": 3,
+    "claude-opus-4-5": 4,
+    "claude-opus-4-1": 4,
+}
+
+# Models the adaptive policy may pick from, as (provider, specific_model)
+CANDIDATES: List[tuple[str, Optional[str]]] = [
+    ("claude", "claude-haiku-4-5"),
+    ("gemini", None),
+    ("claude", "claude-sonnet-4-5"),
+    ("claude", "claude-opus-4-5"),
+]
+
+# Latency SLO (seconds, at ADAPTIVE_ROUTING_LATENCY_QUANTILE) per request class
+DEFAULT_LATENCY_SLOS: Dict[str, float] = {"speed": 5.0, "low": 10.0, "medium": 30.0, "high": 60.0}
+
+# Token mix of a "typical" call, used to rank models by price
+_TYPICAL_INPUT_TOKENS = 3000
+_TYPICAL_OUTPUT_TOKENS = 1000
+
+
+def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+    """
+    PURPOSE: List-price cost of a call in USD (0.0 for models without a known price).
+    """
+    input_price, output_price = MODEL_PRICES.get(model_id, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+@dataclass
+class ModelSelection:
+    provider: str
+    specific_model: Optional[str]
+    model_id: str
+    policy: str  # "adaptive" or "static"
+    reason: str
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def target(self) -> tuple[str, Optional[str]]:
+        return (self.provider, self.specific_model)
+
+    def explain(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ModelSelector:
+    def __init__(
+        self,
+        scoreboard: ModelScoreboard,
+        slos: Optional[Dict[str, float]] = None,
+        max_error_rate: Optional[float] = None,
+        quantile: Optional[float] = None,
+        min_samples: Optional[int] = None
+    ):
+        """
+        PURPOSE: Adaptive policy over a scoreboard (thresholds default to settings).
+        """
+        self.scoreboard = scoreboard
+        self.slos = dict(slos if slos is not None else _slos_from_settings())
+        self.max_error_rate = settings.ADAPTIVE_ROUTING_MAX_ERROR_RATE if max_error_rate is None else max_error_rate
+        self.quantile = settings.ADAPTIVE_ROUTING_LATENCY_QUANTILE if quantile is None else quantile
+        self.min_samples = settings.ADAPTIVE_ROUTING_MIN_SAMPLES if min_samples is None else min_samples
+
+    def slo_for(self, complexity: str, requires_speed: bool) -> float:
+        key = "speed" if requires_speed else complexity
+        return self.slos.get(key, self.slos.get("medium", DEFAULT_LATENCY_SLOS["medium"]))
+
+    def _evaluate(self, model_id: str, slo: float) -> Dict[str, Any]:
+        latency = self.scoreboard.latency_quantile(model_id, self.quantile, self.min_samples)
+        error_rate = self.scoreboard.error_rate(model_id, self.min_samples)
+        evaluation = {
+            "model": model_id,
+            "tier": MODEL_TIERS.get(model_id),
+            "typical_cost_usd": round(estimate_cost(model_id, _TYPICAL_INPUT_TOKENS, _TYPICAL_OUTPUT_TOKENS), 6),
+            "latency_s": None if latency is None else round(latency, 3),
+            "error_rate": None if error_rate is None else round(error_rate, 4),
+        }
+        if latency is not None and latency > slo:
+            evaluation["rejected"] = f"p{int(self.quantile * 100)} {latency:.1f}s > {slo:.0f}s SLO"
+        elif error_rate is not None and error_rate > self.max_error_rate:
+            evaluation["rejected"] = f"error rate {error_rate:.0%} > {self.max_error_rate:.0%}"
+        return evaluation
+
+    def select(
+        self,
+        manager: Any,
+        task_type: str,
+        complexity: str,
+        requires_speed: bool,
+        static_choice: tuple[str, Optional[str]]
+    ) -> ModelSelection:
+        """
+        PURPOSE: Cheapest configured model at/above the static choice's tier that meets the SLO.
+        PARAMS:
+            manager: ModelManager (for is_configured / resolve_model_id).
+            static_choice: (provider, specific_model) from the static table - floor and fallback.
+        RETURNS: ModelSelection with a human-readable reason.
+        """
+        static_provider, static_model = static_choice
+        static_id = manager.resolve_model_id(static_provider, static_model)
+        slo = self.slo_for(complexity, requires_speed)
+        floor = MODEL_TIERS.get(static_id)
+
+        def static(reason: str, candidates: List[Dict[str, Any]]) -> ModelSelection:
+            return ModelSelection(static_provider, static_model, static_id, "static", reason, candidates)
+
+        if floor is None:
+            return static(f"{static_id}: static policy (no tier/price data for this model)", [])
+
+        # 1. Candidates: the static choice plus every configured model at or above its tier
+        targets = [static_choice] + [c for c in CANDIDATES if c != static_choice]
+        evaluated = []
+        for provider, specific_model in targets:
+            model_id = manager.resolve_model_id(provider, specific_model)
+            if MODEL_TIERS.get(model_id, 0) < floor or not manager.is_configured(provider):
+                continue
+            evaluated.append(((provider, specific_model), self._evaluate(model_id, slo)))
+
+        # 2. Cheapest passing candidate (the static choice wins ties)
+        passing = [item for item in evaluated if "rejected" not in item[1]]
+        explanations = [evaluation for _, evaluation in evaluated]
+        if not passing:
+            return static(f"{static_id}: static policy (no candidate meets the {slo:.0f}s SLO / error budget)", explanations)
+
+        (provider, specific_model), chosen = min(passing, key=lambda item: item[1]["typical_cost_usd"])
+        if (provider, specific_model) == static_choice:
+            reason = f"{chosen['model']}: cheapest model for {task_type}/{complexity} meeting the {slo:.0f}s SLO"
+        else:
+            skipped = next((e for t, e in evaluated if t == static_choice), None)
+            if skipped is None:
+                why = "not configured"
+            elif "rejected" in skipped:
+                why = skipped["rejected"]
+            else:
+                why = f"{chosen['model']} is cheaper at equal or higher tier"
+            reason = f"{chosen['model']}: routed around {static_id} ({why}); cheapest model meeting the {slo:.0f}s SLO"
+        return ModelSelection(provider, specific_model, chosen["model"], "adaptive", reason, explanations)
+
+
+def _slos_from_settings() -> Dict[str, float]:
+    """
+    PURPOSE: Default SLOs, updated with ADAPTIVE_ROUTING_LATENCY_SLOS (JSON) if set.
+    """
+    slos = dict(DEFAULT_LATENCY_SLOS)
+    if settings.ADAPTIVE_ROUTING_LATENCY_SLOS:
+        try:
+            slos.update(json.loads(settings.ADAPTIVE_ROUTING_LATENCY_SLOS))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid ADAPTIVE_ROUTING_LATENCY_SLOS, using defaults: {e}")
+    return slos
@@ -0,0 +1,147 @@
+"""
+FILE: response_cache.py
+PATH: yugnex/backend/services/response_cache.py
+PURPOSE: Exact-match cache for LLM responses, shared by every AIRouter in the process.
+WORKING:
+    1. Keys are (resolved model, hash of system instruction, hash of prompt).
+    2. Entries live in a size-bounded LRU (OrderedDict) with a per-entry TTL.
+    3. Expired entries are kept until evicted so they can be served "stale"
+       when every provider is down (see get_stale).
+USAGE:
+    cache = get_response_cache()
+    key = ResponseCache.make_key("claude-sonnet-4-5", system_instruction, prompt)
+    cached = cache.get(key)
+    if cached is None:
+        cache.set(key, await call_model())
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    value: str
+    created_at: float
+    expires_at: float
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1000, default_ttl: float = 3600.0, max_stale: float = 86400.0):
+        """
+        PURPOSE: Create an empty cache.
+        PARAMS:
+            max_entries: LRU size bound (oldest-used entries are evicted first).
+            default_ttl: Seconds an entry is served as fresh.
+            max_stale: Seconds past expiry an entry may still be served by get_stale().
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+        # Counters for the metrics endpoint
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system_instruction: str, prompt: str) -> str:
+        """
+        PURPOSE: Build the cache key for a (model, system instruction, prompt) triple.
+        """
+        return f"{model}:{_sha256(system_instruction)}:{_sha256(prompt)}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        PURPOSE: Return a fresh cached response, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def get_stale(self, key: Optional[str]) -> Optional[str]:
+        """
+        PURPOSE: Return a cached response even if expired (within max_stale), or None.
+        NOTE: Only used when all providers are failing - a stale answer beats an error.
+        """
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.expires_at > self.max_stale:
+            return None
+
+        self.stale_hits += 1
+        return entry.value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        PURPOSE: Store a response, evicting the least recently used entries if full.
+        """
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(
+            value=value,
+            created_at=now,
+            expires_at=now + (self.default_ttl if ttl is None else ttl),
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        PURPOSE: Snapshot of cache effectiveness.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+        }
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    PURPOSE: Return the process-wide response cache (sized from settings).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            default_ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+            max_stale=settings.RESPONSE_CACHE_MAX_STALE_SECONDS,
+        )
+    return _shared_cache
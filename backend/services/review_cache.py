@@ -0,0 +1,100 @@
+"""
+FILE: review_cache.py
+PATH: yugnex/backend/services/review_cache.py
+PURPOSE: Remember Navya's review findings per file and per hunk, keyed by content hash.
+WORKING:
+    1. Keys combine the level ("file" / "hunk"), the reviewer prompt version, the review
+       scope (project + the context the review was asked with) and a normalized content
+       hash (services/code_chunks.content_hash), so whitespace-only edits still hit, a
+       prompt edit invalidates everything and findings never cross projects or contexts.
+    2. Values are the findings (ChunkReview objects; a list of them for a file).
+    3. Bounded LRU in process memory (REVIEW_CACHE_MAX_ENTRIES); unreviewable results
+       (provider errors) are never stored.
+    4. Counts hits and the tokens reused vs. re-reviewed, for /api/metrics.
+USAGE:
+    key = ReviewCache.make_key("hunk", content_hash(code), prompt_version, ReviewCache.scope(context, project_id))
+    findings = get_review_cache().get(key)
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config.settings import settings
+
+
+class ReviewCache:
+    def __init__(self, max_entries: int = 5000):
+        """
+        PURPOSE: Create an empty cache.
+        PARAMS: max_entries: LRU size bound (oldest-used entries are evicted first).
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+        # Counters for the metrics endpoint
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reused_tokens = 0
+        self.reviewed_tokens = 0
+
+    @staticmethod
+    def scope(context: str, project_id: Optional[int] = None) -> str:
+        """
+        PURPOSE: Short hash of what a review depends on besides the code (project + context).
+        """
+        return hashlib.sha256(f"{project_id}\n{context}".encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(level: str, code_hash: str, prompt_version: str, scope: str = "") -> str:
+        return f"{level}:{prompt_version[:16]}:{scope}:{code_hash}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record(self, reused_tokens: int, reviewed_tokens: int) -> None:
+        self.reused_tokens += reused_tokens
+        self.reviewed_tokens += reviewed_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "reused_tokens": self.reused_tokens,
+            "reviewed_tokens": self.reviewed_tokens,
+        }
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_cache: Optional[ReviewCache] = None
+
+
+def get_review_cache() -> ReviewCache:
+    """
+    PURPOSE: Return the process-wide review cache (sized from settings).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ReviewCache(max_entries=settings.REVIEW_CACHE_MAX_ENTRIES)
+    return _shared_cache
@@ -0,0 +1,316 @@
+"""
+FILE: similarity_cache.py
+PATH: yugnex/backend/services/similarity_cache.py
+PURPOSE: Near-duplicate prompt cache ("build a login page" ~ "create a login page please").
+WORKING:
+    1. Normalizes the prompt (lowercase, drop filler words, canonicalize common verbs)
+       and splits it into word shingles (words + adjacent word pairs, so word order counts
+       and "austria" / "australia" are different words, not 80% the same characters).
+    2. Computes a MinHash signature and indexes it in an LSH band table, so lookups
+       only compare against a handful of candidates - no external embedding service.
+    3. Candidates are scored by exact Jaccard similarity of their shingle sets; the best
+       one is a hit if it reaches the task_type's configured threshold. Prompts whose
+       numbers differ ("10 km" vs "100 km", "python 2" vs "python 3") never match.
+    4. Entries are scoped to (task_type, model, system instruction) so an answer is never
+       reused across agents, models or project contexts.
+    5. Only task types with a threshold are eligible (defaults: quick_answer, summarization).
+       The agents currently route chat as "general" and reviews as "code_review", so the
+       cache only serves callers using those task types (or thresholds added through
+       SIMILARITY_CACHE_THRESHOLDS); personalized chat turns are deliberately not eligible.
+    6. Off by default. To opt in, set SIMILARITY_CACHE_ENABLED=true and route the eligible
+       calls with task_type="quick_answer" / "summarization" (or add a tested threshold for
+       another task type to SIMILARITY_CACHE_THRESHOLDS).
+USAGE:
+    cache = get_similarity_cache()
+    hit = cache.lookup("quick_answer", "gemini-2.5-pro", system_instruction, prompt)
+    if hit:
+        return hit.response  # hit.similarity in [0, 1]
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Default per-task thresholds (overridable via SIMILARITY_CACHE_THRESHOLDS)
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "quick_answer": 0.8,
+    "summarization": 0.85,
+}
+
+# Words that carry no meaning for "is this the same question?"
+_FILLER_WORDS = {
+    "a", "an", "the", "please", "pls", "kindly", "can", "could", "would", "you",
+    "me", "for", "i", "want", "need", "to", "just", "some", "hey", "hi",
+}
+
+# Common imperative verbs users swap freely
+_CANONICAL_WORDS = {
+    "build": "make", "create": "make", "generate": "make", "write": "make",
+    "develop": "make", "implement": "make",
+    "explain": "describe", "tell": "describe",
+    "fix": "repair", "debug": "repair",
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    PURPOSE: Reduce a prompt to the words that matter for similarity.
+    """
+    words = re.findall(r"[a-z0-9_]+", text.lower())
+    words = [_CANONICAL_WORDS.get(word, word) for word in words if word not in _FILLER_WORDS]
+    return " ".join(words)
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """
+    PURPOSE: Word shingles of the normalized prompt (each word and each adjacent pair).
+    """
+    words = normalize_prompt(text).split()
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def numbers(text: str) -> FrozenSet[str]:
+    """
+    PURPOSE: Words of the normalized prompt that contain a digit ("10", "python3", "v2").
+    """
+    return frozenset(word for word in normalize_prompt(text).split() if any(c.isdigit() for c in word))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        PURPOSE: Fixed family of hash permutations (seeded, so signatures are stable).
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, items: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+            for item in items
+        ] or [0]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        )
+
+
+@dataclass
+class SimilarityEntry:
+    scope: Tuple[str, str, str]
+    prompt: str
+    shingles: FrozenSet[str]
+    numbers: FrozenSet[str]
+    signature: Tuple[int, ...]
+    response: str
+    expires_at: float
+
+
+@dataclass
+class SimilarityHit:
+    response: str
+    similarity: float
+    matched_prompt: str
+
+
+class SimilarityCache:
+    def __init__(
+        self,
+        thresholds: Optional[Dict[str, float]] = None,
+        max_entries: int = 2000,
+        ttl: float = 3600.0,
+        num_perm: int = 64,
+        bands: int = 16,
+    ):
+        """
+        PURPOSE: Create an empty similarity cache.
+        PARAMS:
+            thresholds: task_type -> minimum similarity (0-1) to serve a cached answer.
+            max_entries: LRU size bound.
+            ttl: Seconds an entry may be served.
+            num_perm / bands: MinHash size and LSH banding (num_perm must divide by bands).
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[int, SimilarityEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple[Any, ...], Set[int]] = {}
+        self._next_id = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.recent_hit_similarities: deque = deque(maxlen=100)
+
+    def threshold_for(self, task_type: str) -> Optional[float]:
+        """
+        PURPOSE: Similarity threshold for a task type, or None if the task is not eligible.
+        """
+        return self.thresholds.get(task_type)
+
+    def _band_keys(self, scope: Tuple[str, str, str], signature: Tuple[int, ...]) -> List[Tuple[Any, ...]]:
+        return [
+            (scope, band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _scope(task_type: str, model: str, system_instruction: str) -> Tuple[str, str, str]:
+        return (task_type, model, hashlib.sha256(system_instruction.encode("utf-8")).hexdigest())
+
+    def lookup(self, task_type: str, model: str, system_instruction: str, prompt: str) -> Optional[SimilarityHit]:
+        """
+        PURPOSE: Find the most similar cached prompt in the same scope.
+        RETURNS: SimilarityHit if it reaches the task's threshold, else None.
+        """
+        threshold = self.threshold_for(task_type)
+        if threshold is None:
+            return None
+
+        scope = self._scope(task_type, model, system_instruction)
+        query_shingles = shingles(prompt)
+        query_numbers = numbers(prompt)
+        signature = self._hasher.signature(query_shingles)
+
+        # 1. LSH: collect candidates sharing at least one band
+        candidate_ids: Set[int] = set()
+        for key in self._band_keys(scope, signature):
+            candidate_ids |= self._buckets.get(key, set())
+
+        # 2. Score candidates by exact Jaccard (different numbers = a different question)
+        now = time.monotonic()
+        best_id, best_score = None, 0.0
+        for entry_id in candidate_ids:
+            entry = self._entries.get(entry_id)
+            if entry is None or entry.expires_at <= now or entry.numbers != query_numbers:
+                continue
+            score = jaccard(query_shingles, entry.shingles)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None or best_score < threshold:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(best_id)
+        self.hits += 1
+        self.recent_hit_similarities.append(round(best_score, 4))
+        entry = self._entries[best_id]
+        return SimilarityHit(response=entry.response, similarity=best_score, matched_prompt=entry.prompt)
+
+    def add(self, task_type: str, model: str, system_instruction: str, prompt: str, response: str) -> None:
+        """
+        PURPOSE: Remember a response (no-op for task types without a threshold).
+        """
+        if self.threshold_for(task_type) is None:
+            return
+
+        scope = self._scope(task_type, model, system_instruction)
+        prompt_shingles = shingles(prompt)
+        signature = self._hasher.signature(prompt_shingles)
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = SimilarityEntry(
+            scope=scope,
+            prompt=prompt,
+            shingles=prompt_shingles,
+            numbers=numbers(prompt),
+            signature=signature,
+            response=response,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        for key in self._band_keys(scope, signature):
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        PURPOSE: Hit rate and the similarity of recent hits.
+        """
+        lookups = self.hits + self.misses
+        similarities = list(self.recent_hit_similarities)
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_similarity": round(sum(similarities) / len(similarities), 4) if similarities else None,
+            "recent_hit_similarities": similarities,
+            "thresholds": dict(self.thresholds),
+        }
+
+
+def _thresholds_from_settings() -> Dict[str, float]:
+    """
+    PURPOSE: Default thresholds, updated with SIMILARITY_CACHE_THRESHOLDS (JSON) if set.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if settings.SIMILARITY_CACHE_THRESHOLDS:
+        try:
+            thresholds.update(json.loads(settings.SIMILARITY_CACHE_THRESHOLDS))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid SIMILARITY_CACHE_THRESHOLDS, using defaults: {e}")
+    return thresholds
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_cache: Optional[SimilarityCache] = None
+
+
+def get_similarity_cache() -> SimilarityCache:
+    """
+    PURPOSE: Return the process-wide similarity cache (configured from settings).
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SimilarityCache(
+            thresholds=_thresholds_from_settings(),
+            max_entries=settings.SIMILARITY_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    return _shared_cache
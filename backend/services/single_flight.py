@@ -0,0 +1,121 @@
+"""
+FILE: single_flight.py
+PATH: yugnex/backend/services/single_flight.py
+PURPOSE: Coalesce identical concurrent LLM calls into one upstream request.
+WORKING:
+    1. The first caller for a key ("leader") starts the call as a task and registers it.
+    2. Callers arriving with the same key while it is in flight await the same task
+       instead of starting their own.
+    3. Every caller awaits through asyncio.shield, so one caller being cancelled
+       (e.g. a client disconnect) does not cancel the call for the others.
+    4. The task is only cancelled when its LAST waiter is cancelled.
+    5. Errors are shared: every waiter of a failed call receives the same exception.
+    6. The key is released as soon as the call finishes - results are not kept
+       (that is the response cache's job).
+    7. 'for_joiners' lets the caller mark the joiners' copy of the result (e.g. zero
+       token usage, so one upstream call is not billed once per waiter).
+USAGE:
+    flights = get_single_flight()
+    response = await flights.do(cache_key, lambda: call_model(...))
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+
+        # Metrics
+        self.leaders = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Any]],
+        for_joiners: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        PURPOSE: Run 'call' once per key among concurrent callers and share its result.
+        PARAMS:
+            key: Identity of the request (same key = interchangeable answer).
+            call: Zero-argument coroutine factory; only invoked by the leader.
+            for_joiners: Applied to the result before handing it to callers that joined
+                         an existing flight (the leader gets the result as is).
+        RETURNS: The call's result (or raises its exception).
+        """
+        flight = self._flights.get(key)
+        if flight is not None and flight.task.get_loop() is not asyncio.get_running_loop():
+            # Left over from another event loop (tests / reloads) - cannot be awaited here
+            flight = None
+
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._release(key, flight))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight request ({flight.waiters} already waiting)")
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+            return result if leader or for_joiners is None else for_joiners(result)
+        except asyncio.CancelledError:
+            # Only tear down the upstream call if nobody else is waiting for it
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self.cancelled += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _release(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception as retrieved even if every waiter has gone away
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "upstream_calls": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+            "cancelled": self.cancelled,
+        }
+
+
+# =============================================================================
+# Process-wide instance
+# =============================================================================
+_shared_flights: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    PURPOSE: Return the process-wide single-flight group.
+    """
+    global _shared_flights
+    if _shared_flights is None:
+        _shared_flights = SingleFlight()
+    return _shared_flights
@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from database.connection import AsyncSessionLocal
 from agents.registry import AgentRegistry
+from agents.context import AgentContext
 from memory.conversation import ConversationManager
 
 async def run_test_session():
@@ -41,7 +42,7 @@ async def run_test_session():
         agent_key = agent_map.get(choice, "tilotma")
         
         try:
-            agent = AgentRegistry.get_agent(agent_key, db)
+            agent = AgentRegistry.get_agent(agent_key)
             print(f"\n✅ Connected to {agent_key.upper()}.")
         except Exception as e:
             print(f"❌ Error loading agent: {e}")
@@ -65,7 +66,7 @@ async def run_test_session():
             
             try:
                 # Run the agent
-                response = await agent.run(user_input=user_input)
+                response = await agent.run(user_input=user_input, ctx=AgentContext(db=db))
                 print(f"\r{agent_key.title()} > {response}")
                 
             except Exception as e:
@@ -0,0 +1,122 @@
+"""
+Shared test doubles for the AIRouter tests.
+
+    stub_manager(...)        -> StubManager, a configurable ModelManager stand-in
+    make_router(manager)     -> AIRouter with its own caches, scoreboard, breakers and
+                                single-flight group (nothing shared with other tests)
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+
+import pytest
+
+from core.deadline import current_deadline, wait_with_deadline
+from core.model_manager import ModelResult, ModelStream
+from core.rate_limiter import RateLimiterRegistry
+from services.ai_router import AIRouter
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.model_scoreboard import ModelScoreboard
+from services.response_cache import ResponseCache
+from services.similarity_cache import SimilarityCache
+from services.single_flight import SingleFlight
+
+
+class StubManager:
+    """
+    Minimal ModelManager stand-in: every provider is configured and answers
+    'answer' ("{model}" = provider, "{n}" = call number) unless it is given an error.
+
+        errors:      provider -> exception raised instead of answering
+        delays:      provider -> seconds before answering (bounded by the request deadline,
+                     like the real manager: DeadlineExceededError once it runs out)
+        usage:       (input_tokens, output_tokens) reported with each answer
+        model_ids:   provider -> model id when no specific model is requested
+        rate_limits: consulted by has_capacity (None = always has capacity)
+
+    Records 'calls' (provider per call), 'time_left' (deadline remaining at each call)
+    and 'cancelled' (providers whose call was cancelled).
+    """
+
+    def __init__(
+        self,
+        answer: str = "{model} answer",
+        errors: Optional[Dict[str, BaseException]] = None,
+        delays: Optional[Dict[str, float]] = None,
+        usage: Tuple[int, int] = (0, 0),
+        model_ids: Optional[Dict[str, str]] = None,
+        rate_limits: Optional[RateLimiterRegistry] = None
+    ):
+        self.answer = answer
+        self.errors = dict(errors or {})
+        self.delays = dict(delays or {})
+        self.usage = usage
+        self.model_ids = dict(model_ids or {})
+        self.rate_limits = rate_limits
+        self.calls = []
+        self.time_left = []
+        self.cancelled = []
+
+    def is_configured(self, model_name):
+        return True
+
+    def resolve_model_id(self, model_name, specific_claude_model=None):
+        return specific_claude_model or self.model_ids.get(model_name, model_name)
+
+    def has_capacity(self, model_name, specific_claude_model=None, estimated_tokens=0):
+        if self.rate_limits is None:
+            return True
+        return self.rate_limits.get(self.resolve_model_id(model_name, specific_claude_model)).has_capacity(estimated_tokens)
+
+    async def invoke_model(self, model_name, messages, specific_claude_model=None):
+        self.calls.append(model_name)
+        deadline = current_deadline.get()
+        self.time_left.append(deadline.remaining() if deadline else None)
+        try:
+            await wait_with_deadline(asyncio.sleep(self.delays.get(model_name, 0)), deadline)
+        except asyncio.CancelledError:
+            self.cancelled.append(model_name)
+            raise
+        if model_name in self.errors:
+            raise self.errors[model_name]
+        text = self.answer.format(model=model_name, n=len(self.calls))
+        input_tokens, output_tokens = self.usage
+        return ModelResult(
+            text, model_name, self.resolve_model_id(model_name, specific_claude_model),
+            input_tokens=input_tokens, output_tokens=output_tokens
+        )
+
+    def stream_model(self, model_name, messages, specific_claude_model=None):
+        self.calls.append(model_name)
+
+        async def produce(stream):
+            stream.provider, stream.model = model_name, self.resolve_model_id(model_name, specific_claude_model)
+            if model_name in self.errors:
+                raise self.errors[model_name]
+            for delta in ("Hel", "lo"):
+                yield delta
+
+        return ModelStream(produce)
+
+
+@pytest.fixture
+def stub_manager():
+    """Factory: stub_manager(errors=..., delays=..., ...) -> StubManager."""
+    return StubManager
+
+
+@pytest.fixture
+def make_router():
+    """Factory: make_router(manager, **parts) -> AIRouter with fresh state (parts override it)."""
+
+    def build(manager, **parts):
+        isolated = dict(
+            cache=ResponseCache(),
+            similarity_cache=SimilarityCache(),
+            scoreboard=ModelScoreboard(),
+            breakers=CircuitBreakerRegistry(),
+            flights=SingleFlight(),
+        )
+        return AIRouter(manager=manager, **{**isolated, **parts})
+
+    return build
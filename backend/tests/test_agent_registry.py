@@ -0,0 +1,49 @@
+import asyncio
+
+from agents.base import BaseAgent
+from agents.context import AgentContext
+from agents.registry import AgentRegistry
+from core.model_manager import ModelResult
+from core.scheduler import LANE_HANDOFF, LANE_INTERACTIVE
+from memory.persistent import MemorySystem
+
+
+class EchoRouter:
+    """Answers with the project memory and lane the call was made with."""
+
+    async def invoke(self, prompt, system_instruction, context_sections=None, priority=None, **kwargs):
+        await asyncio.sleep(0)
+        critical = context_sections[0].items
+        return ModelResult(f"{prompt}|{','.join(critical)}|{priority}", "claude", "claude-sonnet-4-5")
+
+
+def test_registry_returns_one_shared_instance_per_agent():
+    agent = AgentRegistry.get_agent("navya")
+    assert AgentRegistry.get_agent("NAVYA") is agent
+    assert set(AgentRegistry.preload()) == set(AgentRegistry.AGENTS)
+    assert AgentRegistry.get_agent("navya") is agent
+
+
+def test_concurrent_calls_keep_their_own_context(monkeypatch):
+    async def recall(self, project_id):
+        await asyncio.sleep(0.01 * (project_id % 3))  # Interleave the calls
+        return [f"project-{project_id}"], []
+
+    monkeypatch.setattr(MemorySystem, "recall_context_entries", recall)
+    agent = BaseAgent(agent_key="tester")
+    agent.router = EchoRouter()
+
+    async def run_all():
+        calls = [
+            agent.run(f"q{index}", AgentContext(db=object(), project_id=index + 1, priority=lane))
+            for index, lane in enumerate([LANE_INTERACTIVE, LANE_HANDOFF] * 5)
+        ]
+        return await asyncio.gather(*calls)
+
+    responses = asyncio.run(run_all())
+    for index, response in enumerate(responses):
+        lane = LANE_INTERACTIVE if index % 2 == 0 else LANE_HANDOFF
+        assert response == f"q{index}|project-{index + 1}|{lane}"
+
+    # Without a DB session there is no memory to recall
+    assert asyncio.run(agent.run("solo")) == f"solo||{LANE_INTERACTIVE}"
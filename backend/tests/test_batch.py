@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from config.settings import settings
+from core.batch import AnthropicBatchProvider, BatchRequest
+from core.model_manager import ModelManager, ModelResult
+
+
+class FakeBatches:
+    def __init__(self):
+        self.submitted = None
+        self.polls = 0
+
+    async def create(self, requests):
+        self.submitted = requests
+        return SimpleNamespace(id="batch_1", processing_status="in_progress")
+
+    async def retrieve(self, batch_id):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, processing_status="ended", request_counts={"succeeded": 1, "errored": 1})
+
+    async def results(self, batch_id):
+        async def entries():
+            message = SimpleNamespace(model="claude-sonnet-4-5", content=[SimpleNamespace(type="text", text="[APPROVE]")])
+            yield SimpleNamespace(custom_id="a", result=SimpleNamespace(type="succeeded", message=message))
+            yield SimpleNamespace(custom_id="b", result=SimpleNamespace(type="expired"))
+        return entries()
+
+
+def test_anthropic_batch_maps_results_by_custom_id():
+    batches = FakeBatches()
+    client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+    provider = AnthropicBatchProvider(client, poll_interval=0)
+    messages = [SystemMessage(content="sys"), HumanMessage(content="review")]
+
+    results = asyncio.run(provider.run([("a", "claude-sonnet-4-5", messages), ("b", "claude-sonnet-4-5", messages)]))
+
+    assert batches.submitted[0]["params"]["system"] == "sys"
+    assert batches.submitted[0]["params"]["messages"] == [{"role": "user", "content": "review"}]
+    assert batches.polls == 1
+    assert results["a"].ok and results["a"].text == "[APPROVE]"
+    assert not results["b"].ok and results["b"].error == "expired"
+
+
+def test_local_batch_keeps_request_order_and_isolates_failures(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_USE_PROVIDER_API", False)
+    manager = ModelManager()
+
+    async def fake_invoke(model_name, messages, specific_claude_model=None):
+        if messages[0].content == "boom":
+            raise RuntimeError("provider down")
+        return ModelResult(messages[0].content.upper(), model_name, specific_claude_model or model_name)
+
+    manager.invoke_model = fake_invoke
+    requests = [
+        BatchRequest(custom_id=str(i), messages=[HumanMessage(content=text)])
+        for i, text in enumerate(["one", "boom", "three"])
+    ]
+    results = asyncio.run(manager.submit_batch(requests))
+
+    assert [result.custom_id for result in results] == ["0", "1", "2"]
+    assert [result.text for result in results] == ["ONE", None, "THREE"]
+    assert results[1].error == "provider down"
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from config.settings import settings
+from core import cancellation
+from core.cancellation import ClientDisconnectedError, get_cancellation_stats, run_until_disconnected
+from core.model_manager import ModelManager
+
+
+class FakeRequest:
+    """Reports a disconnect after 'polls' checks."""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(cancellation, "_shared_stats", None)
+
+
+def test_disconnect_cancels_the_work():
+    cancelled = []
+
+    async def long_generation():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(ClientDisconnectedError):
+        asyncio.run(run_until_disconnected(FakeRequest(polls=2), long_generation(), "messages", poll_interval=0.01))
+    assert cancelled == [True]
+    assert get_cancellation_stats().stats()["cancelled_requests"] == {"messages": 1}
+
+
+def test_connected_client_gets_the_result():
+    async def quick():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    assert asyncio.run(run_until_disconnected(FakeRequest(polls=100), quick(), "messages", poll_interval=0.005)) == "done"
+
+
+def test_cancelled_model_call_releases_its_slot_and_is_counted(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER_MODE", "simulate")
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_SECONDS", 10.0)
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_JITTER", 0.0)
+    manager = ModelManager()
+
+    async def scenario():
+        task = asyncio.create_task(manager.invoke_model("claude", [HumanMessage(content="hi")], "claude-haiku-4-5"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert get_cancellation_stats().stats()["cancelled_calls"]["claude-haiku-4-5"]["calls"] == 1
+    assert manager.scheduler.stats()["models"]["claude-haiku-4-5"]["running"] == 0
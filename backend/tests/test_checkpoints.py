@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from agents.collaboration.checkpoints import CheckpointStore, MemoryCheckpointStore
+from agents.collaboration.workflow import STEP_FAILED, Workflow
+from database.models import WorkflowCheckpoint
+
+
+def pipeline(calls, fail_review=False):
+    """request -> plan -> code -> review, counting executions per step."""
+
+    def step(name, build):
+        async def run(results):
+            calls[name] = calls.get(name, 0) + 1
+            if name == "review" and fail_review:
+                raise RuntimeError("review crashed")
+            return build(results)
+        return run
+
+    return (
+        Workflow()
+        .add_step("plan", step("plan", lambda r: f"plan for {r['request']}"))
+        .add_step("code", step("code", lambda r: f"code from {r['plan']}"), depends_on=["plan"])
+        .add_step("review", step("review", lambda r: f"review of {r['code']}"), depends_on=["code"])
+    )
+
+
+def test_rerun_resumes_from_checkpoints_after_a_late_failure():
+    store, calls = MemoryCheckpointStore(), {}
+    first = asyncio.run(pipeline(calls, fail_review=True).run({"request": "CRM"}, run_id="run-1", checkpoints=store))
+    assert first.steps["review"].status == STEP_FAILED
+
+    second = asyncio.run(pipeline(calls).run({"request": "CRM"}, run_id="run-1", checkpoints=store))
+    assert second.ok and second.resumed == ["plan", "code"]
+    assert calls == {"plan": 1, "code": 1, "review": 2}  # Only the failed step ran again
+    assert second.results["review"] == "review of code from plan for CRM"
+
+
+def test_changed_inputs_invalidate_downstream_checkpoints():
+    store, calls = MemoryCheckpointStore(), {}
+    asyncio.run(pipeline(calls).run({"request": "CRM"}, run_id="run-2", checkpoints=store))
+    report = asyncio.run(pipeline(calls).run({"request": "Shop"}, run_id="run-2", checkpoints=store))
+
+    assert report.resumed == [] and calls == {"plan": 2, "code": 2, "review": 2}
+    assert report.results["review"] == "review of code from plan for Shop"
+
+    asyncio.run(store.clear("run-2"))
+    assert asyncio.run(store.load("run-2", "plan")) is None
+    assert WorkflowCheckpoint.__tablename__ == "workflow_checkpoints"
+
+
+def test_checkpoint_store_is_abstract():
+    with pytest.raises(TypeError):
+        CheckpointStore()
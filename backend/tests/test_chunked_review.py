@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from agents.reviewers import ChunkReview, Navya
+from config.settings import settings
+from core.model_manager import ModelResult
+from services.review_cache import ReviewCache
+
+
+class ReviewRouter:
+    """Approves everything except code containing 'eval(', records the routing hints."""
+
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    async def invoke(self, prompt, system_instruction, task_type="general", complexity="medium", requires_speed=False, **kwargs):
+        self.calls.append((task_type, complexity, requires_speed))
+        await asyncio.sleep(0.1)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("provider down")
+        verdict = "[REQUEST CHANGES] eval is unsafe" if "eval(" in prompt else "[APPROVE] looks fine"
+        model = "claude-haiku-4-5" if requires_speed else "claude-opus-4-5"
+        return ModelResult(verdict, "claude", model, input_tokens=100, output_tokens=20)
+
+
+def change(*files):
+    return "\n".join(f"# FILE: {path}\n{body}" for path, body in files)
+
+
+def test_chunks_are_reviewed_in_parallel_and_routed_by_size(monkeypatch):
+    monkeypatch.setattr(settings, "REVIEW_SMALL_CHUNK_TOKENS", 50)
+    navya = Navya()
+    navya.router = ReviewRouter()
+    navya.review_cache = ReviewCache()
+    big = "\n".join(f"value_{i} = compute({i})" for i in range(60))
+    code = change(("a.py", "x = 1"), ("b.py", "result = eval(user_input)"), ("c.py", big))
+
+    started = time.perf_counter()
+    report = asyncio.run(navya.review_changes(code, "Payment service"))
+    assert time.perf_counter() - started < 0.25  # ~ one chunk, not three
+
+    assert report.verdict == "rejected" and "b.py" in report.reason and "1 of 3" in report.reason
+    assert report.text.startswith("OVERALL VERDICT: REJECTED")
+    assert report.text.index("b.py") < report.text.index("a.py")  # Changes requested listed first
+    assert sorted(navya.router.calls) == [("code_review", "low", True)] * 2 + [("code_review", "medium", False)]
+    assert report.total_tokens == 360
+
+
+def test_unreviewed_chunks_make_the_verdict_ambiguous():
+    navya = Navya()
+    navya.router = ReviewRouter(fail_on="b.py")
+    navya.review_cache = ReviewCache()
+    report = asyncio.run(navya.review_changes(change(("a.py", "x = 1"), ("b.py", "y = 2")), ""))
+    assert report.verdict == "ambiguous" and "b.py" in report.reason
+
+    verdict, reason = Navya.aggregate_verdicts([ChunkReview("a.py", "approved"), ChunkReview("b.py", "approved")])
+    assert (verdict, reason) == ("approved", "All 2 part(s) approved.")
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from core.errors import FATAL, RETRYABLE, ProviderNotConfiguredError, classify_error
+from services.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_error_classification():
+    assert classify_error(asyncio.TimeoutError()) == RETRYABLE
+    assert classify_error(HttpError(429)) == RETRYABLE
+    assert classify_error(HttpError(529)) == RETRYABLE
+    assert classify_error(HttpError(400)) == FATAL
+    assert classify_error(ProviderNotConfiguredError("no key")) == FATAL
+
+
+def test_breaker_opens_then_half_opens(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+
+    assert breaker.times_opened == 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_routes_straight_to_healthy_provider(stub_manager, make_router):
+    manager = stub_manager(errors={"claude": HttpError(503)})
+    router = make_router(manager, breakers=CircuitBreakerRegistry(failure_threshold=1, recovery_timeout=60))
+
+    assert asyncio.run(router.process_request("a", "sys", use_cache=False)) == "gemini answer"
+    assert asyncio.run(router.process_request("b", "sys", use_cache=False)) == "gemini answer"
+    assert manager.calls == ["claude", "gemini", "gemini"]
+
+
+def test_fatal_error_does_not_fall_back(stub_manager, make_router):
+    manager = stub_manager(errors={"claude": HttpError(400)})
+    router = make_router(manager)
+
+    with pytest.raises(HttpError):
+        asyncio.run(router.process_request("a", "sys", use_cache=False))
+    assert manager.calls == ["claude"]
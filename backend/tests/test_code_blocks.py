@@ -0,0 +1,72 @@
+import asyncio
+
+from agents.developers import Shubham
+from services.code_blocks import CodeBlockExtractor, iter_code_blocks
+
+RESPONSE = """Here is the app.
+
+```python
+# FILE: app/main.py
+print("hi")
+```
+
+And a helper without a language tag:
+```
+echo hello
+```
+
+```ts src/index.ts
+export const x = 1;
+```
+
+````markdown
+```js
+nested()
+```
+````
+Done."""
+
+
+def test_blocks_are_emitted_as_soon_as_their_fence_closes():
+    extractor = CodeBlockExtractor()
+    emitted_at = []
+    for position, char in enumerate(RESPONSE):
+        for block in extractor.feed(char):
+            emitted_at.append((position, block))
+    assert extractor.close() == []
+
+    blocks = [block for _, block in emitted_at]
+    assert [(b.language, b.path) for b in blocks] == [
+        ("python", "app/main.py"), ("", None), ("ts", "src/index.ts"), ("markdown", None)
+    ]
+    assert blocks[0].code == '# FILE: app/main.py\nprint("hi")'
+    assert blocks[3].code == "```js\nnested()\n```"  # Shorter fences inside stay code
+    # The first block is out right after its closing fence line, long before the end
+    assert emitted_at[0][0] == RESPONSE.index("```\n", RESPONSE.index("print")) + 3
+
+
+def test_unterminated_block_is_flushed_on_close():
+    extractor = CodeBlockExtractor()
+    assert extractor.feed("text ```inline``` here\n```go\nfunc main() {}") == []
+    [block] = extractor.close()
+    assert (block.language, block.code, block.complete) == ("go", "func main() {}", False)
+    [truncated] = Shubham().extract_code_blocks("```go\nfunc main() {")
+    assert truncated["complete"] is False
+
+
+def test_shubham_extracts_untagged_blocks_and_streams():
+    blocks = Shubham().extract_code_blocks(RESPONSE)
+    assert len(blocks) == 4 and blocks[1] == {"language": "", "code": "echo hello", "path": None, "complete": True}
+
+    async def deltas(log):
+        for chunk in ["```sql\nSELECT 1;\n", "```\n", "more text...", " the end"]:
+            log.append(chunk)
+            yield chunk
+
+    async def first_block():
+        log = []
+        async for block in iter_code_blocks(deltas(log)):
+            return block, len(log)
+
+    block, chunks_read = asyncio.run(first_block())
+    assert block.code == "SELECT 1;" and chunks_read == 2
@@ -0,0 +1,56 @@
+import pytest
+
+from services.context_budget import (
+    ContextBudgetExceededError,
+    ContextBudgetPlanner,
+    ContextSection,
+    context_limit,
+    rank_by_relevance,
+    split_files,
+)
+
+
+def test_split_and_rank_files():
+    files = "# FILE: auth.py\ndef login(user): ...\n\n# FILE: billing.py\ndef invoice(order): ..."
+    chunks = split_files(files)
+    assert [chunk.splitlines()[0] for chunk in chunks] == ["# FILE: auth.py", "# FILE: billing.py"]
+    assert rank_by_relevance(chunks, "why does invoice fail for an order?")[0].startswith("# FILE: billing.py")
+
+
+def test_budget_uses_smallest_window_and_reserves_output():
+    planner = ContextBudgetPlanner(output_reserve=4096, safety_margin=0.0)
+    model, limit, budget = planner.budget_for(["gemini-2.5-pro", "claude-sonnet-4-5"])
+    assert model == "claude-sonnet-4-5"
+    assert limit == context_limit("claude-sonnet-4-5") == 200_000
+    assert budget == 200_000 - 4096
+
+
+def test_old_memories_trimmed_before_files():
+    planner = ContextBudgetPlanner(output_reserve=0, safety_margin=0.0, max_input_tokens=60)
+    sections = [
+        ContextSection("[CRITICAL]", ["- keep postgres"], priority=2),
+        ContextSection("[RECENT]", ["- newest note", "- old note " + "word " * 40], priority=0),
+        ContextSection("[FILES]", ["# FILE: a.py\nprint('a')"], priority=1),
+    ]
+    context, report = planner.fit(["claude-haiku-4-5"], "system", "prompt", sections)
+
+    assert report.dropped == {"[RECENT]": 1}
+    assert "old note" not in context and "newest note" in context and "a.py" in context
+    assert report.used <= report.budget
+    assert 0 < report.utilization <= 1
+
+
+def test_large_file_is_truncated_not_dropped():
+    planner = ContextBudgetPlanner(output_reserve=0, safety_margin=0.0, max_input_tokens=400)
+    big_file = "# FILE: big.py\n" + "x = compute_value(1)\n" * 200
+    context, report = planner.fit(["claude-haiku-4-5"], "system", "prompt", [ContextSection("[FILES]", [big_file])])
+
+    assert "truncated" in context and "# FILE: big.py" in context
+    assert report.truncated == ["[FILES]"]
+    assert report.used <= report.budget
+
+
+def test_fixed_part_over_budget_fails_before_the_call():
+    planner = ContextBudgetPlanner(output_reserve=0, safety_margin=0.0, max_input_tokens=10)
+    with pytest.raises(ContextBudgetExceededError):
+        planner.fit(["claude-haiku-4-5"], "system " * 20, "prompt", [])
@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import random
+
+import pytest
+
+from config.settings import settings
+from core.deadline import Deadline, DeadlineExceededError, RetryPolicy
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def flaky(failures, error):
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return "ok"
+
+    return call, calls
+
+
+def policy(**kwargs):
+    return RetryPolicy(base_delay=0.01, max_delay=0.02, min_attempt_seconds=0.0, rng=random.Random(1), **kwargs)
+
+
+def test_retryable_errors_are_retried_with_bounded_backoff():
+    call, calls = flaky(2, StatusError(529))
+    retry = policy(max_attempts=3)
+    assert asyncio.run(retry.run(call)) == "ok"
+    assert len(calls) == 3 and retry.retries == 2
+    assert all(0 <= retry.backoff(n) <= 0.02 for n in range(10))
+
+
+def test_rate_limits_and_fatal_errors_are_not_retried():
+    for error in (StatusError(429), StatusError(400)):
+        call, calls = flaky(5, error)
+        with pytest.raises(StatusError):
+            asyncio.run(policy(max_attempts=3).run(call))
+        assert len(calls) == 1
+
+
+def test_hung_call_is_cut_off_at_the_deadline():
+    async def hang():
+        await asyncio.sleep(10)
+
+    retry = policy(max_attempts=3, attempt_timeout=None)
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(retry.run(hang, Deadline(0.05)))
+    assert retry.deadline_exceeded == 1
+
+
+def test_no_retry_without_time_for_another_attempt():
+    call, calls = flaky(5, StatusError(503))
+    retry = RetryPolicy(max_attempts=5, base_delay=0.01, max_delay=0.01, min_attempt_seconds=5.0)
+    with pytest.raises(StatusError):
+        asyncio.run(retry.run(call, Deadline(1.0)))
+    assert len(calls) == 1
+
+
+def test_fallback_gets_only_the_time_left(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "off")
+    manager = stub_manager(delays={"claude": 0.1}, errors={"claude": StatusError(503)})
+
+    response = asyncio.run(make_router(manager).process_request("hi", "sys", use_cache=False, deadline=Deadline(5.0)))
+
+    assert response == "gemini answer"
+    (_, primary_left), (fallback, fallback_left) = zip(manager.calls, manager.time_left)
+    assert fallback == "gemini" and fallback_left <= primary_left - 0.1
+
+
+def test_no_fallback_once_the_deadline_is_spent(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "off")
+    manager = stub_manager(delays={"claude": 10.0})
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(make_router(manager).process_request("hi", "sys", use_cache=False, deadline=Deadline(0.05)))
+    assert manager.calls == ["claude"]
+
+
+def test_attempt_timeout_starts_after_admission_and_is_per_model():
+    @contextlib.asynccontextmanager
+    async def queued_slot():
+        await asyncio.sleep(0.1)  # Local queue wait, longer than the attempt cap
+        yield
+
+    async def call():
+        await asyncio.sleep(0.03)
+        return "ok"
+
+    retry = policy(max_attempts=1, attempt_timeout=0.05, model_timeouts={"slow-model": 0.01})
+    assert asyncio.run(retry.run(call, Deadline(5.0), admission=queued_slot)) == "ok"
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(retry.run(call, Deadline(5.0), label="slow-model"))
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(retry.run(call, Deadline(0.05), admission=queued_slot))
+
+
+def test_spent_deadline_does_not_count_against_the_provider(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "off")
+    router = make_router(stub_manager(delays={"claude": 10.0}))
+    for _ in range(6):
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(router.process_request("hi", "sys", use_cache=False, deadline=Deadline(0.02)))
+
+    assert router.breakers.get("claude/claude-sonnet-4-5").stats()["consecutive_failures"] == 0
+    assert router.scoreboard.error_rate("claude-sonnet-4-5") is None
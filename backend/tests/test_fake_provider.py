@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from config.settings import settings
+from core.errors import RETRYABLE, classify_error
+from core.fake_provider import (
+    FakeChatClient, LatencyModel, RecordingChatClient, RecordingStore, SimulatedProviderError, request_key,
+)
+from core.model_manager import ModelManager
+
+MESSAGES = [SystemMessage(content="sys"), HumanMessage(content="hello")]
+FAST = dict(ttft_seconds=0.0, ttft_jitter=0.0, tokens_per_second=0)
+
+
+class LiveClient:
+    async def ainvoke(self, messages):
+        return AIMessage(content="recorded answer")
+
+
+def test_record_then_replay(tmp_path):
+    store = RecordingStore(str(tmp_path))
+    recorder = RecordingChatClient(LiveClient(), "claude-haiku-4-5", store)
+    asyncio.run(recorder.ainvoke(MESSAGES))
+    assert store.load(request_key("claude-haiku-4-5", MESSAGES))["response"] == "recorded answer"
+
+    replay = FakeChatClient("claude-haiku-4-5", LatencyModel(**FAST), store)
+    assert asyncio.run(replay.ainvoke(MESSAGES)).content == "recorded answer"
+    assert asyncio.run(replay.ainvoke([HumanMessage(content="never recorded")])).content.startswith("[simulated")
+    assert (replay.replayed, replay.synthesized) == (1, 1)
+
+
+def test_simulated_stream_is_deterministic_and_can_fail():
+    client = FakeChatClient("gemini-2.5-pro", LatencyModel(output_tokens=20, **FAST))
+
+    async def collect():
+        return "".join([chunk.content async for chunk in client.astream(MESSAGES)])
+
+    assert asyncio.run(collect()) == asyncio.run(client.ainvoke(MESSAGES)).content
+
+    failing = FakeChatClient("gemini-2.5-pro", LatencyModel(error_rate=1.0, **FAST))
+    with pytest.raises(SimulatedProviderError) as error:
+        asyncio.run(failing.ainvoke(MESSAGES))
+    assert classify_error(error.value) == RETRYABLE
+
+
+def test_manager_simulate_mode_needs_no_keys(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER_MODE", "simulate")
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "LLM_SIM_TOKENS_PER_SECOND", 0)
+    manager = ModelManager()
+
+    assert manager.is_configured("claude") and manager.is_configured("gemini")
+    result = asyncio.run(manager.invoke_model("claude", MESSAGES, specific_claude_model="claude-haiku-4-5"))
+    assert result.text.startswith("[simulated claude-haiku-4-5]")
+    assert result.model == "claude-haiku-4-5" and result.output_tokens > 0
+    assert manager.stats()["fake_clients"]["claude-haiku-4-5"]["synthesized"] == 1
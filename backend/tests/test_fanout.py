@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+from agents.collaboration.fanout import FanoutBranch, FanoutManager
+from agents.context import AgentContext
+from agents.registry import AgentRegistry
+from config.settings import settings
+from core.model_manager import ModelResult
+from core.tilotma import Tilotma
+
+
+class SleepyAgent:
+    """Answers after 'delay' seconds (or fails), recording the context it was given."""
+
+    def __init__(self, key, delay=0.1, fail=False):
+        self.key, self.delay, self.fail = key, delay, fail
+        self.contexts = []
+
+    async def invoke(self, user_input, ctx=None, context_files=None):
+        self.contexts.append(ctx)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.key} crashed")
+        return ModelResult(f"{self.key} output", "claude", "claude-sonnet-4-5", input_tokens=100, output_tokens=10)
+
+
+class MergeRouter:
+    def __init__(self):
+        self.prompts = []
+
+    async def invoke(self, prompt, system_instruction, **kwargs):
+        self.prompts.append(prompt)
+        return ModelResult("merged answer", "claude", "claude-sonnet-4-5", input_tokens=500, output_tokens=50)
+
+
+def install(monkeypatch, *agents):
+    for agent in agents:
+        monkeypatch.setitem(AgentRegistry._instances, agent.key, agent)
+
+
+def test_branches_run_in_parallel_with_timeouts_and_partial_failure(monkeypatch):
+    install(monkeypatch, SleepyAgent("advait"), SleepyAgent("saanvi", fail=True), SleepyAgent("navya", delay=5))
+    branches = [FanoutBranch("advait", "plan"), FanoutBranch("saanvi", "stories"), FanoutBranch("navya", "risks", timeout=0.2)]
+
+    started = time.perf_counter()
+    result = asyncio.run(FanoutManager.fan_out(branches, "Build a CRM", AgentContext(db=object(), project_id=1)))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5  # ~ the slowest branch (the 0.2s timeout), not the sum
+    assert [b.agent_key for b in result.succeeded] == ["advait"]
+    assert "crashed" in result.branches[1].error and result.branches[2].error
+    assert AgentRegistry.get_agent("advait").contexts[0].db is None  # The session is never shared
+
+
+def test_concurrency_is_bounded(monkeypatch):
+    agents = [SleepyAgent(f"agent{index}", delay=0.1) for index in range(4)]
+    install(monkeypatch, *agents)
+
+    started = time.perf_counter()
+    result = asyncio.run(FanoutManager.fan_out([FanoutBranch(a.key, "task") for a in agents], "req", concurrency=2))
+    assert len(result.succeeded) == 4 and time.perf_counter() - started >= 0.2
+
+
+def test_tilotma_fans_out_planning_requests_and_merges(monkeypatch):
+    monkeypatch.setattr(settings, "TILOTMA_FANOUT_ENABLED", True)
+    install(monkeypatch, SleepyAgent("advait"), SleepyAgent("saanvi"), SleepyAgent("navya", fail=True))
+    tilotma = Tilotma()
+    tilotma.router = MergeRouter()
+
+    result = asyncio.run(tilotma.invoke("Please design a booking system"))
+    assert result.text == "merged answer"
+    assert (result.input_tokens, result.output_tokens) == (700, 70)  # Merge + two successful branches
+    merge_prompt = tilotma.router.prompts[0]
+    assert "advait output" in merge_prompt and "saanvi output" in merge_prompt and "navya crashed" in merge_prompt
+
+    # Other turns are answered directly
+    asyncio.run(tilotma.invoke("What time is it?"))
+    assert tilotma.router.prompts[1] == "What time is it?"
+
+
+def test_fanout_triggers_match_whole_words_only(monkeypatch):
+    monkeypatch.setattr(settings, "TILOTMA_FANOUT_ENABLED", True)
+    tilotma = Tilotma()
+    for text in ("Build me a CRM", "Can you PLAN the sprint?", "architect a data platform", "create an invoice app"):
+        assert tilotma.plan_fanout(text), text
+    for text in ("Which planet is largest?", "airplane facts", "rebuild the index", "implant", "what's the architecture?"):
+        assert tilotma.plan_fanout(text) == [], text
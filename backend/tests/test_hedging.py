@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from config.settings import settings
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "hedge")
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    manager = stub_manager(delays={"claude": 5.0, "gemini": 0.01})
+    router = make_router(manager)
+
+    response = asyncio.run(router.process_request("hi", "sys", requires_speed=True, use_cache=False))
+
+    assert response == "gemini answer"
+    assert manager.cancelled == ["claude"]
+    assert router.scoreboard.hedge_wins == {"gemini": 1}
+
+
+def test_fast_primary_never_fires_secondary(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "hedge")
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY_SECONDS", 1.0)
+    manager = stub_manager(delays={"claude": 0.01, "gemini": 0.01})
+
+    response = asyncio.run(make_router(manager).process_request("hi", "sys", requires_speed=True, use_cache=False))
+
+    assert response == "claude answer"
+    assert manager.calls == ["claude"]
+
+
+def test_race_mode_fires_both_immediately(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "race")
+    manager = stub_manager(delays={"claude": 0.05, "gemini": 0.2})
+
+    response = asyncio.run(make_router(manager).process_request("hi", "sys", requires_speed=True, use_cache=False))
+
+    assert response == "claude answer"
+    assert manager.calls == ["claude", "gemini"]
+    assert manager.cancelled == ["gemini"]
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def test_fatal_primary_error_is_raised_without_hedging(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "hedge")
+    monkeypatch.setattr(settings, "HEDGE_DEFAULT_DELAY_SECONDS", 1.0)
+    manager = stub_manager(errors={"claude": BadRequest("malformed request")})
+
+    with pytest.raises(BadRequest):
+        asyncio.run(make_router(manager).process_request("hi", "sys", requires_speed=True, use_cache=False))
+    assert manager.calls == ["claude"]
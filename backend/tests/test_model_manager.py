@@ -0,0 +1,22 @@
+import asyncio
+
+from core import model_manager
+from core.model_manager import close_model_manager, get_model_manager
+from services.ai_router import AIRouter
+
+
+def test_model_manager_is_shared_per_process():
+    manager = get_model_manager()
+    assert get_model_manager() is manager
+    assert AIRouter().manager is manager
+    assert AIRouter().manager is AIRouter().manager
+
+
+def test_http_pool_is_reused_per_provider():
+    manager = get_model_manager()
+    pool = manager._get_http_pool("gemini")
+    assert manager._get_http_pool("gemini") is pool
+
+    asyncio.run(close_model_manager())
+    assert pool.is_closed
+    assert model_manager._shared_manager is None
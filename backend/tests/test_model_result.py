@@ -0,0 +1,95 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from config.settings import settings
+from core.model_manager import ModelManager, ModelResult
+from core.scheduler import CallScheduler
+from services.context_budget import ContextSection
+
+ANTHROPIC_USAGE = {
+    "input_tokens": 1200,
+    "output_tokens": 300,
+    "total_tokens": 1500,
+    "input_token_details": {"cache_read": 1000, "cache_creation": 0},
+}
+
+
+def failover_manager(stub_manager):
+    """Claude is down; Gemini answers with real usage numbers."""
+    return stub_manager(
+        answer="answer", errors={"claude": RuntimeError("claude down")}, usage=(40, 9),
+        model_ids={"gemini": "gemini-2.5-pro", "claude": "claude-sonnet-4-5"}
+    )
+
+
+def test_usage_metadata_is_parsed_or_estimated():
+    result = ModelResult.from_usage("hi", "claude", "claude-sonnet-4-5", {"input_tokens": 1200, "output_tokens": 300, "cache_read_tokens": 1000}, [])
+    assert (result.total_tokens, result.cache_read_tokens, result.usage_estimated) == (1500, 1000, False)
+    assert "text" not in result.metadata()
+
+    estimated = ModelResult.from_usage("a short answer", "gemini", "gemini-2.5-pro", {}, [HumanMessage(content="question")])
+    assert estimated.usage_estimated and estimated.input_tokens > 0 and estimated.output_tokens > 0
+
+
+def test_result_names_the_model_that_answered_after_fallback(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "off")
+    router = make_router(failover_manager(stub_manager))
+
+    result = asyncio.run(router.invoke("hi", "sys", model_override="claude"))
+    assert (result.model, result.provider, result.total_tokens, result.cached) == ("gemini-2.5-pro", "gemini", 49, False)
+
+    again = asyncio.run(router.invoke("hi", "sys", model_override="gemini"))
+    assert again.cached and again.text == "answer" and again.total_tokens == 0
+
+
+def test_each_result_explains_its_own_routing_and_context_budget(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "HEDGE_MODE", "off")
+    router = make_router(failover_manager(stub_manager))
+    sections = [ContextSection("[FILES]", ["# FILE: a.py\nprint('a')"])]
+
+    async def both():
+        return await asyncio.gather(
+            router.invoke("hi", "sys", model_override="gemini", use_cache=False, context_sections=sections),
+            router.invoke("summarize it", "sys", complexity="low", use_cache=False),
+        )
+
+    with_context, planned = asyncio.run(both())
+    assert with_context.selection_reason == "Model override: gemini"
+    assert with_context.context_budget["used"] > 0 and with_context.metadata()["context_budget"] == with_context.context_budget
+    assert planned.selection_reason and "override" not in planned.selection_reason and planned.context_budget is None
+
+
+def test_stream_result_has_usage_and_ttft(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER_MODE", "simulate")
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_JITTER", 0.0)
+    monkeypatch.setattr(settings, "LLM_SIM_TOKENS_PER_SECOND", 0)
+    stream = ModelManager().stream_model("gemini", [HumanMessage(content="hi")])
+
+    async def drain():
+        return [delta async for delta in stream]
+
+    asyncio.run(drain())
+    result = stream.result()
+    assert result.model == "gemini-2.5-pro" and result.text == stream.text
+    assert result.output_tokens > 0 and not result.usage_estimated
+    assert 0 < result.ttft_seconds <= result.latency_seconds
+
+
+def test_scoreboard_records_provider_time_not_queue_wait(monkeypatch, make_router):
+    monkeypatch.setattr(settings, "LLM_PROVIDER_MODE", "simulate")
+    monkeypatch.setattr(settings, "LLM_SIM_TTFT_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "LLM_SIM_TOKENS_PER_SECOND", 0)
+    manager = ModelManager()
+    manager.scheduler = CallScheduler(default_limit=1)
+    router = make_router(manager)
+
+    async def scenario():
+        await manager.scheduler.acquire("claude-haiku-4-5")  # The local queue is busy
+        asyncio.get_running_loop().call_later(0.2, manager.scheduler.release, "claude-haiku-4-5")
+        return await router._timed_invoke("claude", "claude-haiku-4-5", [HumanMessage(content="hi")])
+
+    result = asyncio.run(scenario())
+    assert result.latency_seconds >= 0.2 and result.provider_seconds < 0.1
+    assert router.scoreboard.latency_quantile("claude-haiku-4-5", 0.5) == result.provider_seconds
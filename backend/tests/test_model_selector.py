@@ -0,0 +1,74 @@
+from services.model_scoreboard import ModelScoreboard
+from services.model_selector import ModelSelector
+
+
+class Manager:
+    def __init__(self, configured=("claude", "gemini")):
+        self.configured = configured
+
+    def is_configured(self, model_name):
+        return model_name in self.configured
+
+    def resolve_model_id(self, model_name, specific_claude_model=None):
+        return specific_claude_model or ("gemini-2.5-pro" if model_name == "gemini" else "claude-sonnet-4-5")
+
+
+def record(board, model, seconds, ok=True, samples=5):
+    for _ in range(samples):
+        board.record_latency(model, seconds)
+        board.record_outcome(model, ok)
+
+
+def test_static_choice_kept_when_healthy():
+    selector = ModelSelector(ModelScoreboard(), min_samples=5)
+    selection = selector.select(Manager(), "general", "medium", False, ("claude", "claude-sonnet-4-5"))
+
+    assert selection.target == ("claude", "claude-sonnet-4-5")
+    assert selection.policy == "adaptive"
+    # Cheaper models below the static tier are never candidates
+    assert "claude-haiku-4-5" not in [c["model"] for c in selection.candidates]
+
+
+def test_slow_model_is_routed_around_to_cheapest_passing_one():
+    board = ModelScoreboard()
+    record(board, "claude-haiku-4-5", 9.0)
+    record(board, "gemini-2.5-pro", 2.0)
+    selector = ModelSelector(board, min_samples=5)
+
+    selection = selector.select(Manager(), "quick_answer", "low", True, ("claude", "claude-haiku-4-5"))
+    assert selection.target == ("gemini", None)
+    assert "claude-haiku-4-5" in selection.reason and "SLO" in selection.reason
+
+
+def test_error_rate_and_static_fallback():
+    board = ModelScoreboard()
+    record(board, "claude-opus-4-5", 5.0, ok=False)
+    selector = ModelSelector(board, min_samples=5)
+
+    # Only Opus is eligible for high complexity and it is failing -> static policy
+    selection = selector.select(Manager(configured=("claude",)), "architecture", "high", False, ("claude", "claude-opus-4-5"))
+    assert selection.policy == "static"
+    assert selection.target == ("claude", "claude-opus-4-5")
+    assert selection.candidates[0]["rejected"].startswith("error rate")
+
+
+def test_cheaper_model_at_the_same_tier_is_explained():
+    selector = ModelSelector(ModelScoreboard(), min_samples=5)
+    selection = selector.select(Manager(), "architecture", "high", False, ("claude", "claude-opus-4-1"))
+
+    assert selection.target == ("claude", "claude-opus-4-5")
+    assert "cheaper at equal or higher tier" in selection.reason and "not configured" not in selection.reason
+
+
+def test_routed_around_model_recovers_once_its_bad_samples_age_out():
+    now = [0.0]
+    board = ModelScoreboard(max_age_seconds=600, clock=lambda: now[0])
+    record(board, "claude-haiku-4-5", 9.0, samples=20)
+    selector = ModelSelector(board, min_samples=5)
+    static = ("claude", "claude-haiku-4-5")
+
+    assert selector.select(Manager(), "quick_answer", "low", True, static).target == ("gemini", None)
+
+    now[0] = 601.0  # The slow stretch is over and nobody has called Haiku since
+    assert selector.select(Manager(), "quick_answer", "low", True, static).target == static
+    assert board.stats()["models"]["claude-haiku-4-5"]["samples"] == 0
@@ -0,0 +1,37 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from core.prompt_cache import CACHE_CONTROL, PromptCacheStats, prepare_messages
+from services.ai_router import AIRouter
+
+
+def test_router_splits_system_prompt_into_prefix_and_suffix():
+    messages = AIRouter._build_messages("hi", "PERSONA\nCONTEXT", cacheable_prefix="PERSONA\n")
+    assert [block["text"] for block in messages[0].content] == ["PERSONA\n", "CONTEXT"]
+
+    # A prefix that does not match the instruction is ignored
+    assert AIRouter._build_messages("hi", "OTHER", cacheable_prefix="PERSONA")[0].content == "OTHER"
+
+
+def test_claude_gets_breakpoint_and_gemini_gets_flat_prefix_first():
+    messages = AIRouter._build_messages("hi", "PERSONA|CONTEXT", cacheable_prefix="PERSONA|")
+
+    claude = prepare_messages("claude", messages)
+    assert claude[0].content[0]["cache_control"] == CACHE_CONTROL
+    assert "cache_control" not in claude[0].content[1]
+    assert "cache_control" not in messages[0].content[0]
+
+    gemini = prepare_messages("gemini", messages)
+    assert gemini[0].content == "PERSONA|CONTEXT"
+    assert isinstance(gemini[1], HumanMessage)
+
+
+def test_cache_token_counts_are_accumulated():
+    stats = PromptCacheStats()
+    stats.record("claude-sonnet-4-5", {"input_tokens": 2000, "input_token_details": {"cache_creation": 1500}})
+    stats.record("claude-sonnet-4-5", {"input_tokens": 2000, "input_token_details": {"cache_read": 1500}})
+    stats.record("claude-sonnet-4-5", None)
+
+    totals = stats.stats()["claude-sonnet-4-5"]
+    assert totals["cache_write_tokens"] == 1500
+    assert totals["cache_read_tokens"] == 1500
+    assert totals["cache_read_ratio"] == 0.375
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+from agents.base import BaseAgent
+from core import prompt_registry
+from core.prompt_registry import PROMPTS_DIR, PromptRegistry
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_loads_every_prompt_with_hash_and_tokens():
+    registry = PromptRegistry(PROMPTS_DIR)
+    assert {"tilotma", "navya"} <= set(registry.keys())
+    prompt = registry.get("tilotma")
+    assert len(prompt.sha256) == 64 and prompt.tokens > 0
+    assert registry.get("nobody") is None
+
+
+def test_changed_and_deleted_files_are_reloaded(tmp_path):
+    write(tmp_path / "a.txt", "You are A.", 1000)
+    write(tmp_path / "b.txt", "You are B.", 1000)
+    registry = PromptRegistry(tmp_path)
+    old = registry.get("a")
+
+    assert registry.reload_changed() == []
+    write(tmp_path / "a.txt", "You are A, version two.", 2000)
+    (tmp_path / "b.txt").unlink()
+
+    assert sorted(registry.reload_changed()) == ["a", "b"]
+    assert registry.get("a").text == "You are A, version two." and registry.get("a").sha256 != old.sha256
+    assert registry.get("b") is None
+
+
+def test_agents_pick_up_edits_from_the_watcher(tmp_path, monkeypatch):
+    write(tmp_path / "tester.txt", "You are the first persona.", 1000)
+    registry = PromptRegistry(tmp_path)
+    monkeypatch.setattr(prompt_registry, "_shared_registry", registry)
+    agent = BaseAgent(agent_key="tester")
+    assert "first persona" in agent.system_prefix
+
+    async def edit_while_watching():
+        registry.start_watching(interval=0.01)
+        write(tmp_path / "tester.txt", "You are the second persona.", 2000)
+        await asyncio.sleep(0.1)
+        await registry.stop_watching()
+
+    asyncio.run(edit_while_watching())
+    assert "second persona" in agent.system_prefix
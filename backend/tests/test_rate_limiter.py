@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+
+from config.settings import settings
+from core.model_manager import ModelManager
+from core.rate_limiter import ModelRateLimiter, RateLimiterRegistry, TokenBucket
+
+
+def test_token_bucket_consumes_and_syncs():
+    bucket = TokenBucket(capacity=10, refill_per_second=0)
+    bucket.consume(12)
+    assert not bucket.has(1)
+
+    bucket.sync(limit=120, remaining=100)
+    assert bucket.capacity == 120
+    assert bucket.refill_per_second == 2.0
+    assert bucket.has(100)
+
+
+def test_limiter_syncs_from_anthropic_headers():
+    limiter = ModelRateLimiter(requests_per_minute=50, tokens_per_minute=30000)
+    limiter.update_from_headers({
+        "anthropic-ratelimit-requests-limit": "50",
+        "anthropic-ratelimit-requests-remaining": "0",
+        "anthropic-ratelimit-input-tokens-limit": "30000",
+        "anthropic-ratelimit-input-tokens-remaining": "29000",
+    })
+    assert not limiter.has_capacity(100)
+
+
+def test_router_switches_provider_when_budget_exhausted(stub_manager, make_router):
+    manager = stub_manager(rate_limits=RateLimiterRegistry())
+    manager.rate_limits.get("claude-sonnet-4-5").block_for(60)
+    router = make_router(manager)
+
+    assert asyncio.run(router.process_request("a", "sys", use_cache=False)) == "gemini answer"
+    assert manager.calls == ["gemini"]
+
+
+def test_no_gemini_fallback_when_disabled(monkeypatch, stub_manager, make_router):
+    monkeypatch.setattr(settings, "ENABLE_GEMINI_FALLBACK", False)
+    router = make_router(stub_manager(rate_limits=RateLimiterRegistry()))
+    assert router._fallback_target("claude") is None
+
+
+def test_429_response_blocks_model():
+    manager = ModelManager()
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages", json={"model": "claude-haiku-4-5"})
+    response = httpx.Response(429, headers={"retry-after": "20"}, request=request)
+
+    asyncio.run(manager._observe_response(response))
+    assert not manager.has_capacity("claude", "claude-haiku-4-5")
+    assert manager.stats()["rate_limits"]["claude-haiku-4-5"]["throttled"] == 1
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from services.response_cache import ResponseCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_only_served_stale():
+    cache = ResponseCache(default_ttl=60, max_stale=60)
+    cache.set("k", "old", ttl=0)
+    time.sleep(0.01)
+
+    assert cache.get("k") is None
+    assert cache.get_stale("k") == "old"
+
+
+def test_router_caches_and_supports_opt_out(stub_manager, make_router):
+    manager = stub_manager(answer="answer #{n}")
+    router = make_router(manager)
+
+    first = asyncio.run(router.process_request("plan", "sys"))
+    second = asyncio.run(router.process_request("plan", "sys"))
+    fresh = asyncio.run(router.process_request("plan", "sys", use_cache=False))
+
+    assert first == second == "answer #1"
+    assert fresh == "answer #2"
+    assert len(manager.calls) == 2
+
+
+def test_router_serves_stale_when_all_providers_fail(stub_manager, make_router):
+    manager = stub_manager(answer="answer #{n}")
+    cache = ResponseCache()
+    router = make_router(manager, cache=cache)
+    asyncio.run(router.process_request("plan", "sys", cache_ttl=0))
+
+    manager.errors = {provider: RuntimeError(f"{provider} down") for provider in ("claude", "gemini")}
+    assert asyncio.run(router.process_request("plan", "sys")) == "answer #1"
+    assert cache.stats()["stale_hits"] == 1
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.process_request("other", "sys"))
@@ -0,0 +1,133 @@
+import asyncio
+
+from agents.context import AgentContext
+from agents.reviewers import Navya
+from core.model_manager import ModelResult
+from services.code_chunks import content_hash, split_hunks
+from services.review_cache import ReviewCache
+
+ORIGINAL = """# FILE: auth.py
+import hashlib
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def login(user, password):
+    return user.password == hash_password(password)
+
+def logout(session):
+    session.clear()
+"""
+
+
+class RecordingRouter:
+    def __init__(self, fail=False, answer="[APPROVE] fine"):
+        self.prompts = []
+        self.fail = fail
+        self.answer = answer
+
+    async def invoke(self, prompt, system_instruction, **kwargs):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return ModelResult(self.answer, "claude", "claude-haiku-4-5", input_tokens=50, output_tokens=5)
+
+
+def make_navya(cache, fail=False, answer="[APPROVE] fine"):
+    navya = Navya()
+    navya.router = RecordingRouter(fail, answer)
+    navya.review_cache = cache
+    return navya
+
+
+def test_only_changed_hunks_are_re_reviewed():
+    cache = ReviewCache()
+    first = asyncio.run(make_navya(cache).review_changes(ORIGINAL, "Auth module", incremental=True))
+    assert first.verdict == "approved" and first.reused_tokens == 0 and len(first.chunks) == 4
+
+    # Edit one function, add trailing spaces and blank lines elsewhere
+    edited = ORIGINAL.replace("session.clear()", "session.clear()\n    session.rotate()").replace("import hashlib", "import hashlib   \n\n")
+    navya = make_navya(cache)
+    second = asyncio.run(navya.review_changes(edited, "Auth module", incremental=True))
+
+    assert len(navya.router.prompts) == 1
+    prompt = navya.router.prompts[0]
+    assert "session.rotate()" in prompt and "SURROUNDING CODE" in prompt and "hashlib.sha256" not in prompt
+    assert [chunk.cached for chunk in second.chunks] == [True, True, True, False]
+    assert "reused findings for 3 of 4 part(s)" in second.reuse_summary and "Review scope" in second.text
+    assert cache.stats()["reused_tokens"] == second.reused_tokens > 0
+
+
+def test_unchanged_files_hit_the_file_cache_and_failures_are_not_cached():
+    cache = ReviewCache()
+    failed = asyncio.run(make_navya(cache, fail=True).review_changes(ORIGINAL, "", incremental=True))
+    assert failed.verdict == "ambiguous" and cache.stats()["entries"] == 0
+
+    asyncio.run(make_navya(cache).review_changes(ORIGINAL, "", incremental=True))
+    navya = make_navya(cache)
+    again = asyncio.run(navya.review_changes(ORIGINAL.replace("\n", "\r\n"), "", incremental=True))
+    assert navya.router.prompts == [] and all(chunk.cached for chunk in again.chunks)
+    assert content_hash("a = 1  \n\n") == content_hash("# FILE: x.py\na = 1")
+
+
+def test_findings_are_not_shared_across_review_contexts_or_projects():
+    cache = ReviewCache()
+    asyncio.run(make_navya(cache).review_changes(ORIGINAL, "Plan A", AgentContext(project_id=1), incremental=True))
+
+    for context, project_id in (("Plan B", 1), ("Plan A", 2)):
+        navya = make_navya(cache)
+        asyncio.run(navya.review_changes(ORIGINAL, context, AgentContext(project_id=project_id), incremental=True))
+        assert len(navya.router.prompts) == 1  # All four hunks of the file, packed
+
+    navya = make_navya(cache)
+    asyncio.run(navya.review_changes(ORIGINAL, "Plan A", AgentContext(project_id=1), incremental=True))
+    assert navya.router.prompts == []
+
+
+def _diff(lines_above_bar):
+    return (
+        "diff --git a/app.py b/app.py\n"
+        f"index {'1a2b3c' if lines_above_bar else '4d5e6f'}..9f8e7d 100644\n"
+        "--- a/app.py\n"
+        "+++ b/app.py\n"
+        f"@@ -{10 + lines_above_bar},3 +{10 + lines_above_bar},4 @@ class Service:\n"
+        " def bar():\n"
+        "-    return 1\n"
+        "+    return 2\n"
+    )
+
+
+def test_diff_headers_and_hunk_offsets_do_not_change_the_hash():
+    [before] = split_hunks(_diff(0), 3000)
+    [after] = split_hunks(_diff(1), 3000)  # Header-only hunk dropped; only the '@@' offsets moved
+    assert before.startswith("@@") and "def bar" in before
+    assert content_hash(before) == content_hash(after)
+    assert content_hash(before) != content_hash(before.replace("class Service", "class Other"))
+
+
+def test_a_cold_review_packs_the_changed_hunks_into_few_calls():
+    code = "# FILE: utils.py\n" + "\n".join(f"def helper_{i}(value):\n    return value + {i}\n" for i in range(40))
+    navya = make_navya(ReviewCache())
+    report = asyncio.run(navya.review_changes(code, "", incremental=True))
+    assert len(report.chunks) == 40 and len(navya.router.prompts) == 1
+    assert "### HUNK 40" in navya.router.prompts[0]
+
+    # Per-hunk findings are kept per hunk; a rejection nobody can attribute is not cached
+    cache = ReviewCache()
+    answer = "### HUNK 1\n[APPROVE] ok\n### HUNK 2\n[REQUEST CHANGES] unused import"
+    two = "# FILE: a.py\nimport os\n\ndef run():\n    return 1\n"
+    report = asyncio.run(make_navya(cache, answer=answer).review_changes(two, "", incremental=True))
+    assert [chunk.verdict for chunk in report.chunks] == ["approved", "rejected"] and cache.stats()["entries"] == 3
+    cache = ReviewCache()
+    asyncio.run(make_navya(cache, answer="[REQUEST CHANGES] something").review_changes(two, "", incremental=True))
+    assert cache.stats()["entries"] == 0
+
+
+def test_oversized_definitions_are_cut_at_stable_boundaries():
+    body = "\n".join(f"        total += compute({i})" for i in range(30))
+    code = "class Big:\n" + "\n".join(f"    def step_{k}(self):\n{body}\n" for k in range(6))
+    before = split_hunks(code, 500)
+    after = split_hunks(code.replace("    def step_0(self):\n", "    def step_0(self):\n        total = 0\n"), 500)
+    assert len(before) == len(after) == 7
+    changed = [content_hash(a) != content_hash(b) for a, b in zip(before, after)]
+    assert changed == [False, True, False, False, False, False, False]
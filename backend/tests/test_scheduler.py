@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import LANE_BACKGROUND, LANE_HANDOFF, LANE_INTERACTIVE, CallScheduler, current_lane, use_lane
+
+
+def run_queue(scheduler, lanes, hold=0.01, stagger=0.0):
+    order = []
+
+    async def call(lane):
+        async with scheduler.slot("m", lane):
+            order.append(lane)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        await scheduler.acquire("m")  # Occupy the only slot so everything queues
+        tasks = []
+        for lane in lanes:
+            tasks.append(asyncio.create_task(call(lane)))
+            await asyncio.sleep(stagger)
+        await asyncio.sleep(0.01)
+        scheduler.release("m")
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_interactive_overtakes_queued_background_work():
+    scheduler = CallScheduler(default_limit=1, aging_seconds=60)
+    order = run_queue(scheduler, [LANE_BACKGROUND, LANE_BACKGROUND, LANE_HANDOFF, LANE_INTERACTIVE])
+
+    assert order == [LANE_INTERACTIVE, LANE_HANDOFF, LANE_BACKGROUND, LANE_BACKGROUND]
+    stats = scheduler.stats()
+    assert stats["lanes"][LANE_BACKGROUND]["admitted"] == 2
+    assert stats["lanes"][LANE_BACKGROUND]["max_wait_s"] >= stats["lanes"][LANE_INTERACTIVE]["max_wait_s"]
+    assert stats["models"]["m"]["running"] == 0
+
+
+def test_aging_prevents_starvation():
+    # Background work that has waited 2+ aging periods longer outranks fresh interactive calls
+    scheduler = CallScheduler(default_limit=1, aging_seconds=0.005)
+    order = run_queue(scheduler, [LANE_BACKGROUND, LANE_INTERACTIVE], stagger=0.05)
+    assert order == [LANE_BACKGROUND, LANE_INTERACTIVE]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = CallScheduler(default_limit=1)
+
+    async def scenario():
+        await scheduler.acquire("m")
+        waiter = asyncio.create_task(scheduler.acquire("m"))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["models"]["m"]["queued"][LANE_INTERACTIVE] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release("m")
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["models"]["m"] == {"limit": 1, "running": 0, "queued": {LANE_INTERACTIVE: 0, LANE_HANDOFF: 0, LANE_BACKGROUND: 0}}
+
+
+def test_lane_context():
+    assert current_lane.get() == LANE_INTERACTIVE
+    with use_lane(LANE_BACKGROUND):
+        assert current_lane.get() == LANE_BACKGROUND
+    assert current_lane.get() == LANE_INTERACTIVE
+    with pytest.raises(ValueError):
+        with use_lane("urgent"):
+            pass
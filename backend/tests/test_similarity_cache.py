@@ -0,0 +1,54 @@
+import asyncio
+
+from config.settings import settings
+from services.similarity_cache import SimilarityCache, normalize_prompt
+
+
+def test_rephrased_prompt_hits_with_similarity():
+    cache = SimilarityCache(thresholds={"quick_answer": 0.8})
+    cache.add("quick_answer", "gemini", "sys", "build a login page", "<login page>")
+
+    assert normalize_prompt("create a login page please") == normalize_prompt("build a login page")
+    hit = cache.lookup("quick_answer", "gemini", "sys", "Create a login page, please!")
+    assert hit.response == "<login page>"
+    assert hit.similarity == 1.0
+    assert cache.stats()["recent_hit_similarities"] == [1.0]
+
+
+def test_scope_and_threshold_are_respected():
+    cache = SimilarityCache(thresholds={"quick_answer": 0.8})
+    cache.add("quick_answer", "gemini", "sys", "build a login page", "<login page>")
+    cache.add("architecture", "gemini", "sys", "build a login page", "<ignored>")
+
+    assert cache.lookup("quick_answer", "gemini", "other system", "build a login page") is None
+    assert cache.lookup("quick_answer", "gemini", "sys", "design a postgres schema for billing") is None
+    assert cache.lookup("architecture", "gemini", "sys", "build a login page") is None
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+def test_router_answers_near_duplicates_from_cache_once_opted_in(monkeypatch, stub_manager, make_router):
+    manager = stub_manager(answer="answer #{n}")
+    router = make_router(manager)
+    asyncio.run(router.process_request("summarize the meeting notes", "sys", task_type="summarization"))
+    asyncio.run(router.process_request("please summarize the meeting notes", "sys", task_type="summarization"))
+    assert len(manager.calls) == 2  # Off by default
+
+    monkeypatch.setattr(settings, "SIMILARITY_CACHE_ENABLED", True)
+    manager = stub_manager(answer="answer #{n}")
+    router = make_router(manager)
+
+    first = asyncio.run(router.process_request("summarize the meeting notes", "sys", task_type="summarization"))
+    second = asyncio.run(router.process_request("please summarize the meeting notes", "sys", task_type="summarization"))
+
+    assert first == second
+    assert len(manager.calls) == 1
+
+
+def test_prompts_that_differ_in_meaning_do_not_match():
+    cache = SimilarityCache(thresholds={"quick_answer": 0.8})
+    for prompt in ("convert 10 km to miles", "python 3 release date", "capital of austria", "convert km to miles"):
+        cache.add("quick_answer", "gemini", "sys", prompt, f"<{prompt}>")
+
+    for near_miss in ("convert 100 km to miles", "python 2 release date", "capital of australia", "convert miles to km"):
+        assert cache.lookup("quick_answer", "gemini", "sys", near_miss) is None
+    assert cache.lookup("quick_answer", "gemini", "sys", "Convert 10 km to miles please").response == "<convert 10 km to miles>"
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_identical_concurrent_requests_share_one_call(stub_manager, make_router):
+    manager, flights = stub_manager(delays={"claude": 0.05}), SingleFlight()
+    router = make_router(manager, flights=flights)
+
+    async def burst():
+        return await asyncio.gather(*[router.process_request("same", "sys") for _ in range(5)])
+
+    assert asyncio.run(burst()) == ["claude answer"] * 5
+    assert len(manager.calls) == 1
+    assert flights.coalesced == 4
+    assert flights.in_flight() == 0
+
+
+def test_joiners_do_not_count_the_leaders_tokens(stub_manager, make_router):
+    router = make_router(stub_manager(delays={"claude": 0.05}, usage=(100, 20)))
+
+    async def burst():
+        return await asyncio.gather(*[router.invoke("same", "sys") for _ in range(3)])
+
+    results = asyncio.run(burst())
+    assert sum(result.total_tokens for result in results) == 120
+    assert [result.cached for result in results].count(False) == 1
+
+
+def test_errors_are_shared_by_every_waiter(stub_manager, make_router):
+    manager = stub_manager(delays={"claude": 0.05}, errors={"claude": ValueError("bad request")})
+    router = make_router(manager)
+
+    async def burst():
+        return await asyncio.gather(
+            *[router.process_request("same", "sys") for _ in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(manager.calls) == 1
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_others():
+    flights = SingleFlight()
+    started = []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("k", call))
+        second = asyncio.ensure_future(flights.do("k", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+    assert started == [1]
+    assert flights.cancelled == 0
+
+
+def test_last_waiter_cancelling_cancels_the_call():
+    flights = SingleFlight()
+
+    async def scenario():
+        waiter = asyncio.ensure_future(flights.do("k", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert flights.cancelled == 1
+    assert flights.in_flight() == 0
@@ -0,0 +1,41 @@
+import asyncio
+
+from agents.context import AgentContext
+from agents.developers import Shubham
+from core.scheduler import LANE_BACKGROUND
+
+
+async def _collect(stream):
+    return [delta async for delta in stream]
+
+
+def test_stream_request_yields_deltas_and_full_text(stub_manager, make_router):
+    router = make_router(stub_manager())
+    stream = router.stream_request("hi", "sys", model_override="claude-haiku-4-5")
+
+    assert asyncio.run(_collect(stream)) == ["Hel", "lo"]
+    assert stream.text == "Hello"
+    assert stream.completed
+    assert stream.model == "claude-haiku-4-5"
+
+
+def test_stream_request_falls_back_before_first_token(stub_manager, make_router):
+    manager = stub_manager(errors={"claude": RuntimeError("claude down")})
+    router = make_router(manager)
+    stream = router.stream_request("hi", "sys", model_override="claude")
+
+    assert "".join(asyncio.run(_collect(stream))) == "Hello"
+    assert manager.calls == ["claude", "gemini"]
+    assert stream.provider == "gemini"
+
+
+def test_agent_stream_keeps_the_callers_scheduler_lane():
+    class RecordingRouter:
+        def stream_request(self, **kwargs):
+            self.kwargs = kwargs
+            return None
+
+    agent = Shubham()
+    agent.router = RecordingRouter()
+    asyncio.run(agent.run_stream("build it", AgentContext(priority=LANE_BACKGROUND)))
+    assert agent.router.kwargs["priority"] == LANE_BACKGROUND
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from agents.collaboration.workflow import STEP_FAILED, STEP_OK, STEP_SKIPPED, Workflow, delivery_pipeline, run_workflow
+from agents.registry import AgentRegistry
+
+
+def sleeper(value, delay=0.1):
+    async def run(results):
+        await asyncio.sleep(delay)
+        return value
+    return run
+
+
+class EchoAgent:
+    """Stands in for a team agent: each method returns '<method>(<first arg>)'."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def __getattr__(self, method):
+        async def call(*args, ctx=None):
+            assert ctx is not None and ctx.db is None
+            await asyncio.sleep(0.01)
+            return f"{method}({args[0][:40]})"
+        return call
+
+
+def test_independent_steps_run_concurrently_and_report_the_critical_path():
+    async def combine(results):
+        return results["fast"] + results["slow"]
+
+    workflow = (
+        Workflow(inputs={"start": 1})
+        .add_step("root", sleeper("root", 0.05))
+        .add_step("fast", sleeper(1, 0.05), depends_on=["root"])
+        .add_step("slow", sleeper(2, 0.2), depends_on=["root"])
+        .add_step("join", combine, depends_on=["fast", "slow"])
+    )
+    report = asyncio.run(workflow.run())
+
+    assert report.ok and report.results["join"] == 3
+    assert report.duration_seconds < 0.4  # root + slow, not root + fast + slow
+    assert report.critical_path == ["root", "slow", "join"]
+    assert "Critical path: root -> slow -> join" in report.summary()
+
+
+def test_retries_timeouts_and_skipped_dependents():
+    calls = {"flaky": 0}
+
+    async def flaky(results):
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise ConnectionError("blip")
+        return "ok"
+
+    workflow = (
+        Workflow()
+        .add_step("flaky", flaky, retries=2, retry_delay=0)
+        .add_step("stuck", sleeper("never", 5), timeout=0.05)
+        .add_step("after_stuck", sleeper("never"), depends_on=["stuck"])
+        .add_step("after_flaky", sleeper("done", 0), depends_on=["flaky"])
+    )
+    report = asyncio.run(workflow.run())
+
+    assert report.steps["flaky"].attempts == 2 and report.steps["after_flaky"].status == STEP_OK
+    assert report.steps["stuck"].status == STEP_FAILED
+    assert report.steps["after_stuck"].status == STEP_SKIPPED and not report.ok
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        Workflow().add_step("a", sleeper(1), depends_on=["b"]).add_step("b", sleeper(1), depends_on=["a"]).validate()
+    with pytest.raises(ValueError):
+        Workflow().add_step("a", sleeper(1), depends_on=["missing"]).validate()
+    assert run_workflow([lambda d: {**d, "x": 1}], {}) == {"x": 1}
+
+
+def test_delivery_pipeline_uses_agent_methods(monkeypatch):
+    for key in ("saanvi", "advait", "shubham", "navya"):
+        monkeypatch.setitem(AgentRegistry._instances, key, EchoAgent(key))
+
+    started = time.perf_counter()
+    report = asyncio.run(delivery_pipeline("Build a CRM").run())
+    assert report.ok, report.summary()
+    assert report.results["analysis"] == "analyze_request(Build a CRM)"
+    assert report.results["review"].startswith("review_code(generate_feature(")
+    assert report.steps["plan"].started_at < report.steps["stories"].finished_at  # Ran side by side
+    assert time.perf_counter() - started < 1
+
+
+def test_cancelling_a_run_waits_for_its_steps_to_stop():
+    cleaned_up = []
+
+    async def slow(results):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0.01)
+            cleaned_up.append("slow")
+
+    async def scenario():
+        run = asyncio.ensure_future(Workflow().add_step("slow", slow).run())
+        await asyncio.sleep(0.02)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        return list(cleaned_up)
+
+    assert asyncio.run(scenario()) == ["slow"]